@@ -0,0 +1,149 @@
+"""Benchmark of reading and writing the values of Blender features.
+
+Compares the compiled and cached blender link resolvers of `Feature` with parsing every
+link and walking it from `bpy` on every access (the previous implementation), for the
+features of many objects. Requires bpy.
+
+Usage:
+    python benchmarks/feature_access.py [--num-objects 1000] [--repetitions 10]
+        [--output feature_access.json]
+"""
+
+import argparse
+import json
+from pathlib import Path
+import re
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+PROJECT_ROOT = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# pylint: disable=wrong-import-position
+import bpy
+
+from synthpic2.recipe.prototypes.feature import Feature
+
+# pylint: disable=protected-access
+
+# Features of every object, that are read and written.
+FEATURE_LINKS = {
+    "location": 'bpy.data.objects["{name}"].location',
+    "rotation": 'bpy.data.objects["{name}"].rotation_euler',
+    "scale_x": 'bpy.data.objects["{name}"].scale[0]',
+    "pass_index": 'bpy.data.objects["{name}"].pass_index',
+    "color": 'bpy.data.objects["{name}"]["color"]',
+}
+
+_LINK_PATTERN = r"(?:\.(\w+))|(?:\[\"([^\"]+)\"\])|(?:\[(\d+)])"
+
+
+def _parse_blender_link_uncached(feature: Feature) -> Any:
+    """Parse the link of a feature and walk it from `bpy` (the previous
+    implementation of `Feature._parse_blender_link`)."""
+    assert feature.blender_link is not None
+    matches = list(re.finditer(_LINK_PATTERN, feature.blender_link))
+
+    parent_node = bpy
+    for match in matches[:-1]:
+        interface, key = Feature._parse_node_interface_and_key(match)
+        parent_node = Feature._get_node_value(parent_node, interface, key)
+
+    final_interface, final_key = Feature._parse_node_interface_and_key(matches[-1])
+    return parent_node, final_interface, final_key
+
+
+def create_features(num_objects: int) -> List[Feature]:
+    mesh = bpy.data.meshes.new("benchmark_mesh")
+
+    features = []
+    for index in range(num_objects):
+        object_ = bpy.data.objects.new(f"benchmark_object_{index}", mesh)
+        object_["color"] = "#ff0000"
+
+        for feature_name, blender_link in FEATURE_LINKS.items():
+            features.append(
+                Feature(name=feature_name,
+                        blender_link=blender_link.format(name=object_.name)))
+
+    return features
+
+
+def measure(features: List[Feature], repetitions: int) -> Dict[str, float]:
+    """Measure the time per read and per write of a feature value.
+
+    Returns:
+        Dict[str, float]: Times in microseconds.
+    """
+    values = [feature.value for feature in features]
+
+    start_time = time.perf_counter()
+    for _ in range(repetitions):
+        for feature in features:
+            _ = feature.value
+    read_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    for _ in range(repetitions):
+        for feature, value in zip(features, values):
+            feature.value = value
+    write_time = time.perf_counter() - start_time
+
+    num_accesses = repetitions * len(features)
+    return {
+        "read": read_time / num_accesses * 1e6,
+        "write": write_time / num_accesses * 1e6,
+    }
+
+
+def measure_with(parse_blender_link: Callable[[Feature], Any],
+                 features: List[Feature], repetitions: int) -> Dict[str, float]:
+    original_parse_blender_link = Feature._parse_blender_link
+    Feature._parse_blender_link = parse_blender_link    # type: ignore
+    try:
+        return measure(features, repetitions)
+    finally:
+        Feature._parse_blender_link = original_parse_blender_link    # type: ignore
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("--num-objects",
+                        type=int,
+                        default=1000,
+                        help="Number of objects with features.")
+    parser.add_argument("--repetitions",
+                        type=int,
+                        default=10,
+                        help="Number of accesses of every feature.")
+    parser.add_argument("--output",
+                        type=Path,
+                        default=None,
+                        help="Optional JSON file to write the summary to.")
+    args = parser.parse_args()
+
+    features = create_features(args.num_objects)
+
+    summary: Dict[str, Any] = {
+        "num_features": len(features),
+        "repetitions": args.repetitions,
+        "uncached": measure_with(_parse_blender_link_uncached, features,
+                                 args.repetitions),
+        "cached": measure(features, args.repetitions),
+    }
+
+    for access in ["read", "write"]:
+        uncached_time = summary["uncached"][access]
+        cached_time = summary["cached"][access]
+        summary[f"{access}_speedup"] = uncached_time / cached_time
+        print(f"{access}: {uncached_time:.2f} us (uncached), {cached_time:.2f} us "
+              f"(cached), speedup: {uncached_time / cached_time:.2f}x")
+
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(summary, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Benchmark of the startup time of synthpic2 jobs.
+
+Measures the time of a cold import of `synthpic2` and of `setup_run` in fresh Python
+processes, and reports which of the slow to import dependencies were loaded on the
+way.
+
+Usage:
+    python benchmarks/startup.py [--repetitions 5] [--output startup.json]
+"""
+
+import argparse
+import json
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+PROJECT_ROOT = Path(__file__).parent.parent.resolve()
+
+# Dependencies that are slow to import and should only be imported by the steps that
+# need them.
+LAZY_MODULES = ["wandb", "matplotlib", "pandas", "trimesh"]
+
+_MEASUREMENT_SCRIPT = f"""
+import json
+import sys
+import time
+
+start_time = time.perf_counter()
+import synthpic2.engine
+import_time = time.perf_counter() - start_time
+
+lazy_modules = [name for name in {LAZY_MODULES!r} if name in sys.modules]
+
+start_time = time.perf_counter()
+synthpic2.engine.setup_run()
+setup_run_time = time.perf_counter() - start_time
+
+print(json.dumps({{
+    "import_time": import_time,
+    "setup_run_time": setup_run_time,
+    "lazy_modules_imported": lazy_modules,
+}}))
+"""
+
+
+def measure_startup() -> Dict[str, Any]:
+    """Measure the startup in a fresh Python process.
+
+    Returns:
+        Dict[str, Any]: Import time and `setup_run` time in seconds and the lazy
+            modules, that were imported by `import synthpic2`.
+    """
+    result = subprocess.run([sys.executable, "-c", _MEASUREMENT_SCRIPT],
+                            cwd=PROJECT_ROOT,
+                            capture_output=True,
+                            text=True,
+                            check=True)
+    # Blender may print to stdout, so only the last line is the result.
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize(measurements: List[Dict[str, Any]]) -> Dict[str, Any]:
+    summary: Dict[str, Any] = {"repetitions": len(measurements)}
+    for key in ["import_time", "setup_run_time"]:
+        values = [measurement[key] for measurement in measurements]
+        summary[key] = {
+            "median": statistics.median(values),
+            "min": min(values),
+            "max": max(values),
+        }
+    summary["lazy_modules_imported"] = measurements[0]["lazy_modules_imported"]
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("--repetitions",
+                        type=int,
+                        default=5,
+                        help="Number of fresh processes to measure.")
+    parser.add_argument("--output",
+                        type=Path,
+                        default=None,
+                        help="Optional JSON file to write the summary to.")
+    args = parser.parse_args()
+
+    measurements = [measure_startup() for _ in range(args.repetitions)]
+    summary = summarize(measurements)
+
+    for key in ["import_time", "setup_run_time"]:
+        print(f"{key}: {summary[key]['median']:.3f} s (median), "
+              f"{summary[key]['min']:.3f} s - {summary[key]['max']:.3f} s")
+    print(f"lazy modules imported: {summary['lazy_modules_imported'] or 'none'}")
+
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(summary, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2 @@
+"""Hydra launcher plugin, that keeps a pool of warm synthPIC2 workers alive across the
+jobs of a multirun."""
@@ -0,0 +1,162 @@
+"""Implementation of the warm pool launcher."""
+
+import atexit
+import importlib
+import inspect
+import logging
+import multiprocessing
+import multiprocessing.pool
+from pathlib import Path
+from typing import Any, List, Optional, Sequence, Tuple
+
+from hydra.core.hydra_config import HydraConfig
+from hydra.core.singleton import Singleton
+from hydra.core.utils import configure_log
+from hydra.core.utils import filter_overrides
+from hydra.core.utils import JobReturn
+from hydra.core.utils import run_job
+from hydra.core.utils import setup_globals
+from hydra.types import HydraContext
+from hydra.types import TaskFunction
+from hydra.utils import get_method
+from omegaconf import DictConfig
+from omegaconf import open_dict
+
+from .warm_pool_launcher import WarmPoolLauncher
+
+log = logging.getLogger(__name__)
+
+# Reference to a task function, that can be pickled, even if the function has been
+# decorated with `hydra.main`.
+TaskFunctionReference = Tuple[str, str]
+
+# Arguments of `execute_job`.
+JobArguments = Tuple[int, Sequence[str], HydraContext, DictConfig,
+                     TaskFunctionReference, Any]
+
+
+def launch(
+    launcher: WarmPoolLauncher,
+    job_overrides: Sequence[Sequence[str]],
+    initial_job_idx: int,
+) -> Sequence[JobReturn]:
+    """Launch the jobs on the pool of warm workers.
+
+    Args:
+        launcher (WarmPoolLauncher): Launcher, that holds the pool.
+        job_overrides (Sequence[Sequence[str]]): A batch of job arguments.
+        initial_job_idx (int): Initial job idx in batch.
+
+    Returns:
+        Sequence[JobReturn]: An array of return values from run_job with indexes
+            corresponding to the input list indexes.
+    """
+    setup_globals()
+    assert launcher.config is not None
+    assert launcher.task_function is not None
+    assert launcher.hydra_context is not None
+
+    configure_log(launcher.config.hydra.hydra_logging, launcher.config.hydra.verbose)
+    sweep_dir = Path(str(launcher.config.hydra.sweep.dir))
+    sweep_dir.mkdir(parents=True, exist_ok=True)
+
+    pool = _get_pool(launcher)
+
+    log.info("WarmPoolLauncher(n_jobs=%d, batch_size=%d) is launching %d jobs",
+             launcher.n_jobs, launcher.batch_size, len(job_overrides))
+    log.info("Launching jobs, sweep output dir : %s", sweep_dir)
+    for idx, overrides in enumerate(job_overrides):
+        log.info("\t#%d : %s", initial_job_idx + idx,
+                 " ".join(filter_overrides(overrides)))
+
+    task_function_reference = _get_task_function_reference(launcher.task_function)
+    singleton_state = Singleton.get_state()
+
+    job_arguments: List[JobArguments] = [
+        (initial_job_idx + idx, overrides, launcher.hydra_context, launcher.config,
+         task_function_reference, singleton_state)
+        for idx, overrides in enumerate(job_overrides)
+    ]
+
+    runs = pool.map(execute_job, job_arguments, chunksize=launcher.batch_size)
+
+    assert isinstance(runs, List)
+    for run in runs:
+        assert isinstance(run, JobReturn)
+    return runs
+
+
+def _get_pool(launcher: WarmPoolLauncher) -> multiprocessing.pool.Pool:
+    """Get the pool of the launcher and start it, if it is not running yet. The pool
+    lives until the launching process exits, so that it can be reused by all batches of
+    a sweep."""
+    if launcher.pool is None:
+        # `spawn`, since forking a process that has already imported `bpy` is unsafe.
+        context = multiprocessing.get_context("spawn")
+        launcher.pool = context.Pool(processes=launcher.n_jobs,
+                                     initializer=initialize_worker,
+                                     initargs=(launcher.warm_up,),
+                                     maxtasksperchild=launcher.max_jobs_per_worker)
+        atexit.register(_shut_down_pool, launcher.pool)
+
+    return launcher.pool
+
+
+def _shut_down_pool(pool: multiprocessing.pool.Pool) -> None:
+    pool.close()
+    pool.join()
+
+
+def initialize_worker(warm_up: Optional[str]) -> None:
+    """Do the expensive, job independent setup once per worker.
+
+    Args:
+        warm_up (Optional[str]): Dotted path of the warm up callable. If `None`, then
+            nothing is done.
+    """
+    if warm_up is not None:
+        get_method(warm_up)()
+
+
+def _get_task_function_reference(task_function: TaskFunction) -> TaskFunctionReference:
+    return (task_function.__module__, task_function.__qualname__)
+
+
+def _resolve_task_function(reference: TaskFunctionReference) -> TaskFunction:
+    module_name, qualified_name = reference
+
+    task_function: Any = importlib.import_module(module_name)
+    for name in qualified_name.split("."):
+        task_function = getattr(task_function, name)
+
+    # The module attribute is the function decorated by `hydra.main`, but we need to
+    # run the plain function.
+    return inspect.unwrap(task_function)
+
+
+def execute_job(job_arguments: JobArguments) -> JobReturn:
+    """Execute a single job inside a warm worker."""
+    (idx, overrides, hydra_context, config, task_function_reference,
+     singleton_state) = job_arguments
+
+    setup_globals()
+    Singleton.set_state(singleton_state)
+
+    task_function = _resolve_task_function(task_function_reference)
+
+    sweep_config = hydra_context.config_loader.load_sweep_config(
+        config, list(overrides))
+    with open_dict(sweep_config):
+        sweep_config.hydra.job.id = f"{sweep_config.hydra.job.name}_{idx}"
+        sweep_config.hydra.job.num = idx
+    HydraConfig.instance().set_config(sweep_config)
+
+    ret = run_job(
+        hydra_context=hydra_context,
+        config=sweep_config,
+        task_function=task_function,
+        job_dir_key="hydra.sweep.dir",
+        job_subdir_key="hydra.sweep.subdir",
+    )
+
+    return ret
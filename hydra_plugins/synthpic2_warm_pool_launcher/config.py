@@ -0,0 +1,35 @@
+"""Config of the warm pool launcher."""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from hydra.core.config_store import ConfigStore
+
+
+@dataclass
+class WarmPoolLauncherConf:
+    """Config of the `WarmPoolLauncher`.
+
+    Attributes:
+        n_jobs (int): Number of long-lived worker processes.
+        batch_size (int): Number of jobs that are handed to a worker at once.
+        max_jobs_per_worker (Optional[int]): Number of batches after which a worker is
+            replaced by a fresh one (e.g. to limit leaking memory). `None` means that
+            workers live as long as the pool.
+        warm_up (Optional[str]): Dotted path of a callable, that does the expensive,
+            job independent setup once per worker.
+    """
+    _target_: str = ("hydra_plugins.synthpic2_warm_pool_launcher.warm_pool_launcher."
+                     "WarmPoolLauncher")
+    n_jobs: int = 2
+    batch_size: int = 1
+    max_jobs_per_worker: Optional[int] = None
+    warm_up: Optional[str] = "synthpic2.engine.warm_up"
+
+
+ConfigStore.instance().store(
+    group="hydra/launcher",
+    name="warm_pool",
+    node=WarmPoolLauncherConf,
+    provider="synthpic2_warm_pool_launcher",
+)
@@ -0,0 +1,57 @@
+"""Launcher, that runs the jobs of a multirun on a pool of warm worker processes."""
+
+import logging
+from multiprocessing.pool import Pool
+from typing import Optional, Sequence
+
+from hydra.core.utils import JobReturn
+from hydra.plugins.launcher import Launcher
+from hydra.types import HydraContext
+from hydra.types import TaskFunction
+from omegaconf import DictConfig
+
+log = logging.getLogger(__name__)
+
+
+class WarmPoolLauncher(Launcher):
+    """Launcher with a fixed pool of long-lived worker processes.
+
+    Every worker runs the `warm_up` callable once, when it is started, and then
+    executes many jobs. The pool is kept alive across all batches of a sweep.
+    """
+
+    def __init__(self,
+                 n_jobs: int = 2,
+                 batch_size: int = 1,
+                 max_jobs_per_worker: Optional[int] = None,
+                 warm_up: Optional[str] = None) -> None:
+        self.n_jobs = n_jobs
+        self.batch_size = batch_size
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.warm_up = warm_up
+
+        self.config: Optional[DictConfig] = None
+        self.task_function: Optional[TaskFunction] = None
+        self.hydra_context: Optional[HydraContext] = None
+
+        self.pool: Optional[Pool] = None
+
+    def setup(
+        self,
+        *,
+        hydra_context: HydraContext,
+        task_function: TaskFunction,
+        config: DictConfig,
+    ) -> None:
+        self.config = config
+        self.task_function = task_function
+        self.hydra_context = hydra_context
+
+    def launch(self, job_overrides: Sequence[Sequence[str]],
+               initial_job_idx: int) -> Sequence[JobReturn]:
+        # Import here, so that discovering the plugin stays cheap.
+        from . import _core    # pylint: disable=import-outside-toplevel
+
+        return _core.launch(launcher=self,
+                            job_overrides=job_overrides,
+                            initial_job_idx=initial_job_idx)
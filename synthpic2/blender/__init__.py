@@ -6,4 +6,5 @@
 """
 
 from .gpu import Gpu
+from .render_session import RenderSession
 from .utilities import render_to_file
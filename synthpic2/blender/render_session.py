@@ -0,0 +1,69 @@
+"""Blender RenderSession class."""
+
+import atexit
+import warnings
+from typing import Optional
+
+import bpy
+from pyvirtualdisplay.display import Display
+
+from .gpu import Gpu
+
+__all__ = ["RenderSession"]
+
+
+class RenderSession:
+    """Class to keep everything that is needed for rendering, but independent of the
+    scene, alive for the whole process: the virtual display is only started once and
+    the Cycles devices are only probed once, instead of for every rendered image.
+
+    The session is shared by all rendering steps (and runs) of a process and closed
+    automatically, when the process exits.
+
+    Example:
+        >>> RenderSession.enable_gpu()
+        >>> RenderSession.start_display()
+        >>> bpy.ops.render.render(write_still=True)
+    """
+
+    _display: Optional[Display] = None
+    _is_gpu_available: Optional[bool] = None
+
+    @classmethod
+    def start_display(cls) -> None:
+        """Start the virtual display, if it is not running yet."""
+        if cls._display is not None:
+            return
+
+        cls._display = Display()
+        cls._display.start()
+        atexit.register(cls.close)
+
+    @classmethod
+    def enable_gpu(cls) -> None:
+        """Enable GPU for Cycles, if there is at least one available. The devices are
+        only probed the first time. Afterwards, the device configuration is only
+        reapplied, if the preferences have been reset (e.g. by
+        `bpy.ops.wm.read_factory_settings`)."""
+
+        # pylint: disable=protected-access
+
+        if cls._is_gpu_available is None:
+            Gpu._make_available()
+            cls._is_gpu_available = Gpu._is_gpu_available()
+
+            if not cls._is_gpu_available:
+                warnings.warn("GPU is not available.")
+
+        elif cls._is_gpu_available and not Gpu._is_gpu_available():
+            Gpu._make_available()
+
+        if cls._is_gpu_available:
+            bpy.context.scene.cycles.device = "GPU"
+
+    @classmethod
+    def close(cls) -> None:
+        """Stop the virtual display."""
+        if cls._display is not None:
+            cls._display.stop()
+            cls._display = None
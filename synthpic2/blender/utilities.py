@@ -1,14 +1,11 @@
 """Useful Blender functions that don't have their final place yet."""
 import pathlib
 import re
-from typing import Dict, Optional, Tuple
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
 
 import bmesh    # type: ignore
 import bpy
-from matplotlib.colors import rgb2hex
 import numpy as np
-from pyvirtualdisplay.display import Display
-import trimesh
 from contextlib import contextmanager
 
 from ..custom_types import AnyPath
@@ -16,6 +13,11 @@ from ..custom_types import BlenderDataBlock
 from ..custom_types import RenamingMap
 from ..errors import BlenderConventionError
 from ..errors import ConventionError
+from ..utilities import rgb_to_hex
+from .render_session import RenderSession
+
+if TYPE_CHECKING:
+    import trimesh
 
 
 def duplicate_and_assign_material(object_: bpy.types.Object, material_name: str,
@@ -105,6 +107,17 @@ def render_to_file(output_path: AnyPath) -> None:
 
     file_name = output_path.stem
 
+    _set_file_format(output_path)
+
+    bpy.context.scene.render.filepath = str(output_root / file_name)
+
+    # The virtual display is kept running for all subsequent renders.
+    RenderSession.start_display()
+    bpy.ops.render.render(write_still=True)
+
+
+def _set_file_format(output_path: pathlib.Path) -> None:
+    """Set the file format of the scene according to the suffix of a file path."""
     file_format = output_path.suffix.upper().lstrip(".")    # without dot
 
     if file_format:
@@ -123,10 +136,82 @@ def render_to_file(output_path: AnyPath) -> None:
             else:
                 raise error
 
-    bpy.context.scene.render.filepath = str(output_root / file_name)
 
-    with Display():
-        bpy.ops.render.render(write_still=True)
+def read_image_pixels(file_path: AnyPath) -> np.ndarray:
+    """Read the pixels of an image file with Blender (e.g. OpenEXR files).
+
+    Args:
+        file_path (AnyPath): Path of the image file.
+
+    Returns:
+        np.ndarray: Array of shape (height, width, channels) with the float values of
+            the image (rows from top to bottom).
+    """
+    image = bpy.data.images.load(str(pathlib.Path(file_path).resolve()))
+
+    try:
+        width, height = image.size
+        pixels = np.empty(width * height * image.channels, dtype=np.float32)
+        image.pixels.foreach_get(pixels)
+        pixels = pixels.reshape(height, width, image.channels)
+    finally:
+        bpy.data.images.remove(image)
+
+    # Blender stores the rows from bottom to top.
+    return np.flipud(pixels)
+
+
+def save_pixels_as_render(pixels: np.ndarray, output_path: AnyPath) -> None:
+    """Save linear RGBA pixels like a rendered image, i.e. with the color management
+    and the image settings of the scene. The output root will be created, if necessary.
+
+    Args:
+        pixels (np.ndarray): Array of shape (height, width, 4) with linear RGBA values
+            (rows from top to bottom).
+        output_path (AnyPath): Path of the output image file.
+    """
+    output_path = pathlib.Path(output_path).resolve()
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    _set_file_format(output_path)
+
+    height, width, _ = pixels.shape
+    image = bpy.data.images.new("render_pixels",
+                                width=width,
+                                height=height,
+                                alpha=True,
+                                float_buffer=True)
+
+    try:
+        image.pixels.foreach_set(np.flipud(pixels).astype(np.float32).ravel())
+        image.save_render(str(output_path), scene=bpy.context.scene)
+    finally:
+        bpy.data.images.remove(image)
+
+
+def render_to_array() -> np.ndarray:
+    """Renders an image and returns the pixels of the compositor's viewer node, without
+    writing a file. Requires a viewer node in the compositor.
+
+    Returns:
+        np.ndarray: Array of shape (height, width, 4) with the linear RGBA values of
+            the image (rows from top to bottom).
+    """
+    RenderSession.start_display()
+    bpy.ops.render.render()
+
+    if "Viewer Node" not in bpy.data.images:
+        raise BlenderConventionError(
+            "The compositor has no viewer node to read the rendered image from.")
+
+    image = bpy.data.images["Viewer Node"]
+    width, height = image.size
+
+    pixels = np.empty(width * height * 4, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+
+    # Blender stores the rows from bottom to top.
+    return np.flipud(pixels.reshape(height, width, 4))
 
 
 class _RenamingTracker:
@@ -378,7 +463,7 @@ def create_emission_shader(color: Tuple[float, float, float,
         bpy.types.Material
     """
 
-    material_name = "Emission" + rgb2hex(color)    # type: ignore
+    material_name = "Emission" + rgb_to_hex(color)
     material = bpy.data.materials.get(material_name)
 
     if material is None:
@@ -403,6 +488,41 @@ def create_emission_shader(color: Tuple[float, float, float,
     return material
 
 
+def create_object_color_emission_shader() -> bpy.types.Material:
+    """Create an emission shader with a strength of 1, whose color is the color of the
+    object it is assigned to (i.e. `object_.color`). This allows to render objects in
+    different colors with a single material.
+
+    Returns:
+        bpy.types.Material
+    """
+
+    material_name = "ObjectColorEmission"
+    material = bpy.data.materials.get(material_name)
+
+    if material is None:
+        material = bpy.data.materials.new(name=material_name)
+
+    material.use_nodes = True
+    if material.node_tree:
+        material.node_tree.links.clear()
+        material.node_tree.nodes.clear()
+
+    nodes = material.node_tree.nodes
+    links = material.node_tree.links
+    output = nodes.new(type="ShaderNodeOutputMaterial")
+
+    object_info_node = nodes.new(type="ShaderNodeObjectInfo")
+
+    emission_node = nodes.new(type="ShaderNodeEmission")
+    emission_node.inputs["Strength"].default_value = 1
+
+    links.new(object_info_node.outputs["Color"], emission_node.inputs["Color"])
+    links.new(emission_node.outputs["Emission"], output.inputs["Surface"])
+
+    return material
+
+
 def set_rigidity(object_: bpy.types.Object, state: bool) -> None:
     """Set the rigidity of a given object.
 
@@ -494,7 +614,10 @@ def convert_blender_object_to_blender_mesh(
     return object_
 
 
-def convert_blender_object_to_trimesh(object_: bpy.types.Object) -> trimesh.Trimesh:
+def convert_blender_object_to_trimesh(object_: bpy.types.Object) -> "trimesh.Trimesh":
+    # Imported here, since trimesh is slow to import and only needed by some steps.
+    import trimesh    # pylint: disable=import-outside-toplevel,redefined-outer-name
+
     object_copy, _ = duplicate_and_link_object(
         object_,
         duplicate_name_suffix="_copy",
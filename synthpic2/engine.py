@@ -1,14 +1,20 @@
 """Engine to execute recipes."""
 
+from copy import deepcopy
 import logging
+import multiprocessing
+from multiprocessing.process import BaseProcess
 import os
 from pathlib import Path
+import shutil
 import sys
+import time
+from typing import List, Optional, Sequence
 
 import hydra
 from hydra.core.hydra_config import HydraConfig
+from omegaconf import DictConfig
 from omegaconf import OmegaConf
-import wandb
 
 # ! Workaround
 # Blender messes with `sys.path`, which breaks pythons multiprocessing (see
@@ -29,23 +35,66 @@ sys.path = ORIGINAL_SYS_PATH
 from .prototype_library import PrototypeLibrary
 from .recipe import Recipe
 from .recipe import store as recipe_store
+from .recipe.blueprints import remove_all_particles
 from .recipe.process_conditions.feature_criteria import \
     register_premade_feature_criteria
 from .recipe.process_conditions.sets import register_premade_sets
 from .recipe.registries import clear_all_registries
+from .recipe.registries import MEASUREMENT_TECHNIQUE_REGISTRY
+from .recipe.registries import restore_all_registries
+from .recipe.registries import snapshot_all_registries
+from .recipe.registries.registries import RegistrySnapshot
+from .recipe.synth_chain.render_queue import log_stage_stats
+from .recipe.synth_chain.render_queue import RenderQueue
+from .recipe.synth_chain.render_queue import StageStats
+from .recipe.synth_chain.state_storage import create_state_storage
 from .recipe.utilities import parse_recipe
+from .utilities import create_run_context
 from .utilities import get_hydra_output_root
+from .utilities import get_run_context
+from .utilities import resolve_recipe_config
+from .utilities import RunContext
+from .utilities import set_run_context
+from .utilities import working_directory
 
 recipe_store.populate()
 
+# Registry items (prototypes, premade criteria and sets) that are kept between runs, if
+# the process has been warmed up. `None` means that the process is cold.
+_WARM_REGISTRY_SNAPSHOT: Optional[RegistrySnapshot] = None
+
 
 def setup_run() -> None:
     setup_blender()
+
+    if _WARM_REGISTRY_SNAPSHOT is not None:
+        # Prototypes, premade criteria and premade sets are kept from the warm-up.
+        return
+
     PrototypeLibrary.load()
     register_premade_feature_criteria()
     register_premade_sets()
 
 
+def warm_up() -> None:
+    """Do the recipe independent part of `setup_run` once and keep it for all
+    subsequent runs of this process, so that `clean_up_previous_run` only removes the
+    items that were created by a recipe."""
+    global _WARM_REGISTRY_SNAPSHOT
+
+    cool_down()
+    clean_up_previous_run()
+    setup_run()
+
+    _WARM_REGISTRY_SNAPSHOT = snapshot_all_registries()
+
+
+def cool_down() -> None:
+    """Revert `warm_up`, so that the next run does the full setup again."""
+    global _WARM_REGISTRY_SNAPSHOT
+    _WARM_REGISTRY_SNAPSHOT = None
+
+
 def setup_blender() -> None:
     bpy.context.preferences.edit.undo_steps = 0
     bpy.context.preferences.edit.undo_memory_limit = 1
@@ -53,18 +102,251 @@ def setup_blender() -> None:
 
 
 def clean_up_previous_run() -> None:
-    clear_all_registries()
+    if _WARM_REGISTRY_SNAPSHOT is None:
+        clear_all_registries()
+    else:
+        restore_all_registries(_WARM_REGISTRY_SNAPSHOT)
 
     bpy.ops.wm.read_factory_settings(use_empty=True)
 
 
+def clean_up_previous_image(registry_snapshot: RegistrySnapshot) -> None:
+    """Remove everything that is specific to an image, but keep the measurement
+    technique and the appended prototypes, so that they can be reused for the next image
+    of the same run.
+
+    Args:
+        registry_snapshot (RegistrySnapshot): Snapshot of the registries, before the
+            recipe was instantiated.
+    """
+    measurement_techniques = list(MEASUREMENT_TECHNIQUE_REGISTRY)
+
+    remove_all_particles()
+    restore_all_registries(registry_snapshot)
+
+    for measurement_technique in measurement_techniques:
+        MEASUREMENT_TECHNIQUE_REGISTRY.register(measurement_technique)
+
+
+def execute_images(recipe: DictConfig) -> None:
+    """Execute a parsed recipe `num_images` times, with consecutive seeds. The recipe
+    is instantiated again for every image, so that interpolations of the seed are
+    resolved correctly.
+
+    Args:
+        recipe (DictConfig): Parsed recipe.
+    """
+    if recipe.num_images == 1:
+        recipe_instantiated = hydra.utils.instantiate(recipe)
+        recipe_instantiated.execute(recipe)
+        return
+
+    if recipe.synth_chain.get("num_render_workers", 0) > 0:
+        execute_images_with_render_queue(recipe)
+        return
+
+    logger = logging.getLogger("synthPIC2")
+    registry_snapshot = snapshot_all_registries()
+
+    for image_index in range(recipe.num_images):
+        if image_index > 0:
+            clean_up_previous_image(registry_snapshot)
+
+        image_recipe = _get_image_recipe(recipe, image_index)
+
+        logger.info("Image %d of %d (seed: %d)...", image_index + 1, recipe.num_images,
+                    image_recipe.initial_runtime_state.seed)
+
+        with working_directory(Path(f"image{image_index}")):
+            recipe_instantiated = hydra.utils.instantiate(image_recipe)
+            recipe_instantiated.execute(image_recipe)
+
+
+def _get_image_recipe(recipe: DictConfig, image_index: int) -> DictConfig:
+    image_recipe = deepcopy(recipe)
+    image_recipe.initial_runtime_state.seed = \
+        recipe.initial_runtime_state.seed + image_index
+    return image_recipe
+
+
+def execute_images_with_render_queue(recipe: DictConfig) -> None:
+    """Execute a parsed recipe `num_images` times like `execute_images`, but let
+    separate pools of worker processes do the feature generation and the rendering, so
+    that both overlap. The pools are connected by a `RenderQueue` and can be sized
+    independently with `synth_chain.num_feature_generation_workers` and
+    `synth_chain.num_render_workers`. The throughput of both stages is logged at the
+    end.
+
+    Args:
+        recipe (DictConfig): Parsed recipe.
+
+    Raises:
+        RuntimeError: Raised, if a worker process fails.
+    """
+    logger = logging.getLogger("synthPIC2")
+    synth_chain_config = recipe.synth_chain
+
+    image_recipes = [
+        resolve_recipe_config(_get_image_recipe(recipe, image_index))
+        for image_index in range(recipe.num_images)
+    ]
+
+    spool_root = synth_chain_config.spool_root
+    is_temporary_spool = spool_root is None
+    if is_temporary_spool:
+        spool_root = create_state_storage(
+            synth_chain_config.state_storage,
+            root=synth_chain_config.state_storage_root).make_temporary_root()
+
+    # Blender can't be forked safely.
+    context = multiprocessing.get_context("spawn")
+    render_queue = RenderQueue(spool_root, synth_chain_config.max_queued_states,
+                               context)
+
+    image_indices = context.Queue()
+    for image_index in range(recipe.num_images):
+        image_indices.put(image_index)
+
+    num_feature_generation_workers = min(
+        synth_chain_config.num_feature_generation_workers, recipe.num_images)
+    for _ in range(num_feature_generation_workers):
+        image_indices.put(None)
+
+    # The workers don't run in Hydra, so they need to be told, where the run was
+    # started, to resolve relative paths (e.g. `synth_chain.cache_root`).
+    run_context = get_run_context()
+    feature_generation_workers = [
+        context.Process(target=_run_feature_generation_worker,
+                        args=(image_recipes, image_indices, render_queue,
+                              run_context))
+        for _ in range(num_feature_generation_workers)
+    ]
+    render_workers = [
+        context.Process(target=_run_render_worker,
+                        args=(image_recipes, render_queue, run_context))
+        for _ in range(synth_chain_config.num_render_workers)
+    ]
+
+    logger.info("Rendering %d images with %d feature generation workers and %d "
+                "render workers...", recipe.num_images,
+                len(feature_generation_workers), len(render_workers))
+
+    start_time = time.perf_counter()
+    try:
+        for worker in feature_generation_workers + render_workers:
+            worker.start()
+
+        _join_workers(feature_generation_workers, feature_generation_workers +
+                      render_workers)
+        render_queue.close(len(render_workers))
+        _join_workers(render_workers, render_workers)
+    finally:
+        for worker in feature_generation_workers + render_workers:
+            if worker.is_alive():
+                worker.terminate()
+
+        if is_temporary_spool:
+            shutil.rmtree(spool_root, ignore_errors=True)
+
+    log_stage_stats(render_queue.collect_stats(), time.perf_counter() - start_time)
+
+
+def _join_workers(workers: Sequence[BaseProcess],
+                  all_workers: Sequence[BaseProcess]) -> None:
+    """Wait for workers to finish. Fails early, if any worker failed, since the others
+    might wait for it forever."""
+    while any(worker.is_alive() for worker in workers):
+        for worker in all_workers:
+            if worker.exitcode not in (None, 0):
+                raise RuntimeError(
+                    f"Worker {worker.name} failed with exit code {worker.exitcode}.")
+        time.sleep(0.5)
+
+    for worker in workers:
+        if worker.exitcode != 0:
+            raise RuntimeError(
+                f"Worker {worker.name} failed with exit code {worker.exitcode}.")
+
+
+def _set_up_worker(run_context: RunContext) -> RegistrySnapshot:
+    logging.basicConfig(level=logging.INFO,
+                        format="[%(asctime)s][%(processName)s] %(message)s")
+    set_run_context(run_context)
+    clean_up_previous_run()
+    setup_run()
+    return snapshot_all_registries()
+
+
+def _run_feature_generation_worker(image_recipes: List[DictConfig],
+                                   image_indices: "multiprocessing.Queue",
+                                   render_queue: RenderQueue,
+                                   run_context: RunContext) -> None:
+    registry_snapshot = _set_up_worker(run_context)
+    stats = StageStats(num_workers=1)
+
+    while True:
+        start_time = time.perf_counter()
+        image_index = image_indices.get()
+        stats.wait_time += time.perf_counter() - start_time
+
+        if image_index is None:
+            break
+
+        clean_up_previous_image(registry_snapshot)
+
+        start_time = time.perf_counter()
+        image_recipe = image_recipes[image_index]
+        with working_directory(Path(f"image{image_index}")):
+            recipe_instantiated = hydra.utils.instantiate(image_recipe)
+            runtime_state = recipe_instantiated.execute_feature_generation(
+                image_recipe)
+        stats.wait_time += render_queue.put(image_index, runtime_state)
+        stats.busy_time += time.perf_counter() - start_time
+        stats.num_items += 1
+
+    # The time spent waiting for free space in the queue is not busy time.
+    stats.busy_time -= stats.wait_time
+    render_queue.report_stats("feature_generation", stats)
+
+
+def _run_render_worker(image_recipes: List[DictConfig], render_queue: RenderQueue,
+                       run_context: RunContext) -> None:
+    registry_snapshot = _set_up_worker(run_context)
+    stats = StageStats(num_workers=1)
+
+    while True:
+        job, wait_time = render_queue.get()
+        stats.wait_time += wait_time
+
+        if job is None:
+            break
+
+        clean_up_previous_image(registry_snapshot)
+
+        start_time = time.perf_counter()
+        image_recipe = image_recipes[job.image_index]
+        with working_directory(Path(f"image{job.image_index}")):
+            recipe_instantiated = hydra.utils.instantiate(image_recipe)
+            runtime_state = render_queue.load(job)
+            recipe_instantiated.execute_rendering(runtime_state, image_recipe)
+        stats.busy_time += time.perf_counter() - start_time
+        stats.num_items += 1
+
+    render_queue.report_stats("rendering", stats)
+
+
 @hydra.main(config_path=".", config_name="BaseRecipe")
 def execute_recipe(recipe: Recipe) -> None:
 
     clean_up_previous_run()
+    set_run_context(create_run_context())
 
+    wandb_run = None
     if "WANDB_API_KEY" in os.environ:
-        wandb.init(
+        # Imported here, since wandb is slow to import and only needed for logging.
+        import wandb    # pylint: disable=import-outside-toplevel
+
+        wandb_run = wandb.init(
             project=HydraConfig.get().job.config_name,    #type: ignore
             group=Path(os.getcwd()).parent.name,
             config=OmegaConf.to_container(recipe, resolve=True),    # type: ignore
@@ -82,10 +364,9 @@ def execute_recipe(recipe: Recipe) -> None:
 
     setup_run()
     parse_recipe(recipe)
-    recipe_instantiated = hydra.utils.instantiate(recipe)
-    recipe_instantiated.execute()
+    execute_images(recipe)    # type: ignore
 
     logger.info("Finished run.\n")
 
-    if wandb.run is not None:
-        wandb.run.finish()
+    if wandb_run is not None:
+        wandb_run.finish()
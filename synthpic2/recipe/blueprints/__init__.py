@@ -4,8 +4,9 @@ from .blueprints import MeasurementTechnique
 from .blueprints import MeasurementTechniqueBlueprint
 from .blueprints import Particle
 from .blueprints import ParticleBlueprint
+from .blueprints import remove_all_particles
 
 __all__ = [
     "MeasurementTechniqueBlueprint", "ParticleBlueprint", "Particle",
-    "MeasurementTechnique"
+    "MeasurementTechnique", "remove_all_particles"
 ]
@@ -12,6 +12,7 @@ from synthpic2.recipe.prototypes.prototypes import MaterialPrototype
 
 from ...blender.utilities import adapt_interface_iors
 from ...blender.utilities import create_collection
+from ...blender.utilities import delete
 from ...blender.utilities import duplicate_and_assign_material
 from ...blender.utilities import duplicate_and_link_object
 from ...blender.utilities import get_collection
@@ -182,7 +183,16 @@ class MeasurementTechniqueBlueprint(_Blueprint):
     def invoke(self) -> None:
         """Load a `measurement_technique_prototype`, assign a
             `measurement_volume_material_prototype` and optionally assign a
-            `background_material_prototype`."""
+            `background_material_prototype`.
+
+            If the measurement technique has already been invoked (e.g. for a previous
+            image of the same run), then it is kept and only associated with this
+            blueprint."""
+        existing_measurement_technique = MEASUREMENT_TECHNIQUE_REGISTRY[self.name]
+        if existing_measurement_technique is not None:
+            existing_measurement_technique.blueprint = self
+            return
+
         self.measurement_technique_prototype.initialize()
 
         measurement_technique = MeasurementTechnique(name=self.name, blueprint=self)
@@ -288,3 +298,26 @@ class MeasurementTechnique(_InvokedObject):
 
         self.add_features(material_prototype.features)
         self.update_feature_blender_links(renaming_maps)
+
+
+def remove_all_particles() -> None:
+    """Delete all particles, including their Blender objects and the data blocks (e.g.
+    meshes and materials) that are no longer used afterwards. The measurement technique
+    and appended prototypes are kept."""
+    particle_object_names = {particle.name for particle in PARTICLE_REGISTRY}
+
+    particle_collection_name = "Particles"
+    if particle_collection_name in bpy.data.collections:
+        particle_collection = get_collection(particle_collection_name)
+        particle_object_names.update(
+            object_.name for object_ in particle_collection.all_objects)
+
+    for object_name in particle_object_names:
+        if object_name in bpy.data.objects:
+            delete(bpy.data.objects[object_name])
+
+    bpy.ops.outliner.orphans_purge(do_local_ids=True,
+                                   do_linked_ids=True,
+                                   do_recursive=True)
+
+    PARTICLE_REGISTRY.clear()
@@ -7,7 +7,6 @@ from typing import Any, Tuple
 import attr
 import numpy as np
 from omegaconf import MISSING
-from trimesh import sample as trimesh_sample
 
 from ...blender.utilities import convert_blender_object_to_trimesh
 from ...blender.utilities import get_object
@@ -42,6 +41,9 @@ class UniformlyRandomLocationInMeasurementVolume(Variability):
     """Return a uniformly random coordinate location inside the MeasurementVolume."""
 
     def __call__(self) -> Tuple[float, float, float]:
+        # Imported here, since trimesh is slow to import.
+        from trimesh import sample as trimesh_sample    # pylint: disable=import-outside-toplevel
+
         measurement_volume = get_object("MeasurementVolume")
 
         mesh = convert_blender_object_to_trimesh(measurement_volume)
@@ -1,6 +1,7 @@
 """Home of the Feature class."""
 
 from dataclasses import dataclass
+import functools
 import re
 from typing import Any, Dict, Literal, Optional
 
@@ -25,6 +26,10 @@ __all__ = ["Feature"]
 InterfaceType = Literal["dictionary", "list/tuple", "attribute"]
 KeyType = str | int
 
+#  Matches `.abc` or `["abc"]` or `[123]`
+_BLENDER_LINK_PATTERN = re.compile(r"(?:\.(\w+))|(?:\[\"([^\"]+)\"\])|(?:\[(\d+)])")
+
+
 @dataclass
 class Feature:
     """This class allows to get and set feature values. These features can either be
@@ -64,34 +69,16 @@ class Feature:
             self.blender_link = self.blender_link.replace("'", '"')
 
     def _parse_blender_link(self) -> tuple[Any, InterfaceType, KeyType]:
-        """Extract the attributes from blender_link and assign it to value.
+        """Resolve the parent node of blender_link and the data type (attribute,
+        dictionary or list/tuple) and key of the final node. The link is only parsed
+        once (see `_BlenderLinkResolver`).
 
         https://regex101.com/r/k5ClC9/1
         """
 
         assert isinstance(self.blender_link, str)
 
-        #  Matches `.abc` or `["abc"]` or `[123]`
-        regex = r"(?:\.(\w+))|(?:\[\"([^\"]+)\"\])|(?:\[(\d+)])"
-
-        matches = list(re.finditer(regex, self.blender_link))
-
-        parent_node = bpy
-
-        for match in matches[:-1]:
-            interface, key = self._parse_node_interface_and_key(match)
-
-            parent_node = self._get_node_value(parent_node, interface, key)
-
-        final_node = parent_node
-
-        # Check, what data type the final node belongs to (attribute, dictionary or
-        # list/tuple).
-        final_match = matches[-1]
-        final_interface, final_key = \
-            self._parse_node_interface_and_key(final_match)
-
-        return final_node, final_interface, final_key
+        return _compile_blender_link(self.blender_link).resolve()
 
     @staticmethod
     def _get_node_value(node: Any, interface: InterfaceType, key: KeyType) -> Any:
@@ -194,3 +181,37 @@ class Feature:
                 replace_term = f'{blender_link_root}{blender_module_name}["{new_name}"].'
 
                 self.blender_link = self.blender_link.replace(search_term, replace_term)
+
+
+class _BlenderLinkResolver:
+    """Compiled blender link, which resolves the parent node and the data type and key
+    of the final node of the link.
+
+    The link is parsed once, but the nodes are resolved from `bpy` on every access.
+    References to data blocks are not kept, since Blender invalidates them, when data
+    blocks are removed or blend files are loaded.
+
+    Args:
+        blender_link (str): Blender link (e.g. `bpy.data.objects["Cube"].location`).
+    """
+
+    # pylint: disable=protected-access
+
+    def __init__(self, blender_link: str) -> None:
+        self.nodes = [
+            Feature._parse_node_interface_and_key(match)
+            for match in _BLENDER_LINK_PATTERN.finditer(blender_link)
+        ]
+
+    def resolve(self) -> tuple[Any, InterfaceType, KeyType]:
+        parent_node: Any = bpy
+        for interface, key in self.nodes[:-1]:
+            parent_node = Feature._get_node_value(parent_node, interface, key)
+
+        final_interface, final_key = self.nodes[-1]
+        return parent_node, final_interface, final_key
+
+
+@functools.lru_cache(maxsize=2**16)
+def _compile_blender_link(blender_link: str) -> _BlenderLinkResolver:
+    return _BlenderLinkResolver(blender_link)
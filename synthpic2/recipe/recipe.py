@@ -5,6 +5,7 @@ from dataclasses import field
 from typing import Any, Dict, List, Optional
 
 import attr
+from omegaconf import DictConfig
 from omegaconf import MISSING
 
 from ..utilities import get_object_md5
@@ -13,6 +14,7 @@ from .blueprints.blueprints import ParticleBlueprint
 from .process_conditions.feature_variability import FeatureVariability
 from .process_conditions.sets import Set
 from .synth_chain import SynthChain
+from .synth_chain.checkpoint import StepFingerprints
 from .synth_chain.state import RuntimeState
 
 
@@ -85,10 +87,59 @@ class Recipe:
     blueprints: Blueprints = Blueprints()
     process_conditions: ProcessConditions = ProcessConditions()
     synth_chain: SynthChain = SynthChain()
+    # Number of images that are synthesized in a single run, using the seeds
+    # `initial_runtime_state.seed + i`. If larger than 1, then the outputs of every image
+    # are stored in a subfolder `image<i>`.
+    num_images: int = 1
 
     @property
     def md5(self) -> str:
         return get_object_md5(self)
 
-    def execute(self) -> None:
-        self.synth_chain.execute(self.initial_runtime_state)
+    def execute(self, recipe_config: Optional[DictConfig] = None) -> None:
+        """Execute the recipe.
+
+        Args:
+            recipe_config (Optional[DictConfig], optional): Parsed config, that the
+                recipe has been instantiated from. Required to resume from checkpoints
+                and to execute the rendering steps in parallel. Defaults to None.
+        """
+        self.synth_chain.execute(self.initial_runtime_state,
+                                 _get_step_fingerprints(recipe_config), recipe_config)
+
+    def execute_feature_generation(
+            self,
+            recipe_config: Optional[DictConfig] = None) -> RuntimeState:
+        """Execute only the feature generation steps of the recipe.
+
+        Args:
+            recipe_config (Optional[DictConfig], optional): See `execute`. Defaults to
+                None.
+
+        Returns:
+            RuntimeState: Runtime state after the feature generation.
+        """
+        return self.synth_chain.execute_feature_generation(
+            self.initial_runtime_state, _get_step_fingerprints(recipe_config))
+
+    def execute_rendering(self,
+                          runtime_state: RuntimeState,
+                          recipe_config: Optional[DictConfig] = None) -> None:
+        """Execute only the rendering steps of the recipe, after the result of the
+        feature generation has been restored.
+
+        Args:
+            runtime_state (RuntimeState): Runtime state after the feature generation.
+            recipe_config (Optional[DictConfig], optional): See `execute`. Defaults to
+                None.
+        """
+        self.synth_chain.execute_rendering(runtime_state,
+                                           _get_step_fingerprints(recipe_config),
+                                           recipe_config)
+
+
+def _get_step_fingerprints(
+        recipe_config: Optional[DictConfig]) -> Optional[StepFingerprints]:
+    if recipe_config is None:
+        return None
+    return StepFingerprints.from_recipe_config(recipe_config)
@@ -6,7 +6,7 @@ __all__ = [
     "MEASUREMENT_TECHNIQUE_PROTOTYPE_REGISTRY", "MEASUREMENT_TECHNIQUE_REGISTRY",
     "PARTICLE_BLUEPRINT_REGISTRY", "PARTICLE_REGISTRY", "Registry",
     "SelfRegisteringAttrsMixin", "SET_REGISTRY", "STATE_REGISTRY", "REGISTRIES",
-    "clear_all_registries"
+    "clear_all_registries", "restore_all_registries", "snapshot_all_registries"
 ]
 
 from .registries import clear_all_registries
@@ -20,7 +20,9 @@ from .registries import MEASUREMENT_TECHNIQUE_REGISTRY
 from .registries import PARTICLE_BLUEPRINT_REGISTRY
 from .registries import PARTICLE_REGISTRY
 from .registries import REGISTRIES
+from .registries import restore_all_registries
 from .registries import SET_REGISTRY
+from .registries import snapshot_all_registries
 from .registries import STATE_REGISTRY
 from .registry import Registry
 from .self_registering_attrs_mixin import SelfRegisteringAttrsMixin
@@ -1,5 +1,7 @@
 """Module that holds all the registries required by synthPIC2."""
 
+from typing import Any, Dict, List, Optional
+
 from .measurement_technique_registry import MeasurementTechniqueRegistry
 from .registry import Registry
 
@@ -32,6 +34,30 @@ REGISTRIES = [
     STATE_REGISTRY,
 ]
 
+RegistrySnapshot = Dict[Optional[str], List[Any]]
+
+
 def clear_all_registries() -> None:
     for registry in REGISTRIES:
         registry.clear()
+
+
+def snapshot_all_registries() -> RegistrySnapshot:
+    """Take a snapshot of the items of all registries.
+
+    Returns:
+        RegistrySnapshot: Mapping of registry names to (shallow copies of) their items.
+    """
+    return {registry.name: list(registry.items) for registry in REGISTRIES}
+
+
+def restore_all_registries(snapshot: RegistrySnapshot) -> None:
+    """Reset all registries to a previously taken snapshot. Items that were registered
+    after the snapshot was taken are removed.
+
+    Args:
+        snapshot (RegistrySnapshot): Snapshot, as returned by
+            `snapshot_all_registries`.
+    """
+    for registry in REGISTRIES:
+        registry.items = list(snapshot.get(registry.name, []))
@@ -0,0 +1,258 @@
+"""Module for checkpoints, which allow to resume the execution of a synth chain."""
+
+import os
+from pathlib import Path
+import pickle
+import random
+import shutil
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+
+import attr
+import numpy as np
+from omegaconf import DictConfig
+from omegaconf import OmegaConf
+
+from ...custom_types import AnyPath
+from ...utilities import get_object_md5
+from ..blueprints import MeasurementTechnique
+from ..blueprints import Particle
+from ..prototypes import Feature
+from ..registries import MEASUREMENT_TECHNIQUE_BLUEPRINT_REGISTRY
+from ..registries import MEASUREMENT_TECHNIQUE_REGISTRY
+from ..registries import PARTICLE_BLUEPRINT_REGISTRY
+from ..registries import PARTICLE_REGISTRY
+from ..registries import Registry
+from ..registries import STATE_REGISTRY
+from .state import RuntimeState
+from .state import State
+
+InvokedObject = Union[Particle, MeasurementTechnique]
+
+# Classes of invoked objects, with the registries of their blueprints.
+_INVOKED_OBJECT_CLASSES: Dict[str, Tuple[Type[InvokedObject], Registry]] = {
+    "Particle": (Particle, PARTICLE_BLUEPRINT_REGISTRY),
+    "MeasurementTechnique":
+        (MeasurementTechnique, MEASUREMENT_TECHNIQUE_BLUEPRINT_REGISTRY),
+}
+
+
+@attr.s(auto_attribs=True)
+class StepFingerprints:
+    """Fingerprints of the steps of a synth chain. The fingerprint of a step depends on
+    the config of the step, the configs of all previous steps, the configs of the
+    feature variabilities that these steps refer to, the blueprints, the feature
+    criteria, the sets and the initial runtime state (i.e. the seed). Feature
+    variabilities that are only used by later steps do not alter the fingerprint, so
+    that e.g. varying a measurement technique feature doesn't change the fingerprint of
+    the steps before its `TriggerFeatureUpdate`.
+
+    Attributes:
+        feature_generation (List[str]): Fingerprints of the feature generation steps.
+        rendering (List[str]): Fingerprints of the rendering steps.
+    """
+    feature_generation: List[str]
+    rendering: List[str]
+
+    @classmethod
+    def from_recipe_config(cls, recipe_config: DictConfig) -> "StepFingerprints":
+        """Calculate the step fingerprints of a (parsed) recipe config.
+
+        Args:
+            recipe_config (DictConfig): Recipe config.
+
+        Returns:
+            StepFingerprints: Fingerprints of the steps of the synth chain.
+        """
+        process_conditions_config = recipe_config.process_conditions
+
+        fingerprint = get_object_md5({
+            "blueprints":
+                _to_container(recipe_config.blueprints),
+            "feature_criteria":
+                _to_container(process_conditions_config.get("feature_criteria")),
+            "sets":
+                _to_container(process_conditions_config.get("sets")),
+            "initial_runtime_state":
+                _to_container(recipe_config.initial_runtime_state),
+        })
+
+        feature_variabilities_config = process_conditions_config.get(
+            "feature_variabilities") or {}
+
+        def get_step_fingerprint(previous_fingerprint: str, step_config: Any) -> str:
+            step_data = {"step": _to_container(step_config)}
+
+            feature_variability_name = step_config.get("feature_variability_name")
+            if feature_variability_name is not None:
+                step_data["feature_variability"] = _to_container(
+                    feature_variabilities_config.get(feature_variability_name))
+
+            return get_object_md5([previous_fingerprint, step_data])
+
+        synth_chain_config = recipe_config.synth_chain
+
+        feature_generation_fingerprints = []
+        for step_config in synth_chain_config.feature_generation_steps:
+            fingerprint = get_step_fingerprint(fingerprint, step_config)
+            feature_generation_fingerprints.append(fingerprint)
+
+        rendering_fingerprints = []
+        for step_config in synth_chain_config.rendering_steps:
+            fingerprint = get_step_fingerprint(fingerprint, step_config)
+            rendering_fingerprints.append(fingerprint)
+
+        return cls(feature_generation=feature_generation_fingerprints,
+                   rendering=rendering_fingerprints)
+
+
+def _to_container(config: Any) -> Any:
+    if OmegaConf.is_config(config):
+        return OmegaConf.to_container(config, resolve=True)
+    return config
+
+
+@attr.s(auto_attribs=True)
+class _InvokedObjectRecord:
+    """Everything that is needed to recreate an invoked object, apart from its
+    Blender data."""
+    class_name: str
+    name: str
+    blueprint_name: str
+    features: List[Feature]
+
+    @classmethod
+    def from_invoked_object(cls,
+                            invoked_object: InvokedObject) -> "_InvokedObjectRecord":
+        return cls(class_name=type(invoked_object).__name__,
+                   name=invoked_object.name,
+                   blueprint_name=invoked_object.blueprint.name,
+                   features=list(invoked_object.features))
+
+    def restore(self) -> None:
+        invoked_object_class, blueprint_registry = _INVOKED_OBJECT_CLASSES[
+            self.class_name]
+
+        blueprint = blueprint_registry.query(self.blueprint_name, strict=True)
+        invoked_object = invoked_object_class(name=self.name, blueprint=blueprint)
+
+        invoked_object.features.clear()
+        for feature in self.features:
+            invoked_object.features.register(feature)
+
+
+@attr.s(auto_attribs=True)
+class Checkpoint:
+    """Class to save and restore everything that is needed to resume a synth chain:
+    the Blender state, the runtime state, the invoked objects (i.e. particles and
+    measurement technique), the registered states and the states of the random number
+    generators.
+
+    Temporary states (see `State`) only exist as long as the process, that created
+    them, so their files are copied into the checkpoint and into new temporary folders,
+    when the checkpoint is restored.
+    """
+    name: str
+    file_root: AnyPath
+
+    def __attrs_post_init__(self) -> None:
+        self.file_root = Path(self.file_root)
+        self._python_state_file_path = (self.file_root / f"{self.name}.pkl").absolute()
+        self._states_root = (self.file_root / f"{self.name}_states").absolute()
+
+    def exists(self) -> bool:
+        # The python state is written last, so the checkpoint is only complete, if it
+        # exists.
+        return self._python_state_file_path.exists()
+
+    def save(self, runtime_state: RuntimeState) -> None:
+        """Save a checkpoint of the current state.
+
+        Args:
+            runtime_state (RuntimeState): Current runtime state.
+        """
+        state = self._get_state(runtime_state)
+        state.save_to_disk()
+        state.unregister()
+
+        invoked_objects = list(MEASUREMENT_TECHNIQUE_REGISTRY) + list(PARTICLE_REGISTRY)
+
+        python_state = {
+            "invoked_objects": [
+                _InvokedObjectRecord.from_invoked_object(invoked_object)
+                for invoked_object in invoked_objects
+            ],
+            "states": [
+                self._save_registered_state(registered_state)
+                for registered_state in STATE_REGISTRY
+            ],
+            "numpy_random_state": np.random.get_state(),
+            "python_random_state": random.getstate(),
+        }
+
+        temporary_file_path = self._python_state_file_path.with_suffix(".pkl.tmp")
+        with open(temporary_file_path, "wb") as python_state_file:
+            pickle.dump(python_state, python_state_file)
+        os.replace(temporary_file_path, self._python_state_file_path)
+
+    def load(self) -> RuntimeState:
+        """Restore the state of the checkpoint.
+
+        Returns:
+            RuntimeState: Runtime state of the checkpoint.
+        """
+        with open(self._python_state_file_path, "rb") as python_state_file:
+            python_state = pickle.load(python_state_file)
+
+        state = self._get_state(RuntimeState())
+        state.load_from_disk()
+        state.unregister()
+
+        PARTICLE_REGISTRY.clear()
+        MEASUREMENT_TECHNIQUE_REGISTRY.clear()
+
+        for invoked_object_record in python_state["invoked_objects"]:
+            invoked_object_record.restore()
+
+        for name, runtime_state, file_root in python_state["states"]:
+            if name not in STATE_REGISTRY:
+                self._restore_registered_state(name, runtime_state, file_root)
+
+        np.random.set_state(python_state["numpy_random_state"])
+        random.setstate(python_state["python_random_state"])
+
+        return state.runtime_state
+
+    def delete(self) -> None:
+        state = self._get_state(RuntimeState())
+        state.delete()
+        self._python_state_file_path.unlink(missing_ok=True)
+        shutil.rmtree(self._states_root, ignore_errors=True)
+
+    def _save_registered_state(
+            self, state: State) -> Tuple[Optional[str], RuntimeState, Optional[Path]]:
+        assert isinstance(state.file_root, Path)
+        if not state.is_temporary:
+            return state.name, state.runtime_state, state.file_root
+
+        self._states_root.mkdir(parents=True, exist_ok=True)
+        for file_path in state.file_paths:
+            if file_path.exists():
+                shutil.copy2(file_path, self._states_root / file_path.name)
+
+        return state.name, state.runtime_state, None
+
+    def _restore_registered_state(self, name: str, runtime_state: RuntimeState,
+                                  file_root: Optional[Path]) -> None:
+        state = State(name=name, runtime_state=runtime_state, file_root=file_root)
+        if not state.is_temporary:
+            return
+
+        for file_path in state.file_paths:
+            checkpoint_file_path = self._states_root / file_path.name
+            if checkpoint_file_path.exists():
+                shutil.copy2(checkpoint_file_path, file_path)
+
+    def _get_state(self, runtime_state: RuntimeState) -> State:
+        return State(name=self.name,
+                     runtime_state=runtime_state,
+                     file_root=self.file_root)
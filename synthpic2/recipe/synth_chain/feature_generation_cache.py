@@ -0,0 +1,195 @@
+"""Module for the FeatureGenerationCache class."""
+
+import json
+import logging
+import os
+from pathlib import Path
+import shutil
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import uuid
+
+import attr
+
+from ...custom_types import AnyPath
+from ...utilities import file_lock
+from .checkpoint import Checkpoint
+from .state import RuntimeState
+
+_CHECKPOINT_NAME = "checkpoint"
+
+
+@attr.s(auto_attribs=True)
+class FeatureGenerationCache:
+    """Content-addressed on-disk cache of the results of feature generation steps,
+    which can be shared between the jobs of a sweep.
+
+    Every entry is a `Checkpoint`, stored under the fingerprint of the step after which
+    it was taken (see `StepFingerprints`). Entries are evicted based on the time of
+    their last use, if they are older than `max_age_days` or if the cache exceeds
+    `max_size_gb`.
+
+    Attributes:
+        root (AnyPath): Root folder of the cache.
+        max_size_gb (Optional[float]): Maximum size of the cache in gigabytes. `None`
+            means unlimited.
+        max_age_days (Optional[float]): Maximum time since the last use of an entry in
+            days. `None` means unlimited.
+    """
+    root: AnyPath
+    max_size_gb: Optional[float] = None
+    max_age_days: Optional[float] = None
+
+    def __attrs_post_init__(self) -> None:
+        self.root = Path(self.root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        self._stats_file_path = self.root / "stats.json"
+        self._lock_file_path = self.root / ".lock"
+        self._temporary_root = self.root / "tmp"
+
+    def lookup(self, keys: Sequence[str]) -> Tuple[int, Optional[RuntimeState]]:
+        """Restore the entry of the longest prefix of steps, that is in the cache.
+
+        Args:
+            keys (Sequence[str]): Fingerprints of all feature generation steps.
+
+        Returns:
+            Tuple[int, Optional[RuntimeState]]: Number of steps whose results were
+                restored and the restored runtime state (`None` for a cache miss).
+        """
+        logger = logging.getLogger("synthPIC2")
+
+        for index in reversed(range(len(keys))):
+            entry_path = self._get_entry_path(keys[index])
+            checkpoint = Checkpoint(name=_CHECKPOINT_NAME, file_root=entry_path)
+
+            if not checkpoint.exists():
+                continue
+
+            try:
+                # Hold the lock, so that the entry can't be evicted while loading.
+                with file_lock(self._lock_file_path):
+                    # Mark as recently used.
+                    os.utime(entry_path)
+                    runtime_state = checkpoint.load()
+            except FileNotFoundError:
+                # The entry was evicted by another process in the meantime.
+                continue
+
+            self._update_stats(hits=1)
+            logger.info("Feature generation cache hit after %d steps.", index + 1)
+            return index + 1, runtime_state
+
+        self._update_stats(misses=1)
+        logger.info("Feature generation cache miss.")
+        return 0, None
+
+    def contains(self, key: str) -> bool:
+        entry_path = self._get_entry_path(key)
+        return Checkpoint(name=_CHECKPOINT_NAME, file_root=entry_path).exists()
+
+    def store(self, key: str, runtime_state: RuntimeState) -> None:
+        """Store the current state in the cache.
+
+        Args:
+            key (str): Fingerprint of the last executed step.
+            runtime_state (RuntimeState): Current runtime state.
+        """
+        if self.contains(key):
+            return
+
+        # Write to a temporary folder first and move it into place afterwards, so that
+        # other processes never see incomplete entries.
+        temporary_entry_path = self._temporary_root / uuid.uuid4().hex
+        Checkpoint(name=_CHECKPOINT_NAME,
+                   file_root=temporary_entry_path).save(runtime_state)
+
+        entry_path = self._get_entry_path(key)
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+
+        try:
+            os.rename(temporary_entry_path, entry_path)
+        except OSError:
+            # Another process stored the same entry in the meantime.
+            shutil.rmtree(temporary_entry_path, ignore_errors=True)
+            return
+
+        self._update_stats(stores=1)
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove entries that exceed the maximum age and the least recently used
+        entries, until the cache is smaller than its maximum size."""
+        if self.max_age_days is None and self.max_size_gb is None:
+            return
+
+        with file_lock(self._lock_file_path):
+            entries = sorted(self._get_entries(), key=lambda entry: entry[1])
+            entries_to_remove: List[Path] = []
+
+            if self.max_age_days is not None:
+                max_last_use_time = time.time() - self.max_age_days * 24 * 60 * 60
+                entries_to_remove += [
+                    entry_path for entry_path, last_use_time, _ in entries
+                    if last_use_time < max_last_use_time
+                ]
+                entries = [
+                    entry for entry in entries if entry[0] not in entries_to_remove
+                ]
+
+            if self.max_size_gb is not None:
+                max_size = self.max_size_gb * 1024**3
+                total_size = sum(size for _, _, size in entries)
+
+                for entry_path, _, size in entries:
+                    if total_size <= max_size:
+                        break
+                    entries_to_remove.append(entry_path)
+                    total_size -= size
+
+            for entry_path in entries_to_remove:
+                shutil.rmtree(entry_path, ignore_errors=True)
+
+        if entries_to_remove:
+            self._update_stats(evictions=len(entries_to_remove))
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Number of hits, misses, stores and evictions of the cache."""
+        with file_lock(self._lock_file_path):
+            return self._read_stats()
+
+    def _get_entry_path(self, key: str) -> Path:
+        assert isinstance(self.root, Path)
+        return self.root / key[:2] / key
+
+    def _get_entries(self) -> Iterator[Tuple[Path, float, int]]:
+        """Yield the path, the last use time and the size of all entries."""
+        assert isinstance(self.root, Path)
+        for entry_path in self.root.glob("??/*"):
+            try:
+                last_use_time = entry_path.stat().st_mtime
+                # The files of saved states are stored in subfolders.
+                size = sum(file_path.stat().st_size
+                           for file_path in entry_path.rglob("*")
+                           if file_path.is_file())
+            except FileNotFoundError:
+                continue
+            yield entry_path, last_use_time, size
+
+    def _read_stats(self) -> Dict[str, int]:
+        stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        if self._stats_file_path.exists():
+            with open(self._stats_file_path, "r", encoding="utf-8") as stats_file:
+                stats.update(json.load(stats_file))
+        return stats
+
+    def _update_stats(self, **increments: int) -> None:
+        with file_lock(self._lock_file_path):
+            stats = self._read_stats()
+            for name, increment in increments.items():
+                stats[name] += increment
+
+            with open(self._stats_file_path, "w", encoding="utf-8") as stats_file:
+                json.dump(stats, stats_file, indent=2)
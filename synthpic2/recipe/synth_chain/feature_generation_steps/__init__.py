@@ -1,6 +1,8 @@
 """Module for SynthChainSteps."""
 
-from .agglomeration.agglomerate_particles import AgglomerateParticles
+import importlib
+from typing import Any
+
 from .invocation import InvokeBlueprints
 from .relax_collisions import RelaxCollisions
 from .state import LoadState
@@ -15,3 +17,16 @@ __all__ = [
     "AgglomerateParticles",
     "DistributeInMeasurementVolume",
 ]
+
+# Steps, whose modules are only imported when they are used, since their dependencies
+# (e.g. trimesh) are slow to import.
+_LAZY_STEPS = {
+    "AgglomerateParticles": ".agglomeration.agglomerate_particles",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_STEPS:
+        module = importlib.import_module(_LAZY_STEPS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
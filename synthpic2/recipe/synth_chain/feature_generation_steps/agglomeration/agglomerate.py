@@ -8,7 +8,6 @@ from typing import Optional, TypeVar
 
 import bpy
 import mathutils    # type: ignore
-import matplotlib.pyplot as plt
 import numpy as np
 import trimesh
 
@@ -101,6 +100,10 @@ class Agglomerate:
 
     def plot(self) -> None:
         """Plot the mesh of the agglomerate (including its descendants)."""
+        # Imported here, since matplotlib is slow to import and only needed for
+        # debugging.
+        import matplotlib.pyplot as plt    # pylint: disable=import-outside-toplevel
+
         mesh = self.mesh
         ax = plt.gca()
         xs = mesh.vertices[:, 0]
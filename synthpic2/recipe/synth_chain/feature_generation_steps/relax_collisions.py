@@ -1,7 +1,6 @@
 """Module for RelaxCollisions synth chain step."""
 
 import attr
-import trimesh
 import bpy
 import mathutils    # type: ignore  # this is made available by the bpy module
 import uuid
@@ -65,23 +64,29 @@ class RelaxCollisions(SetBasedMixin, FeatureGenerationStep):
     dry_run: bool = False
 
     def __call__(self, runtime_state: RuntimeState) -> RuntimeState:
+        # Imported here, since trimesh is slow to import.
+        from trimesh import util as trimesh_util    # pylint: disable=import-outside-toplevel
 
         # Damping is a convenience parameter that sets both angular and linear damping
         # in Blender and has no effect on the simulation if only the damping parameter
-        # is available.
-        if self.damping is None:
-            self.damping = 0.9999999
+        # is available. The resolved values are kept in local variables, so that the
+        # step can be executed multiple times.
+        damping = self.damping
+        if damping is None:
+            damping = 0.9999999
         else:
             if self.angular_damping is not None or self.linear_damping is not None:
                 raise ValueError(
                     "Either damping or angular_damping/translation_damping can be"
                     " set, but not both.")
 
-        if self.angular_damping is None:
-            self.angular_damping = self.damping
+        angular_damping = self.angular_damping
+        if angular_damping is None:
+            angular_damping = damping
 
-        if self.linear_damping is None:
-            self.linear_damping = self.damping
+        linear_damping = self.linear_damping
+        if linear_damping is None:
+            linear_damping = damping
 
         # TODO: Catch potential blender errors for false string inputs already in Hydra,
         #   probably using Enums.
@@ -148,7 +153,7 @@ class RelaxCollisions(SetBasedMixin, FeatureGenerationStep):
                 convert_blender_object_to_trimesh(descendant)
                 for descendant in descendants
             ]
-            joined_mesh = trimesh.util.concatenate(meshes)
+            joined_mesh = trimesh_util.concatenate(meshes)
             center_of_mass = joined_mesh.center_mass
             del joined_mesh, meshes
 
@@ -174,8 +179,8 @@ class RelaxCollisions(SetBasedMixin, FeatureGenerationStep):
             # Set rigid body properties for center of mass object.
             center_of_mass_object.rigid_body.mass = self.mass
             center_of_mass_object.rigid_body.collision_shape = "COMPOUND"
-            center_of_mass_object.rigid_body.angular_damping = self.angular_damping
-            center_of_mass_object.rigid_body.linear_damping = self.linear_damping
+            center_of_mass_object.rigid_body.angular_damping = angular_damping
+            center_of_mass_object.rigid_body.linear_damping = linear_damping
             center_of_mass_object.rigid_body.use_margin = self.collision_margin > 0
             center_of_mass_object.rigid_body.collision_margin = self.collision_margin
             center_of_mass_object.rigid_body.friction = self.friction
@@ -199,8 +204,8 @@ class RelaxCollisions(SetBasedMixin, FeatureGenerationStep):
                 descendant.rigid_body.mass = self.mass
                 descendant.rigid_body.collision_shape = self.collision_shape.upper()
                 descendant.rigid_body.mesh_source = self.mesh_source.upper()
-                descendant.rigid_body.angular_damping = self.angular_damping
-                descendant.rigid_body.linear_damping = self.linear_damping
+                descendant.rigid_body.angular_damping = angular_damping
+                descendant.rigid_body.linear_damping = linear_damping
                 descendant.rigid_body.use_margin = self.collision_margin > 0
                 descendant.rigid_body.collision_margin = self.collision_margin
                 descendant.rigid_body.friction = self.friction
@@ -0,0 +1,186 @@
+"""Module for the run manifest, which records the provenance of every output file.
+
+The rendering steps append an entry (a JSON object per line) for every file, that they
+write, to the manifest `manifest.jsonl` of the run. Besides the path, the size and the
+MD5 hash of the file, an entry contains the hash of the recipe, the seed, the set
+descriptor, the fingerprint of the state, that the file was rendered from, and the
+durations of the steps.
+
+Usage (concatenate the manifests of a sweep):
+    python -m synthpic2.recipe.synth_chain.manifest output/<config>/<timestamp> \
+        --output manifest.jsonl
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import attr
+from omegaconf import DictConfig
+from omegaconf import OmegaConf
+
+from ...custom_types import AnyPath
+from ...utilities import file_lock
+from ...utilities import get_object_md5
+from ...utilities import resolve_recipe_config
+
+MANIFEST_FILE_NAME = "manifest.jsonl"
+
+_HASH_CHUNK_SIZE = 2**20
+
+
+@attr.s(auto_attribs=True)
+class ManifestContext:
+    """Provenance of the outputs, that is shared by all rendering steps of an image.
+
+    Attributes:
+        recipe_md5 (Optional[str]): Hash of the (resolved) recipe config.
+        state_fingerprint (Optional[str]): Fingerprint of the state after the feature
+            generation (see `StepFingerprints`), that the outputs are rendered from.
+        feature_generation_time (Optional[float]): Wall time of the feature generation
+            steps, that were executed in this process, in seconds.
+    """
+    recipe_md5: Optional[str] = None
+    state_fingerprint: Optional[str] = None
+    feature_generation_time: Optional[float] = None
+
+
+_MANIFEST_CONTEXT = ManifestContext()
+
+
+def get_manifest_context() -> ManifestContext:
+    return _MANIFEST_CONTEXT
+
+
+def set_manifest_context(context: ManifestContext) -> None:
+    global _MANIFEST_CONTEXT
+    _MANIFEST_CONTEXT = context
+
+
+def get_recipe_md5(recipe_config: DictConfig) -> str:
+    """Get the hash of a recipe config, after its interpolations have been resolved.
+    The `hydra` node is ignored.
+
+    Args:
+        recipe_config (DictConfig): Parsed recipe config.
+
+    Returns:
+        str: Hash of the recipe config.
+    """
+    return get_object_md5(OmegaConf.to_container(resolve_recipe_config(recipe_config)))
+
+
+def get_file_md5(file_path: AnyPath) -> str:
+    md5 = hashlib.md5()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(_HASH_CHUNK_SIZE), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def append_to_manifest(manifest_path: AnyPath, entries: Sequence[Dict[str,
+                                                                     Any]]) -> None:
+    """Append entries to a manifest. Processes, that append to the same manifest (e.g.
+    parallel rendering steps), take turns.
+
+    Args:
+        manifest_path (AnyPath): Path of the manifest. It is created, if it does not
+            exist.
+        entries (Sequence[Dict[str, Any]]): JSON serializable entries.
+    """
+    if not entries:
+        return
+
+    manifest_path = Path(manifest_path)
+    lines = "".join(json.dumps(entry, sort_keys=True) + "\n" for entry in entries)
+
+    with file_lock(manifest_path.with_name(f".{manifest_path.name}.lock")):
+        with open(manifest_path, "a", encoding="utf-8") as file:
+            file.write(lines)
+
+
+def read_manifest(manifest_path: AnyPath) -> Iterator[Dict[str, Any]]:
+    """Read the entries of a manifest. Incomplete lines (e.g. of a job, that was
+    killed) are skipped.
+
+    Args:
+        manifest_path (AnyPath): Path of the manifest.
+
+    Yields:
+        Iterator[Dict[str, Any]]: Entries of the manifest.
+    """
+    with open(manifest_path, "r", encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logging.getLogger("synthPIC2").warning(
+                    "Skipping invalid line %d of %s.", line_number, manifest_path)
+
+
+def find_manifests(roots: Sequence[AnyPath]) -> List[Path]:
+    """Find the manifests of the runs in folders (e.g. the output folder of a sweep).
+
+    Args:
+        roots (Sequence[AnyPath]): Folders to search recursively.
+
+    Returns:
+        List[Path]: Paths of the manifests, sorted by path.
+    """
+    return sorted(manifest_path for root in roots
+                  for manifest_path in Path(root).rglob(MANIFEST_FILE_NAME))
+
+
+def concatenate_manifests(manifest_paths: Sequence[AnyPath],
+                          output_path: AnyPath) -> int:
+    """Concatenate manifests (e.g. of all runs of a sweep) into a single manifest.
+
+    Args:
+        manifest_paths (Sequence[AnyPath]): Paths of the manifests.
+        output_path (AnyPath): Path of the concatenated manifest. It is overwritten,
+            if it exists.
+
+    Returns:
+        int: Number of entries of the concatenated manifest.
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    num_entries = 0
+    with open(output_path, "w", encoding="utf-8") as output_file:
+        for manifest_path in manifest_paths:
+            if Path(manifest_path).resolve() == output_path.resolve():
+                continue
+
+            for entry in read_manifest(manifest_path):
+                output_file.write(json.dumps(entry, sort_keys=True) + "\n")
+                num_entries += 1
+
+    return num_entries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Concatenate the manifests of the runs of a sweep.")
+    parser.add_argument("roots",
+                        nargs="+",
+                        type=Path,
+                        help="Folders, that are searched for manifests.")
+    parser.add_argument("--output",
+                        type=Path,
+                        required=True,
+                        help="Path of the concatenated manifest.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    manifest_paths = find_manifests(args.roots)
+    num_entries = concatenate_manifests(manifest_paths, args.output)
+    logging.getLogger("synthPIC2").info("Concatenated %d entries of %d manifests.",
+                                        num_entries, len(manifest_paths))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Module to execute the rendering steps of a synth chain in parallel processes."""
+
+from concurrent.futures import as_completed
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import multiprocessing
+import shutil
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import hydra
+from omegaconf import DictConfig
+from wurlitzer import pipes
+from wurlitzer import STDOUT
+
+from ...utilities import get_run_context
+from ...utilities import resolve_recipe_config
+from ...utilities import RunContext
+from ...utilities import set_run_context
+from .checkpoint import Checkpoint
+from .manifest import ManifestContext
+from .manifest import set_manifest_context
+from .rendering_steps.image_writer import flush_image_writer
+from .rendering_steps.sharding import close_shard_writer
+from .state import RuntimeState
+from .state_storage import create_state_storage
+from .state_storage import get_state_storage
+from .state_storage import set_state_storage
+from .step import SynthChainStep
+from .tracing import StepRecord
+from .tracing import StepTracer
+
+_CHECKPOINT_NAME = "rendering_fan_out"
+
+# Rendering steps and runtime state of a worker process.
+_WORKER_RENDERING_STEPS: Optional[List[SynthChainStep]] = None
+_WORKER_RUNTIME_STATE: Optional[RuntimeState] = None
+
+
+def execute_rendering_steps_in_parallel(
+        recipe_config: DictConfig,
+        runtime_state: RuntimeState,
+        step_indices: Sequence[int],
+        num_workers: int,
+        blender_log_file_name: str,
+        on_step_finished: Optional[Callable[[int], None]] = None,
+        manifest_context: Optional[ManifestContext] = None,
+        trace_origin: Optional[float] = None) -> List[StepRecord]:
+    """Execute rendering steps of a recipe in parallel worker processes.
+
+    Since every rendering step restores the state of the scene after rendering, the
+    rendering steps are independent of each other. The state after the feature
+    generation is saved once as checkpoint, which is restored by every worker. The
+    workers write to the same output folders as the sequential execution. Since they
+    don't run in Hydra, they are given the context of the run (see `RunContext`).
+
+    Args:
+        recipe_config (DictConfig): Parsed config of the recipe, which the workers
+            instantiate to execute its rendering steps.
+        runtime_state (RuntimeState): Runtime state after the feature generation.
+        step_indices (Sequence[int]): Indices of the rendering steps to execute.
+        num_workers (int): Maximum number of worker processes.
+        blender_log_file_name (str): Log file for the output of Blender.
+        on_step_finished (Optional[Callable[[int], None]], optional): Called with the
+            index of every rendering step, after its outputs have been written.
+            Defaults to None.
+        manifest_context (Optional[ManifestContext], optional): Provenance of the
+            outputs for the run manifest. Defaults to None.
+        trace_origin (Optional[float], optional): Origin of the `StepTracer` of the
+            main process, so that the records of the steps share its timeline.
+            Defaults to the start of every step.
+
+    Returns:
+        List[StepRecord]: Records of the resource usage of the steps, in the order of
+            `step_indices`.
+    """
+    logger = logging.getLogger("synthPIC2")
+
+    recipe_config = resolve_recipe_config(recipe_config)
+
+    num_workers = min(num_workers, len(step_indices))
+    logger.info("Executing %d rendering steps with %d workers...", len(step_indices),
+                num_workers)
+
+    records: Dict[int, StepRecord] = {}
+    checkpoint_root = get_state_storage().make_temporary_root()
+    try:
+        Checkpoint(name=_CHECKPOINT_NAME, file_root=checkpoint_root).save(runtime_state)
+
+        # Spawn fresh processes, since Blender can't be forked safely.
+        with ProcessPoolExecutor(max_workers=num_workers,
+                                 mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_set_up_worker,
+                                 initargs=(recipe_config, str(checkpoint_root),
+                                           get_run_context(),
+                                           manifest_context)) as executor:
+            futures = [
+                executor.submit(_execute_rendering_step, index, blender_log_file_name,
+                                trace_origin) for index in step_indices
+            ]
+            for future in as_completed(futures):
+                index, record = future.result()
+                records[index] = record
+                logger.info("Finished rendering step %d.", index)
+
+                if on_step_finished is not None:
+                    on_step_finished(index)
+    finally:
+        shutil.rmtree(checkpoint_root, ignore_errors=True)
+
+    return [records[index] for index in step_indices]
+
+
+def _set_up_worker(recipe_config: DictConfig, checkpoint_root: str,
+                   run_context: RunContext,
+                   manifest_context: Optional[ManifestContext]) -> None:
+    """Instantiate the recipe and restore the state after the feature generation in a
+    worker process."""
+    # pylint: disable=import-outside-toplevel
+    from ...engine import clean_up_previous_run
+    from ...engine import setup_run
+
+    global _WORKER_RENDERING_STEPS
+    global _WORKER_RUNTIME_STATE
+
+    logging.basicConfig(level=logging.INFO,
+                        format="[%(asctime)s][%(processName)s] %(message)s")
+    clean_up_previous_run()
+    setup_run()
+    set_run_context(run_context)
+
+    recipe = hydra.utils.instantiate(recipe_config)
+    synth_chain = recipe.synth_chain
+    set_state_storage(
+        create_state_storage(synth_chain.state_storage,
+                             root=synth_chain.state_storage_root,
+                             compress=synth_chain.compress_states))
+
+    if manifest_context is not None:
+        set_manifest_context(manifest_context)
+
+    _WORKER_RENDERING_STEPS = synth_chain.rendering_steps
+    _WORKER_RUNTIME_STATE = Checkpoint(name=_CHECKPOINT_NAME,
+                                       file_root=checkpoint_root).load()
+
+
+def _execute_rendering_step(index: int, blender_log_file_name: str,
+                            trace_origin: Optional[float]) -> Tuple[int, StepRecord]:
+    """Execute and trace a single rendering step in a worker process. Every step
+    starts from the restored state, since the previous step restored it after
+    rendering."""
+    global _WORKER_RUNTIME_STATE
+    assert _WORKER_RENDERING_STEPS is not None and _WORKER_RUNTIME_STATE is not None
+
+    tracer = StepTracer(origin=trace_origin)
+    rendering_step = _WORKER_RENDERING_STEPS[index]
+
+    with open(blender_log_file_name, "a", encoding="utf-8") as log_file:
+        with pipes(stdout=log_file, stderr=STDOUT):    #type: ignore
+            with tracer.trace(rendering_step, "rendering", index):
+                _WORKER_RUNTIME_STATE = rendering_step(_WORKER_RUNTIME_STATE)
+
+    # The outputs of the step need to be complete, before it is reported as finished.
+    flush_image_writer()
+    close_shard_writer()
+    return index, tracer.records[0]
@@ -0,0 +1,166 @@
+"""Module for the RenderQueue class, which passes the results of the feature generation
+to separate render workers."""
+
+import logging
+from multiprocessing.context import BaseContext
+from pathlib import Path
+import queue
+import time
+from typing import Dict, List, Optional, Tuple
+
+import attr
+
+from ...custom_types import AnyPath
+from .checkpoint import Checkpoint
+from .state import RuntimeState
+
+_CHECKPOINT_NAME = "state"
+
+
+@attr.s(auto_attribs=True)
+class StageStats:
+    """Throughput metrics of the workers of a pipeline stage.
+
+    Attributes:
+        num_workers (int): Number of workers, that reported their metrics.
+        num_items (int): Number of processed images.
+        busy_time (float): Time spent processing images in seconds.
+        wait_time (float): Time spent waiting for the queue in seconds, i.e. for free
+            space (feature generation) or for states to render (rendering).
+    """
+    num_workers: int = 0
+    num_items: int = 0
+    busy_time: float = 0.0
+    wait_time: float = 0.0
+
+    @property
+    def utilization(self) -> float:
+        total_time = self.busy_time + self.wait_time
+        return self.busy_time / total_time if total_time > 0 else 0.0
+
+    def add(self, other: "StageStats") -> None:
+        self.num_workers += other.num_workers
+        self.num_items += other.num_items
+        self.busy_time += other.busy_time
+        self.wait_time += other.wait_time
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class RenderJob:
+    """Result of the feature generation of an image, that waits to be rendered."""
+    image_index: int
+    file_root: str
+
+
+class RenderQueue:
+    """Bounded queue between feature generation workers and render workers, which run
+    in separate processes.
+
+    Feature generation workers save their results as checkpoints (i.e. the Blender
+    state, the invoked objects and the random states) to a spool folder and enqueue
+    them. Render workers restore the checkpoints and run the rendering steps. If
+    `max_queued_states` results are waiting, `put` blocks, so that fast feature
+    generation can't fill up the spool folder.
+
+    Args:
+        spool_root (AnyPath): Folder for the saved states.
+        max_queued_states (int): Maximum number of states, that wait to be rendered.
+        context (BaseContext): Multiprocessing context of the workers.
+    """
+
+    def __init__(self, spool_root: AnyPath, max_queued_states: int,
+                 context: BaseContext):
+        self.spool_root = Path(spool_root).absolute()
+        self.spool_root.mkdir(parents=True, exist_ok=True)
+
+        self._jobs = context.Queue(maxsize=max_queued_states)
+        self._stats = context.Queue()
+
+    def put(self, image_index: int, runtime_state: RuntimeState) -> float:
+        """Save the current state and enqueue it for rendering. Blocks, while the
+        queue is full.
+
+        Args:
+            image_index (int): Index of the image.
+            runtime_state (RuntimeState): Runtime state after the feature generation.
+
+        Returns:
+            float: Time spent waiting for free space in seconds.
+        """
+        file_root = self.spool_root / f"image{image_index}"
+        Checkpoint(name=_CHECKPOINT_NAME, file_root=file_root).save(runtime_state)
+
+        start_time = time.perf_counter()
+        self._jobs.put(RenderJob(image_index=image_index, file_root=str(file_root)))
+        return time.perf_counter() - start_time
+
+    def get(self) -> Tuple[Optional[RenderJob], float]:
+        """Take the next state to render from the queue. Blocks, while the queue is
+        empty.
+
+        Returns:
+            Tuple[Optional[RenderJob], float]: Next job (`None`, if the queue was
+                closed) and the time spent waiting for it in seconds.
+        """
+        start_time = time.perf_counter()
+        job = self._jobs.get()
+        return job, time.perf_counter() - start_time
+
+    @staticmethod
+    def load(job: RenderJob) -> RuntimeState:
+        """Restore the state of a job and delete it from the spool folder.
+
+        Args:
+            job (RenderJob): Job to restore.
+
+        Returns:
+            RuntimeState: Runtime state after the feature generation.
+        """
+        checkpoint = Checkpoint(name=_CHECKPOINT_NAME, file_root=job.file_root)
+        runtime_state = checkpoint.load()
+        checkpoint.delete()
+
+        try:
+            Path(job.file_root).rmdir()
+        except OSError:
+            pass
+
+        return runtime_state
+
+    def close(self, num_render_workers: int) -> None:
+        """Signal all render workers, that no more states will be enqueued."""
+        for _ in range(num_render_workers):
+            self._jobs.put(None)
+
+    def report_stats(self, stage: str, stats: StageStats) -> None:
+        """Report the metrics of a worker to the process, that owns the queue."""
+        self._stats.put((stage, stats))
+
+    def collect_stats(self) -> Dict[str, StageStats]:
+        """Collect the metrics, that were reported by the workers, by stage."""
+        stats_by_stage: Dict[str, StageStats] = {}
+        while True:
+            try:
+                stage, stats = self._stats.get(timeout=0.1)
+            except queue.Empty:
+                return stats_by_stage
+            stats_by_stage.setdefault(stage, StageStats()).add(stats)
+
+
+def log_stage_stats(stats_by_stage: Dict[str, StageStats], wall_time: float) -> None:
+    """Log the throughput of the pipeline stages, to help sizing the worker pools.
+
+    Args:
+        stats_by_stage (Dict[str, StageStats]): Metrics by stage.
+        wall_time (float): Wall time of the whole pipeline in seconds.
+    """
+    logger = logging.getLogger("synthPIC2")
+    lines: List[str] = []
+    for stage, stats in stats_by_stage.items():
+        throughput = stats.num_items / wall_time * 3600 if wall_time > 0 else 0.0
+        lines.append(
+            f"{stage}: {stats.num_workers} workers, {stats.num_items} images, "
+            f"{throughput:.1f} images/h, {stats.busy_time:.1f} s busy, "
+            f"{stats.wait_time:.1f} s waiting ({stats.utilization:.0%} utilization)")
+
+    logger.info("Render queue statistics:\n%s", "\n".join(lines))
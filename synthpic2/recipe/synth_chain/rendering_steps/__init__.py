@@ -1,11 +1,17 @@
 """Module for SynthChainSteps."""
 
+from .rendering import RenderParticleMasks
 from .rendering import RenderParticlesIndividually
+from .rendering import RenderParticlesTiled
 from .rendering import RenderParticlesTogether
+from .rendering import RenderPassesTogether
 from .state import SaveState
 
 __all__ = [
+    "RenderParticleMasks",
     "RenderParticlesIndividually",
+    "RenderParticlesTiled",
     "RenderParticlesTogether",
+    "RenderPassesTogether",
     "SaveState",
 ]
@@ -0,0 +1,135 @@
+"""Module to export the features of particles to a columnar (Parquet) dataset, which
+accumulates the particles of all images and runs."""
+
+import logging
+import os
+from pathlib import Path
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+from ....utilities import file_lock
+from ....utilities import get_run_context
+from ...blueprints import Particle
+
+_PARTITION_FILE_NAME = "particle_features.parquet"
+_IMAGE_FOLDER_PATTERN = re.compile(r"image(\d+)")
+
+FEATURE_FORMATS = ("csv", "parquet")
+
+
+def collect_particle_features(particles: Sequence[Particle]) -> Dict[str, List[Any]]:
+    """Read the features of particles into columns. Every value is read only once.
+    Array-like values (e.g. locations) are converted to lists.
+
+    Args:
+        particles (Sequence[Particle]): Particles.
+
+    Returns:
+        Dict[str, List[Any]]: Columns by name: the hashes of the particles
+            ("particle_hash") and the values of their features (`None` for particles
+            without the feature).
+    """
+    columns: Dict[str, List[Any]] = {
+        "particle_hash": [particle.md5 for particle in particles]
+    }
+
+    for index, particle in enumerate(particles):
+        for feature in particle.features:
+            column = columns.setdefault(feature.name, [None] * len(particles))
+            column[index] = _to_column_value(feature.value)
+
+    return columns
+
+
+def _to_column_value(value: Any) -> Any:
+    if hasattr(value, "__len__") and not isinstance(value, (str, bytes, dict)):
+        return list(value)
+    return value
+
+
+def get_run_and_image(
+        output_root: Optional[Path] = None) -> Tuple[Path, str, int]:
+    """Get the run folder, the ID of the run and the index of the image, that the
+    current outputs belong to. With `num_images > 1`, the outputs of every image are
+    written to a subfolder `image<i>` of the run folder.
+
+    Args:
+        output_root (Optional[Path], optional): Output root of the measurement
+            technique. Defaults to the current working directory.
+
+    Returns:
+        Tuple[Path, str, int]: Run folder, ID of the run (see `RunContext`) and index
+            of the image.
+    """
+    output_root = (output_root or Path.cwd()).absolute()
+
+    run_folder, image_index = output_root, 0
+    match = _IMAGE_FOLDER_PATTERN.fullmatch(output_root.name)
+    if match is not None:
+        run_folder, image_index = output_root.parent, int(match.group(1))
+
+    return run_folder, get_run_context().run_id, image_index
+
+
+def save_particle_features_to_dataset(particles: Sequence[Particle],
+                                      dataset_root: Path, run_id: str,
+                                      image_index: int) -> Path:
+    """Save the features of particles to the partition of an image in a Parquet
+    dataset, which is partitioned by run and image (i.e. `run=<run
+    ID>/image=<index>`).
+
+    Since the features of the particles don't change between the rendering steps of an
+    image, the partition is only written once. Subsequent calls for the same image
+    (e.g. of other rendering steps or rendering step workers) reuse its rows.
+
+    Args:
+        particles (Sequence[Particle]): Particles of the image.
+        dataset_root (Path): Root folder of the dataset.
+        run_id (str): ID of the run.
+        image_index (int): Index of the image.
+
+    Returns:
+        Path: Path of the partition file.
+    """
+    # Imported here, since pyarrow is slow to import and only needed for the export of
+    # features.
+    import pyarrow as pa    # pylint: disable=import-outside-toplevel
+    import pyarrow.parquet as pq    # pylint: disable=import-outside-toplevel
+
+    partition_root = dataset_root / f"run={quote(run_id, safe='')}" \
+        / f"image={image_index}"
+    partition_root.mkdir(parents=True, exist_ok=True)
+    partition_file_path = partition_root / _PARTITION_FILE_NAME
+
+    with file_lock(partition_root / ".lock"):
+        if partition_file_path.exists():
+            logging.getLogger("synthPIC2").debug(
+                "Reusing the particle features of %s.", partition_file_path)
+            return partition_file_path
+
+        table = pa.Table.from_pydict(collect_particle_features(particles))
+
+        temporary_file_path = partition_file_path.with_suffix(".parquet.tmp")
+        pq.write_table(table, temporary_file_path)
+        os.replace(temporary_file_path, partition_file_path)
+
+    return partition_file_path
+
+
+def load_particle_features(dataset_root: Path) -> Any:
+    """Load the particle features of all runs and images of a dataset.
+
+    Args:
+        dataset_root (Path): Root folder of the dataset.
+
+    Returns:
+        pandas.DataFrame: Particle features with the columns "run" and "image".
+    """
+    import pyarrow.dataset as ds    # pylint: disable=import-outside-toplevel
+
+    dataset = ds.dataset(dataset_root,
+                         format="parquet",
+                         partitioning="hive",
+                         exclude_invalid_files=True)
+    return dataset.to_table().to_pandas()
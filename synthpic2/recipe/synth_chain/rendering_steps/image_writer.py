@@ -0,0 +1,278 @@
+"""Module for the asynchronous writing of rendered images."""
+
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import attr
+import numpy as np
+
+from ....custom_types import AnyPath
+
+# Luminance coefficients (Rec. 709), that are used by Blender for black and white
+# images.
+_LUMINANCE_COEFFICIENTS = np.array([0.2126, 0.7152, 0.0722], dtype=np.float32)
+
+# View transforms, that can be applied to the raw pixels of a render.
+SUPPORTED_VIEW_TRANSFORMS = ("Raw", "Standard")
+
+
+def convert_to_display_values(pixels: np.ndarray,
+                              view_transform: str = "Raw",
+                              color_mode: str = "RGB",
+                              color_depth: str = "8") -> np.ndarray:
+    """Convert the linear float pixels of a render to the integer values, that Blender
+    writes to an image file with the given settings (without dithering).
+
+    Args:
+        pixels (np.ndarray): Array of shape (height, width, 4) with linear RGBA values.
+        view_transform (str, optional): View transform of the scene ("Raw" or
+            "Standard"). Defaults to "Raw".
+        color_mode (str, optional): "BW", "RGB" or "RGBA". Defaults to "RGB".
+        color_depth (str, optional): "8" or "16". Defaults to "8".
+
+    Raises:
+        ValueError: Raised, if the view transform or the color mode is not supported.
+
+    Returns:
+        np.ndarray: Array of shape (height, width, channels) of type uint8 or uint16.
+    """
+    rgb = pixels[..., :3]
+
+    if view_transform == "Standard":
+        rgb = _linear_to_srgb(rgb)
+    elif view_transform != "Raw":
+        raise ValueError(
+            f"Unsupported view transform: {view_transform}. Supported view transforms "
+            f"are: {', '.join(SUPPORTED_VIEW_TRANSFORMS)}.")
+
+    if color_mode == "BW":
+        values = (rgb @ _LUMINANCE_COEFFICIENTS)[..., np.newaxis]
+    elif color_mode == "RGB":
+        values = rgb
+    elif color_mode == "RGBA":
+        values = np.concatenate([rgb, pixels[..., 3:4]], axis=-1)
+    else:
+        raise ValueError(f"Unsupported color mode: {color_mode}.")
+
+    if color_depth == "16":
+        max_value, dtype = 65535, np.uint16
+    else:
+        max_value, dtype = 255, np.uint8
+
+    return np.clip(values * max_value + 0.5, 0, max_value).astype(dtype)
+
+
+def _linear_to_srgb(values: np.ndarray) -> np.ndarray:
+    values = np.clip(values, 0, 1)
+    return np.where(values <= 0.0031308, values * 12.92,
+                    1.055 * np.power(values, 1 / 2.4) - 0.055)
+
+
+def is_writable(color_mode: str, color_depth: str, codec: str = "png") -> bool:
+    """Check, whether the image writer can write images with the given settings.
+    Pillow can only write 16 bit PNG images in black and white.
+
+    Args:
+        color_mode (str): See `convert_to_display_values`.
+        color_depth (str): See `convert_to_display_values`.
+        codec (str, optional): "png" or "npy". Defaults to "png".
+
+    Returns:
+        bool: True, if the images can be written.
+    """
+    return codec != "png" or color_depth != "16" or color_mode == "BW"
+
+
+def _write_png(image: np.ndarray, file_path: Path, compression_level: int) -> None:
+    # Imported here, since Pillow is only needed by the writer threads.
+    from PIL import Image    # pylint: disable=import-outside-toplevel
+
+    if image.shape[-1] == 1:
+        image = image[..., 0]
+    Image.fromarray(image).save(file_path,
+                                format="PNG",
+                                compress_level=compression_level)
+
+
+def _write_npy(image: np.ndarray, file_path: Path, compression_level: int) -> None:
+    # pylint: disable=unused-argument
+    np.save(file_path, image)
+
+
+_CODECS: Dict[str, Callable[[np.ndarray, Path, int], None]] = {
+    "png": _write_png,
+    "npy": _write_npy,
+}
+
+
+@attr.s(auto_attribs=True)
+class ImageWriterStats:
+    """Number of written images, the time spent for encoding and writing them, the
+    maximum number of images, that were waiting to be written, and the time the
+    renderer had to wait for the writer."""
+    num_images: int = 0
+    encode_time: float = 0.0
+    max_queue_depth: int = 0
+    wait_time: float = 0.0
+
+
+class AsyncImageWriter:
+    """Class to encode and write rendered images in background threads, so that
+    Blender can continue with the next render in the meantime.
+
+    Args:
+        num_threads (Optional[int], optional): Number of writer threads. `None` means
+            the number of CPUs. Defaults to None.
+        max_queue_depth (int, optional): Maximum number of images, that may wait to be
+            written. If it is reached, `submit` blocks until the oldest image was
+            written, to limit the memory usage. Defaults to 16.
+    """
+
+    def __init__(self, num_threads: Optional[int] = None, max_queue_depth: int = 16):
+        self._executor = ThreadPoolExecutor(max_workers=num_threads or os.cpu_count(),
+                                            thread_name_prefix="image_writer")
+        self._max_queue_depth = max_queue_depth
+        self._pending: List[Future] = []
+        self._lock = threading.Lock()
+        self.stats = ImageWriterStats()
+
+    def submit(self,
+               pixels: np.ndarray,
+               output_path: AnyPath,
+               view_transform: str = "Raw",
+               color_mode: str = "RGB",
+               color_depth: str = "8",
+               codec: str = "png",
+               compression_level: int = 6) -> Path:
+        """Submit the pixels of a render to be written to a file.
+
+        Args:
+            pixels (np.ndarray): Array of shape (height, width, 4) with linear RGBA
+                values (rows from top to bottom).
+            output_path (AnyPath): Path of the output file. The suffix is replaced by
+                the one of the codec. The output root will be created, if necessary.
+            view_transform (str, optional): See `convert_to_display_values`.
+                Defaults to "Raw".
+            color_mode (str, optional): See `convert_to_display_values`. Defaults to
+                "RGB".
+            color_depth (str, optional): See `convert_to_display_values`. Defaults to
+                "8".
+            codec (str, optional): "png" or "npy". Defaults to "png".
+            compression_level (int, optional): Compression level of the codec.
+                Defaults to 6.
+
+        Raises:
+            ValueError: Raised, if the codec or the combination of color mode, color
+                depth and codec is not supported (see `is_writable`).
+
+        Returns:
+            Path: Path of the output file.
+        """
+        if codec not in _CODECS:
+            raise ValueError(f"Unsupported codec: {codec}. Valid codecs are: "
+                             f"{', '.join(_CODECS)}.")
+        if not is_writable(color_mode, color_depth, codec):
+            raise ValueError(f"Can't write {color_depth} bit {color_mode} images as "
+                             f"{codec}.")
+
+        output_path = Path(output_path).with_suffix(f".{codec}").resolve()
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        def write() -> None:
+            start_time = time.perf_counter()
+            image = convert_to_display_values(pixels, view_transform, color_mode,
+                                              color_depth)
+            _CODECS[codec](image, output_path, compression_level)
+
+            with self._lock:
+                self.stats.num_images += 1
+                self.stats.encode_time += time.perf_counter() - start_time
+
+        self.submit_write(write)
+        return output_path
+
+    def submit_write(self, write: Callable[[], None]) -> None:
+        """Submit a function, that writes a file (e.g. an exported mesh), to be
+        executed by the writer threads. Like `submit`, it blocks while the queue is
+        full and is waited for by `flush`.
+
+        Args:
+            write (Callable[[], None]): Function, that writes the file.
+        """
+        self._wait_for_free_slot()
+
+        with self._lock:
+            self._pending = [future for future in self._pending if not future.done()]
+            self._pending.append(self._executor.submit(write))
+            self.stats.max_queue_depth = max(self.stats.max_queue_depth,
+                                             len(self._pending))
+
+    def flush(self) -> None:
+        """Wait until all submitted images are written. Errors of the writer threads
+        are raised here."""
+        start_time = time.perf_counter()
+
+        with self._lock:
+            pending = self._pending
+            self._pending = []
+
+        for future in pending:
+            future.result()
+
+        self.stats.wait_time += time.perf_counter() - start_time
+
+    def close(self) -> None:
+        """Write all submitted images, stop the writer threads and log statistics."""
+        self.flush()
+        self._executor.shutdown()
+
+        logging.getLogger("synthPIC2").info(
+            "Image writer: wrote %d images (%.2f s encoding in total, maximum queue "
+            "depth: %d, waited %.2f s).", self.stats.num_images, self.stats.encode_time,
+            self.stats.max_queue_depth, self.stats.wait_time)
+
+    def _wait_for_free_slot(self) -> None:
+        while True:
+            with self._lock:
+                self._pending = [
+                    future for future in self._pending if not future.done()
+                ]
+                if len(self._pending) < self._max_queue_depth:
+                    return
+                oldest = self._pending[0]
+
+            start_time = time.perf_counter()
+            oldest.result()
+            self.stats.wait_time += time.perf_counter() - start_time
+
+
+_IMAGE_WRITER: Optional[AsyncImageWriter] = None
+
+
+def get_image_writer() -> AsyncImageWriter:
+    """Get the image writer, that is shared by all rendering steps. It is created on
+    first use."""
+    global _IMAGE_WRITER
+    if _IMAGE_WRITER is None:
+        _IMAGE_WRITER = AsyncImageWriter()
+    return _IMAGE_WRITER
+
+
+def flush_image_writer() -> None:
+    """Wait until all images of the shared image writer are written, if it was used."""
+    if _IMAGE_WRITER is not None:
+        _IMAGE_WRITER.flush()
+
+
+def close_image_writer() -> None:
+    """Write all pending images and close the shared image writer, if it was used."""
+    global _IMAGE_WRITER
+    if _IMAGE_WRITER is not None:
+        _IMAGE_WRITER.close()
+        _IMAGE_WRITER = None
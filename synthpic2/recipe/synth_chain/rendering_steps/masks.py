@@ -0,0 +1,45 @@
+"""Module to derive masks from instance masks (i.e. object index passes)."""
+
+from typing import Iterable
+
+import numpy as np
+from PIL import Image
+
+from ....blender.utilities import read_image_pixels
+from ....custom_types import AnyPath
+
+
+def load_instance_mask(file_path: AnyPath) -> np.ndarray:
+    """Load an instance mask, that was written by `RenderPassesTogether`.
+
+    Args:
+        file_path (AnyPath): Path of the OpenEXR file of the instance mask.
+
+    Returns:
+        np.ndarray: 2D array (rows from top to bottom) of pass indices.
+    """
+    pixels = read_image_pixels(file_path)
+    return np.rint(pixels[..., 0]).astype(np.int64)
+
+
+def get_mask(instance_mask: np.ndarray, pass_indices: Iterable[int]) -> np.ndarray:
+    """Get a binary mask of all pixels that belong to one of the given pass indices.
+
+    Args:
+        instance_mask (np.ndarray): 2D array of pass indices.
+        pass_indices (Iterable[int]): Pass indices to include in the mask.
+
+    Returns:
+        np.ndarray: Boolean mask with the same shape as `instance_mask`.
+    """
+    return np.isin(instance_mask, np.fromiter(pass_indices, dtype=np.int64))
+
+
+def save_mask(mask: np.ndarray, file_path: AnyPath) -> None:
+    """Save a binary mask as 8 bit black and white image.
+
+    Args:
+        mask (np.ndarray): Boolean mask.
+        file_path (AnyPath): Path of the image file.
+    """
+    Image.fromarray(mask.astype(np.uint8) * 255).save(file_path)
@@ -0,0 +1,303 @@
+"""Module to export the meshes of many objects in bulk, without Blender operators."""
+
+import json
+from pathlib import Path
+import struct
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import bpy
+import numpy as np
+
+from ....custom_types import AnyPath
+from .image_writer import get_image_writer
+
+# Vertices of shape (num_vertices, 3), faces of shape (num_faces, 3) and instance IDs of
+# the faces of shape (num_faces,).
+Mesh = Tuple[np.ndarray, np.ndarray]
+MeshEncoder = Callable[[np.ndarray, np.ndarray, Optional[np.ndarray]], bytes]
+
+_STL_HEADER = b"synthPIC2 binary STL".ljust(80, b"\0")
+
+# Component types and buffer view targets of glTF.
+_GLTF_FLOAT = 5126
+_GLTF_UNSIGNED_INT = 5125
+_GLTF_ARRAY_BUFFER = 34962
+_GLTF_ELEMENT_ARRAY_BUFFER = 34963
+
+
+def extract_mesh(object_: bpy.types.Object) -> Mesh:
+    """Extract the triangulated, evaluated mesh of an object (i.e. including
+    modifiers) in world coordinates.
+
+    Args:
+        object_ (bpy.types.Object): Blender object.
+
+    Returns:
+        Mesh: Vertices (float32) and faces (int64) of the mesh.
+    """
+    evaluated_object = object_.evaluated_get(bpy.context.evaluated_depsgraph_get())
+    mesh = evaluated_object.to_mesh()
+
+    try:
+        mesh.calc_loop_triangles()
+
+        coordinates = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", coordinates)
+
+        faces = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int64)
+        mesh.loop_triangles.foreach_get("vertices", faces)
+    finally:
+        evaluated_object.to_mesh_clear()
+
+    matrix_world = np.array(evaluated_object.matrix_world)
+    vertices = coordinates.reshape(-1, 3) @ matrix_world[:3, :3].T \
+        + matrix_world[:3, 3]
+
+    return vertices.astype(np.float32), faces.reshape(-1, 3)
+
+
+def combine_meshes(meshes: Sequence[Mesh],
+                   instance_ids: Sequence[int]) -> Tuple[np.ndarray, np.ndarray,
+                                                         np.ndarray]:
+    """Combine meshes into a single mesh, whose faces know their instance.
+
+    Args:
+        meshes (Sequence[Mesh]): Meshes to combine.
+        instance_ids (Sequence[int]): Instance ID of every mesh.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Vertices, faces and instance IDs of
+            the faces of the combined mesh.
+    """
+    if not meshes:
+        return (np.empty((0, 3), dtype=np.float32), np.empty((0, 3), dtype=np.int64),
+                np.empty(0, dtype=np.int64))
+
+    vertex_offsets = np.cumsum([0] + [len(vertices) for vertices, _ in meshes[:-1]])
+
+    vertices = np.concatenate([vertices for vertices, _ in meshes])
+    faces = np.concatenate(
+        [faces + offset for (_, faces), offset in zip(meshes, vertex_offsets)])
+    face_instance_ids = np.repeat(np.asarray(instance_ids, dtype=np.int64),
+                                  [len(faces) for _, faces in meshes])
+
+    return vertices, faces, face_instance_ids
+
+
+def encode_stl(vertices: np.ndarray,
+               faces: np.ndarray,
+               instance_ids: Optional[np.ndarray] = None) -> bytes:
+    """Encode a mesh as binary STL file. The instance IDs are stored in the attribute
+    byte count of the faces.
+
+    Raises:
+        ValueError: Raised, if an instance ID does not fit into 16 bits.
+    """
+    triangles = vertices[faces].astype(np.float32)
+
+    normals = np.cross(triangles[:, 1] - triangles[:, 0],
+                       triangles[:, 2] - triangles[:, 0])
+    normals /= np.maximum(np.linalg.norm(normals, axis=1, keepdims=True), 1e-12)
+
+    records = np.zeros(len(faces),
+                       dtype=np.dtype([("normal", "<f4", 3), ("vertices", "<f4",
+                                                               (3, 3)),
+                                       ("attribute", "<u2")]))
+    records["normal"] = normals
+    records["vertices"] = triangles
+
+    if instance_ids is not None:
+        if len(instance_ids) > 0 and instance_ids.max() > np.iinfo(np.uint16).max:
+            raise ValueError("STL files can only store instance IDs up to 65535.")
+        records["attribute"] = instance_ids
+
+    return _STL_HEADER + struct.pack("<I", len(faces)) + records.tobytes()
+
+
+def encode_ply(vertices: np.ndarray,
+               faces: np.ndarray,
+               instance_ids: Optional[np.ndarray] = None) -> bytes:
+    """Encode a mesh as binary PLY file. The instance IDs are stored in the
+    `instance_id` property of the faces."""
+    header_lines = [
+        "ply",
+        "format binary_little_endian 1.0",
+        f"element vertex {len(vertices)}",
+        "property float x",
+        "property float y",
+        "property float z",
+        f"element face {len(faces)}",
+        "property list uchar int vertex_indices",
+    ]
+
+    face_fields = [("num_vertices", "u1"), ("vertex_indices", "<i4", 3)]
+    if instance_ids is not None:
+        header_lines.append("property int instance_id")
+        face_fields.append(("instance_id", "<i4"))
+    header_lines.append("end_header")
+
+    face_records = np.zeros(len(faces), dtype=np.dtype(face_fields))
+    face_records["num_vertices"] = 3
+    face_records["vertex_indices"] = faces
+    if instance_ids is not None:
+        face_records["instance_id"] = instance_ids
+
+    header = ("\n".join(header_lines) + "\n").encode("ascii")
+    return header + vertices.astype("<f4").tobytes() + face_records.tobytes()
+
+
+def encode_glb(vertices: np.ndarray,
+               faces: np.ndarray,
+               instance_ids: Optional[np.ndarray] = None) -> bytes:
+    """Encode a mesh as binary glTF file. The coordinates are converted to the y-up
+    convention of glTF. The instance IDs are stored in the custom vertex attribute
+    `_INSTANCE_ID`."""
+    # Blender is z-up, glTF is y-up.
+    positions = np.ascontiguousarray(vertices[:, [0, 2, 1]] * (1, 1, -1),
+                                     dtype="<f4")
+
+    gltf: Dict = {
+        "asset": {
+            "version": "2.0",
+            "generator": "synthPIC2"
+        },
+        "scene": 0,
+        "scenes": [{
+            "nodes": []
+        }],
+        "nodes": [],
+    }
+
+    binary_chunks: List[bytes] = []
+    if len(faces) > 0:
+        buffer_views: List[Dict] = []
+        accessors: List[Dict] = []
+
+        def add_accessor(data: np.ndarray, component_type: int, accessor_type: str,
+                         target: int) -> int:
+            byte_offset = sum(len(chunk) for chunk in binary_chunks)
+            binary_chunks.append(_pad(data.tobytes(), b"\0"))
+            buffer_views.append({
+                "buffer": 0,
+                "byteOffset": byte_offset,
+                "byteLength": data.nbytes,
+                "target": target
+            })
+            accessors.append({
+                "bufferView": len(buffer_views) - 1,
+                "componentType": component_type,
+                "count": len(data),
+                "type": accessor_type
+            })
+            return len(accessors) - 1
+
+        attributes = {
+            "POSITION":
+                add_accessor(positions, _GLTF_FLOAT, "VEC3", _GLTF_ARRAY_BUFFER)
+        }
+        # Bounds of the positions are required by glTF.
+        accessors[attributes["POSITION"]].update(min=positions.min(axis=0).tolist(),
+                                                 max=positions.max(axis=0).tolist())
+
+        if instance_ids is not None:
+            # Faces of different instances don't share vertices.
+            vertex_instance_ids = np.zeros(len(vertices), dtype="<u4")
+            vertex_instance_ids[faces.ravel()] = np.repeat(instance_ids, 3)
+            attributes["_INSTANCE_ID"] = add_accessor(vertex_instance_ids,
+                                                      _GLTF_UNSIGNED_INT, "SCALAR",
+                                                      _GLTF_ARRAY_BUFFER)
+
+        indices = add_accessor(faces.astype("<u4").ravel(), _GLTF_UNSIGNED_INT,
+                               "SCALAR", _GLTF_ELEMENT_ARRAY_BUFFER)
+
+        gltf["meshes"] = [{
+            "primitives": [{
+                "attributes": attributes,
+                "indices": indices,
+                "mode": 4
+            }]
+        }]
+        gltf["nodes"] = [{"mesh": 0}]
+        gltf["scenes"][0]["nodes"] = [0]
+        gltf["bufferViews"] = buffer_views
+        gltf["accessors"] = accessors
+        gltf["buffers"] = [{"byteLength": sum(len(chunk) for chunk in binary_chunks)}]
+
+    json_chunk = _pad(json.dumps(gltf, separators=(",", ":")).encode("utf-8"), b" ")
+    chunks = struct.pack("<II", len(json_chunk), 0x4E4F534A) + json_chunk
+    if binary_chunks:
+        binary_chunk = b"".join(binary_chunks)
+        chunks += struct.pack("<II", len(binary_chunk), 0x004E4942) + binary_chunk
+
+    return struct.pack("<III", 0x46546C67, 2, 12 + len(chunks)) + chunks
+
+
+def _pad(data: bytes, padding: bytes) -> bytes:
+    return data + padding * (-len(data) % 4)
+
+
+MESH_FORMATS: Dict[str, MeshEncoder] = {
+    "stl": encode_stl,
+    "ply": encode_ply,
+    "glb": encode_glb,
+}
+
+
+class MeshExporter:
+    """Class to export the meshes of objects without selecting them and without
+    Blender's export operators.
+
+    The evaluated meshes of all objects are extracted once, when the exporter is
+    created. Every export combines the meshes of the shown objects into a single file,
+    in which every face knows the instance ID of its object (i.e. its position in
+    `objects` starting at 1). The files are encoded and written in the background by
+    the image writer.
+
+    Args:
+        objects (Sequence[bpy.types.Object]): Objects, that can be exported.
+        file_format (str, optional): "stl", "ply" or "glb". Defaults to "stl".
+
+    Raises:
+        ValueError: Raised, if the file format is not supported.
+    """
+
+    def __init__(self, objects: Sequence[bpy.types.Object], file_format: str = "stl"):
+        if file_format not in MESH_FORMATS:
+            raise ValueError(f"Unsupported mesh format: {file_format}. Valid formats "
+                             f"are: {', '.join(MESH_FORMATS)}.")
+
+        self.file_format = file_format
+        self.instance_ids = {
+            object_.name: instance_id
+            for instance_id, object_ in enumerate(objects, start=1)
+        }
+        self.meshes = {object_.name: extract_mesh(object_) for object_ in objects}
+        self._shown_object_names: Dict[str, None] = {}
+
+    def show(self, object_: bpy.types.Object) -> None:
+        self._shown_object_names[object_.name] = None
+
+    def hide(self, object_: bpy.types.Object) -> None:
+        self._shown_object_names.pop(object_.name, None)
+
+    def export(self, output_path: AnyPath) -> None:
+        """Export the meshes of the shown objects into a single file.
+
+        Args:
+            output_path (AnyPath): Path of the output file. The suffix is replaced by
+                the one of the file format. The output root will be created, if
+                necessary.
+        """
+        output_path = Path(output_path).with_suffix(f".{self.file_format}").resolve()
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        object_names = list(self._shown_object_names)
+        vertices, faces, instance_ids = combine_meshes(
+            [self.meshes[object_name] for object_name in object_names],
+            [self.instance_ids[object_name] for object_name in object_names])
+        encode = MESH_FORMATS[self.file_format]
+
+        def write() -> None:
+            output_path.write_bytes(encode(vertices, faces, instance_ids))
+
+        get_image_writer().submit_write(write)
@@ -0,0 +1,402 @@
+"""Module to render categorical images, depth maps and normal maps by rasterizing the
+meshes of the particles with NumPy, instead of rendering them with Blender."""
+
+from typing import Dict, Optional, Sequence, Tuple
+
+import attr
+import bpy
+import numpy as np
+
+# Rendering modes, that can be rendered by the rasterizer.
+RASTERIZABLE_RENDERING_MODES = ("categorical", "depth_map", "normal_map")
+
+# Maximum number of (triangle, pixel) pairs, that are tested at once. Limits the memory
+# usage to a few hundred megabytes.
+_MAX_CANDIDATES = 2**22
+
+# Depth values of at least this magnitude are ignored by the normalization of Blender's
+# compositor.
+_BLENDER_MAX_DEPTH = 10000.0
+
+
+@attr.s(auto_attribs=True)
+class Fragments:
+    """Visible triangle of every pixel.
+
+    Attributes:
+        triangle_indices (np.ndarray): Array of shape (height, width) with the indices
+            of the visible triangles (-1 for the background).
+        barycentric_coordinates (np.ndarray): Array of shape (height, width, 3) with the
+            perspective-correct barycentric coordinates of the pixel centers in the
+            visible triangles.
+        depth (np.ndarray): Array of shape (height, width) with the distances from the
+            camera plane (infinite for the background).
+    """
+    triangle_indices: np.ndarray
+    barycentric_coordinates: np.ndarray
+    depth: np.ndarray
+
+    @property
+    def foreground(self) -> np.ndarray:
+        return self.triangle_indices >= 0
+
+    def interpolate(self, attributes: np.ndarray) -> np.ndarray:
+        """Interpolate attributes of the triangle corners at the pixel centers.
+
+        Args:
+            attributes (np.ndarray): Array of shape (num_triangles, 3, channels).
+
+        Returns:
+            np.ndarray: Array of shape (height, width, channels). Zero for the
+                background.
+        """
+        height, width = self.triangle_indices.shape
+        values = np.zeros((height, width, attributes.shape[-1]), dtype=np.float32)
+
+        foreground = self.foreground
+        corner_values = attributes[self.triangle_indices[foreground]]
+        values[foreground] = np.einsum("ij,ijk->ik",
+                                       self.barycentric_coordinates[foreground],
+                                       corner_values)
+        return values
+
+
+def rasterize(positions: np.ndarray, view_matrix: np.ndarray,
+              projection_matrix: np.ndarray, width: int, height: int) -> Fragments:
+    """Rasterize triangles with a depth buffer. Pixels are sampled at their centers.
+
+    The (triangle, pixel) pairs of the bounding boxes of the triangles are tested in
+    large vectorized batches. Triangles, that are not completely in front of the near
+    clipping plane, are skipped.
+
+    Args:
+        positions (np.ndarray): Array of shape (num_triangles, 3, 3) with the world
+            coordinates of the triangle corners.
+        view_matrix (np.ndarray): 4x4 matrix from world to camera coordinates.
+        projection_matrix (np.ndarray): 4x4 matrix from camera to clip coordinates.
+        width (int): Width of the image in pixels.
+        height (int): Height of the image in pixels.
+
+    Returns:
+        Fragments: Visible triangles of all pixels (rows from top to bottom).
+    """
+    num_pixels = width * height
+    depth_buffer = np.full(num_pixels, np.inf)
+    triangle_index_buffer = np.full(num_pixels, -1, dtype=np.int64)
+    barycentric_buffer = np.zeros((num_pixels, 3))
+
+    homogeneous_positions = np.concatenate(
+        [positions, np.ones(positions.shape[:-1] + (1,))], axis=-1)
+    camera_positions = homogeneous_positions @ np.asarray(view_matrix).T
+    clip_positions = camera_positions @ np.asarray(projection_matrix).T
+
+    w = clip_positions[..., 3]
+    depth = -camera_positions[..., 2]
+    in_front = np.all((w > 0) & (clip_positions[..., 2] >= -w), axis=1)
+
+    # Triangles behind the camera get placeholder screen coordinates.
+    safe_w = np.where(in_front[:, np.newaxis], w, 1)
+    x = (clip_positions[..., 0] / safe_w + 1) * width / 2
+    y = (1 - clip_positions[..., 1] / safe_w) * height / 2
+    x[~in_front] = 0
+    y[~in_front] = 0
+
+    area = (x[:, 1] - x[:, 0]) * (y[:, 2] - y[:, 0]) \
+        - (x[:, 2] - x[:, 0]) * (y[:, 1] - y[:, 0])
+    valid = in_front & (np.abs(area) > 1e-12)
+
+    # Bounding boxes of the pixels, whose centers may be covered.
+    x_min = np.clip(np.ceil(np.min(x, axis=1) - 0.5), 0, width).astype(np.int64)
+    x_max = np.clip(np.floor(np.max(x, axis=1) - 0.5), -1, width - 1).astype(np.int64)
+    y_min = np.clip(np.ceil(np.min(y, axis=1) - 0.5), 0, height).astype(np.int64)
+    y_max = np.clip(np.floor(np.max(y, axis=1) - 0.5), -1, height - 1).astype(np.int64)
+
+    box_widths = np.maximum(x_max - x_min + 1, 0)
+    box_heights = np.maximum(y_max - y_min + 1, 0)
+    candidate_counts = np.where(valid, box_widths * box_heights, 0)
+    candidate_offsets = np.concatenate([[0], np.cumsum(candidate_counts)])
+
+    start = 0
+    num_triangles = len(positions)
+    while start < num_triangles:
+        end = np.searchsorted(candidate_offsets,
+                              candidate_offsets[start] + _MAX_CANDIDATES,
+                              side="right") - 1
+        end = min(max(end, start + 1), num_triangles)
+
+        triangle_indices = np.repeat(np.arange(start, end),
+                                     candidate_counts[start:end])
+        local_indices = np.arange(len(triangle_indices)) \
+            - (candidate_offsets[triangle_indices] - candidate_offsets[start])
+        rows, columns = np.divmod(local_indices, box_widths[triangle_indices])
+        pixel_x = x_min[triangle_indices] + columns
+        pixel_y = y_min[triangle_indices] + rows
+        start = end
+
+        if len(triangle_indices) == 0:
+            continue
+
+        # Screen space barycentric coordinates of the pixel centers.
+        center_x = pixel_x + 0.5
+        center_y = pixel_y + 0.5
+        corner_x = x[triangle_indices]
+        corner_y = y[triangle_indices]
+        lambda_0 = ((corner_x[:, 1] - center_x) * (corner_y[:, 2] - center_y) -
+                    (corner_x[:, 2] - center_x) *
+                    (corner_y[:, 1] - center_y)) / area[triangle_indices]
+        lambda_1 = ((corner_x[:, 2] - center_x) * (corner_y[:, 0] - center_y) -
+                    (corner_x[:, 0] - center_x) *
+                    (corner_y[:, 2] - center_y)) / area[triangle_indices]
+        screen_coordinates = np.stack([lambda_0, lambda_1, 1 - lambda_0 - lambda_1],
+                                      axis=1)
+
+        inside = np.all(screen_coordinates >= 0, axis=1)
+        triangle_indices = triangle_indices[inside]
+        pixel_indices = pixel_y[inside] * width + pixel_x[inside]
+
+        # Perspective-correct interpolation.
+        coordinates = screen_coordinates[inside] / w[triangle_indices]
+        coordinates /= np.sum(coordinates, axis=1, keepdims=True)
+        fragment_depth = np.sum(coordinates * depth[triangle_indices], axis=1)
+
+        # Keep the closest fragment of every pixel.
+        order = np.lexsort((fragment_depth, pixel_indices))
+        sorted_pixel_indices = pixel_indices[order]
+        is_first = np.concatenate(
+            [[True], sorted_pixel_indices[1:] != sorted_pixel_indices[:-1]])
+        closest = order[is_first]
+
+        closer = fragment_depth[closest] < depth_buffer[pixel_indices[closest]]
+        closest = closest[closer]
+        closest_pixel_indices = pixel_indices[closest]
+
+        depth_buffer[closest_pixel_indices] = fragment_depth[closest]
+        triangle_index_buffer[closest_pixel_indices] = triangle_indices[closest]
+        barycentric_buffer[closest_pixel_indices] = coordinates[closest]
+
+    return Fragments(triangle_indices=triangle_index_buffer.reshape(height, width),
+                     barycentric_coordinates=barycentric_buffer.reshape(
+                         height, width, 3),
+                     depth=depth_buffer.reshape(height, width))
+
+
+def shade_categorical(fragments: Fragments, colors: np.ndarray) -> np.ndarray:
+    """Get a categorical image, in which every triangle has a flat color.
+
+    Args:
+        fragments (Fragments): Rasterized triangles.
+        colors (np.ndarray): Array of shape (num_triangles, 3) with RGB colors.
+
+    Returns:
+        np.ndarray: Array of shape (height, width, 4) with RGBA values. The background
+            is black.
+    """
+    pixels = _get_opaque_black_image(fragments)
+    foreground = fragments.foreground
+    pixels[foreground, :3] = colors[fragments.triangle_indices[foreground]]
+    return pixels
+
+
+def shade_depth_map(fragments: Fragments) -> np.ndarray:
+    """Get a depth map like the one of the "depth_map" rendering mode, i.e. the depth
+    normalized to [0, 1] over the visible particles. The background is white.
+
+    Args:
+        fragments (Fragments): Rasterized triangles.
+
+    Returns:
+        np.ndarray: Array of shape (height, width, 4) with RGBA values.
+    """
+    pixels = _get_opaque_black_image(fragments)
+
+    depth = fragments.depth
+    in_range = np.abs(depth) < _BLENDER_MAX_DEPTH
+
+    normalized_depth = np.ones_like(depth)
+    if np.any(in_range):
+        min_depth = np.min(depth[in_range])
+        depth_range = np.max(depth[in_range]) - min_depth
+        scale = 1 / depth_range if depth_range != 0 else 0
+        normalized_depth[in_range] = np.clip((depth[in_range] - min_depth) * scale, 0,
+                                             1)
+
+    pixels[..., :3] = normalized_depth[..., np.newaxis]
+    return pixels
+
+
+def shade_normal_map(fragments: Fragments, normals: np.ndarray) -> np.ndarray:
+    """Get a normal map like the one of the "normal_map" rendering mode, i.e. the
+    world space normals of the visible particles. The background is black.
+
+    Args:
+        fragments (Fragments): Rasterized triangles.
+        normals (np.ndarray): Array of shape (num_triangles, 3, 3) with the world space
+            normals of the triangle corners.
+
+    Returns:
+        np.ndarray: Array of shape (height, width, 4) with RGBA values.
+    """
+    pixels = _get_opaque_black_image(fragments)
+
+    interpolated_normals = fragments.interpolate(normals)
+    lengths = np.linalg.norm(interpolated_normals, axis=-1, keepdims=True)
+    np.divide(interpolated_normals,
+              lengths,
+              out=interpolated_normals,
+              where=lengths > 0)
+
+    pixels[..., :3] = interpolated_normals
+    return pixels
+
+
+def _get_opaque_black_image(fragments: Fragments) -> np.ndarray:
+    height, width = fragments.triangle_indices.shape
+    pixels = np.zeros((height, width, 4), dtype=np.float32)
+    pixels[..., 3] = 1
+    return pixels
+
+
+def get_camera_matrices(
+        scene: bpy.types.Scene) -> Tuple[np.ndarray, np.ndarray, int, int]:
+    """Get the matrices and the resolution of the active camera of a scene.
+
+    Args:
+        scene (bpy.types.Scene): Blender scene.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, int, int]: View matrix, projection matrix, width
+            and height of the rendered image.
+    """
+    render_settings = scene.render
+    scale = render_settings.resolution_percentage / 100
+    width = int(render_settings.resolution_x * scale)
+    height = int(render_settings.resolution_y * scale)
+
+    camera = scene.camera
+    projection_matrix = camera.calc_matrix_camera(
+        bpy.context.evaluated_depsgraph_get(),
+        x=width,
+        y=height,
+        scale_x=render_settings.pixel_aspect_x,
+        scale_y=render_settings.pixel_aspect_y)
+    view_matrix = camera.matrix_world.inverted()
+
+    return np.array(view_matrix), np.array(projection_matrix), width, height
+
+
+def extract_triangles(object_: bpy.types.Object) -> Tuple[np.ndarray, np.ndarray]:
+    """Extract the triangles of the evaluated mesh of an object (i.e. including
+    modifiers) in bulk.
+
+    Args:
+        object_ (bpy.types.Object): Blender object.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Arrays of shape (num_triangles, 3, 3) with the
+            world coordinates and the world space normals of the triangle corners.
+    """
+    evaluated_object = object_.evaluated_get(bpy.context.evaluated_depsgraph_get())
+    mesh = evaluated_object.to_mesh()
+
+    try:
+        mesh.calc_loop_triangles()
+        mesh.calc_normals_split()
+
+        coordinates = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", coordinates)
+
+        loop_normals = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+        mesh.loops.foreach_get("normal", loop_normals)
+
+        vertex_indices = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int64)
+        mesh.loop_triangles.foreach_get("vertices", vertex_indices)
+
+        loop_indices = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int64)
+        mesh.loop_triangles.foreach_get("loops", loop_indices)
+    finally:
+        evaluated_object.to_mesh_clear()
+
+    matrix_world = np.array(evaluated_object.matrix_world)
+    positions = coordinates.reshape(-1, 3) @ matrix_world[:3, :3].T \
+        + matrix_world[:3, 3]
+
+    normal_matrix = np.linalg.inv(matrix_world[:3, :3]).T
+    normals = loop_normals.reshape(-1, 3) @ normal_matrix.T
+    normals /= np.maximum(np.linalg.norm(normals, axis=1, keepdims=True), 1e-12)
+
+    return positions[vertex_indices].reshape(-1, 3, 3), \
+        normals[loop_indices].reshape(-1, 3, 3)
+
+
+class Rasterizer:
+    """Class to render categorical images, depth maps and normal maps of the visible
+    objects by rasterization with NumPy, without setting up a render engine.
+
+    The triangles of every object are extracted once and reused by subsequent
+    renders, i.e. the meshes must not change between the renders.
+
+    Args:
+        rendering_mode (str): "categorical", "depth_map" or "normal_map".
+        objects (Sequence[bpy.types.Object]): Objects, that are rendered, if they are
+            not hidden in renders.
+        colors (Optional[Dict[str, Tuple[float, float, float]]], optional): RGB colors
+            by object name for the categorical mode. Defaults to None.
+
+    Raises:
+        ValueError: Raised, if the rendering mode is not supported.
+    """
+
+    def __init__(self,
+                 rendering_mode: str,
+                 objects: Sequence[bpy.types.Object],
+                 colors: Optional[Dict[str, Tuple[float, float, float]]] = None):
+        if rendering_mode.lower() not in RASTERIZABLE_RENDERING_MODES:
+            raise ValueError(
+                f"Unsupported rendering mode for the rasterizer: {rendering_mode}. "
+                f"Valid rendering modes are: "
+                f"{', '.join(RASTERIZABLE_RENDERING_MODES)}.")
+
+        self.rendering_mode = rendering_mode.lower()
+        self.objects = list(objects)
+        self.colors = colors or {}
+        self._triangles: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def render(self) -> np.ndarray:
+        """Render the objects, that are not hidden in renders, with the active camera.
+
+        Returns:
+            np.ndarray: Array of shape (height, width, 4) with linear RGBA values (rows
+                from top to bottom).
+        """
+        view_matrix, projection_matrix, width, height = get_camera_matrices(
+            bpy.data.scenes[0])
+
+        visible_objects = [
+            object_ for object_ in self.objects if not object_.hide_render
+        ]
+        triangles = [self._get_triangles(object_) for object_ in visible_objects]
+
+        positions = np.concatenate([np.empty((0, 3, 3))] +
+                                   [positions for positions, _ in triangles])
+        fragments = rasterize(positions, view_matrix, projection_matrix, width, height)
+
+        if self.rendering_mode == "depth_map":
+            return shade_depth_map(fragments)
+
+        if self.rendering_mode == "normal_map":
+            normals = np.concatenate([np.empty((0, 3, 3))] +
+                                     [normals for _, normals in triangles])
+            return shade_normal_map(fragments, normals)
+
+        object_colors = np.array(
+            [self.colors.get(object_.name, (0, 0, 0)) for object_ in visible_objects] +
+            [(0, 0, 0)])
+        object_indices = np.repeat(np.arange(len(visible_objects)),
+                                   [len(positions) for positions, _ in triangles])
+        return shade_categorical(fragments, object_colors[object_indices])
+
+    def _get_triangles(self,
+                       object_: bpy.types.Object) -> Tuple[np.ndarray, np.ndarray]:
+        if object_.name not in self._triangles:
+            self._triangles[object_.name] = extract_triangles(object_)
+        return self._triangles[object_.name]
@@ -1,38 +1,139 @@
 """Module for SynthChainSteps."""
 
 from abc import abstractmethod
+import csv
+import logging
+import os
 from pathlib import Path
-from typing import Callable, Optional
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import attr
 import bpy
-from matplotlib.colors import hex2color
-from matplotlib.colors import rgb2hex
-import pandas as pd
+import numpy as np
 
 from ....blender import Gpu
+from ....blender import RenderSession
 from ....blender import utilities as blender
 from ....blender.utilities import assign_material
 from ....blender.utilities import create_emission_shader
+from ....blender.utilities import create_object_color_emission_shader
 from ....blender.utilities import deselect_all
 from ....custom_types import AnyPath
+from ....utilities import file_lock
+from ....utilities import get_run_context
 from ....utilities import get_unique_reproducible_random_colors
+from ....utilities import hex_to_rgb
+from ....utilities import rgb_to_hex
 from ...blueprints import Particle
 from ...process_conditions.sets import Set
 from ...prototypes.feature import Feature
+from ...registries import PARTICLE_REGISTRY
 from ...registries import SET_REGISTRY
 from ...registries.registries import MEASUREMENT_TECHNIQUE_REGISTRY
 from ...render_preparation_mixin import RenderPreparationMixin
+from ..manifest import append_to_manifest
+from ..manifest import get_file_md5
+from ..manifest import get_manifest_context
+from ..manifest import MANIFEST_FILE_NAME
 from ..state import RuntimeState
 from ..state import State
 from .base import RenderingStep
+from .feature_export import FEATURE_FORMATS
+from .feature_export import get_run_and_image
+from .feature_export import save_particle_features_to_dataset
+from .image_writer import flush_image_writer
+from .image_writer import get_image_writer
+from .image_writer import is_writable
+from .image_writer import SUPPORTED_VIEW_TRANSFORMS
+from .masks import get_mask
+from .masks import load_instance_mask
+from .masks import save_mask
+from .mesh_export import MESH_FORMATS
+from .mesh_export import MeshExporter
+from .rasterization import RASTERIZABLE_RENDERING_MODES
+from .rasterization import Rasterizer
+from .sampling import apply_sampling_budget
+from .sampling import record_render_statistics
+from .sampling import RenderStatistics
+from .set_index import SET_INFO_FORMATS
+from .set_index import SetIndex
+from .sharding import get_member_extension
+from .sharding import get_sample_key
+from .sharding import get_shard_writer
+from .sharding import OUTPUT_SINKS
+from .snapshot import RenderSnapshot
+from .tiling import get_image_size
+from .tiling import get_projected_bounding_box
+from .tiling import render_tiles
+from .tiling import set_render_border
+from .tiling import split_into_tiles
+from .tiling import stitch_tiles
+
+_STATE_RESTORATION_METHODS = ("snapshot", "reload")
+
+_OUTPUT_METHODS = ("file", "array")
+
+_BACKENDS = ("blender", "rasterizer")
+
+# Rendering modes that disable the compositor, so that existing compositor nodes are
+# replaced to read the rendered pixels from a viewer node.
+_NON_COMPOSITING_RENDERING_MODES = ("categorical", "stylized", "stylized_xray")
+
+# Compositor nodes, that don't depend on neighboring pixels, so that they can be
+# applied to tiles.
+_TILEABLE_COMPOSITING_NODE_TYPES = ("R_LAYERS", "COMPOSITE", "VIEWER")
+
+# Rendering modes, whose images of a single particle don't extend beyond the projected
+# bounding box of the particle (unlike e.g. shadows in the real mode) and don't depend
+# on the rendered region (unlike the normalization of the depth_map mode).
+_CROPPABLE_RENDERING_MODES = ("categorical", "normal_map", "stylized", "stylized_xray")
+
+# Render passes, that can be written by `RenderPassesTogether`: name of the output of
+# the render layers node, view layer property that enables the pass and color mode of
+# the output file.
+_RENDER_PASSES: Dict[str, Tuple[str, str, str]] = {
+    "instance_mask": ("IndexOB", "use_pass_object_index", "BW"),
+    "depth": ("Depth", "use_pass_z", "BW"),
+    "normal": ("Normal", "use_pass_normal", "RGB"),
+}
 
 
 class _Renderer(RenderPreparationMixin):
-    """Class to control the rendering method (e.g. image or stl)."""
+    """Class to control the rendering method (e.g. image or stl).
+
+    Args:
+        output_method (str, optional): "file" to let Blender write the images or
+            "array" to read the rendered pixels from the viewer node of the compositor
+            and write them asynchronously with the image writer. Defaults to "file".
+        codec (str, optional): Codec of the image writer. Defaults to "png".
+        compression_level (int, optional): Compression level of the image writer.
+            Defaults to 1.
+        rasterizer (Optional[Rasterizer], optional): Rasterizer, that renders the
+            images instead of Blender. The images are written with the image writer.
+            Defaults to None.
+        mesh_exporter (Optional[MeshExporter], optional): Exporter, that writes the
+            meshes in the stl mode instead of Blender's STL export operator. Defaults
+            to None.
+    """
+
+    def __init__(self,
+                 output_method: str = "file",
+                 codec: str = "png",
+                 compression_level: int = 1,
+                 rasterizer: Optional[Rasterizer] = None,
+                 mesh_exporter: Optional[MeshExporter] = None) -> None:
+        self.codec = codec
+        self.compression_level = compression_level
+        self.rasterizer = rasterizer
+        self.mesh_exporter = mesh_exporter
+        self.last_pixels: Optional[np.ndarray] = None
 
-    def __init__(self) -> None:
         self.render: Callable[[AnyPath], None] = self.render_image_to_file
+        if rasterizer is not None:
+            self.render = self.render_image_with_rasterizer
+        elif output_method == "array":
+            self.render = self.render_image_to_array
         self.hide_object: Callable[[bpy.types.Object], None] = self.hide_in_render
         self.show_object: Callable[[bpy.types.Object], None] = self.show_in_render
 
@@ -48,6 +149,59 @@ class _Renderer(RenderPreparationMixin):
     def render_image_to_file(output_path: AnyPath) -> None:
         blender.render_to_file(output_path)
 
+    def render_image_to_array(self, output_path: AnyPath) -> None:
+        self.last_pixels = None
+        scene = bpy.data.scenes[0]
+        view_settings = scene.view_settings
+        image_settings = scene.render.image_settings
+
+        if not is_writable(image_settings.color_mode, image_settings.color_depth,
+                           self.codec):
+            logging.getLogger("synthPIC2").warning(
+                "The image writer can't write %s bit %s images. Falling back to "
+                "writing %s with Blender.", image_settings.color_depth,
+                image_settings.color_mode, output_path)
+            self.render_image_to_file(output_path)
+            return
+
+        # Only the view transforms, that can be reproduced by the image writer, are
+        # supported.
+        if view_settings.view_transform not in SUPPORTED_VIEW_TRANSFORMS \
+                or view_settings.look != "None" or view_settings.exposure != 0 \
+                or view_settings.gamma != 1:
+            logging.getLogger("synthPIC2").warning(
+                "The view settings (%s, look: %s) can't be applied to rendered arrays. "
+                "Falling back to writing %s with Blender.",
+                view_settings.view_transform, view_settings.look, output_path)
+            self.render_image_to_file(output_path)
+            return
+
+        self._write_image(blender.render_to_array(), output_path)
+
+    def render_image_with_rasterizer(self, output_path: AnyPath) -> None:
+        assert self.rasterizer is not None
+        self._write_image(self.rasterizer.render(), output_path)
+
+    def read_rendered_pixels(self, output_path: AnyPath) -> np.ndarray:
+        """Get the pixels of the image, that has been rendered to `output_path` last.
+        Images, that have not been written by the image writer, are read back from
+        their files."""
+        if self.last_pixels is not None:
+            return np.clip(self.last_pixels, 0, 1)
+        return blender.read_image_pixels(output_path)
+
+    def _write_image(self, pixels: np.ndarray, output_path: AnyPath) -> None:
+        self.last_pixels = pixels
+        scene = bpy.data.scenes[0]
+        image_settings = scene.render.image_settings
+        get_image_writer().submit(pixels,
+                                  output_path,
+                                  view_transform=scene.view_settings.view_transform,
+                                  color_mode=image_settings.color_mode,
+                                  color_depth=image_settings.color_depth,
+                                  codec=self.codec,
+                                  compression_level=self.compression_level)
+
     @staticmethod
     def export_stl_to_file(output_path: AnyPath) -> None:
         # Force stl file extension.
@@ -63,6 +217,12 @@ class _Renderer(RenderPreparationMixin):
         blender.show_in_render(object_)
 
     def _prepare_stl_rendering_mode(self) -> None:
+        if self.mesh_exporter is not None:
+            self.render = self.mesh_exporter.export
+            self.hide_object = self.mesh_exporter.hide
+            self.show_object = self.mesh_exporter.show
+            return
+
         self.render = self.export_stl_to_file
         self.hide_object = self.deselect
         self.show_object = self.select
@@ -74,7 +234,7 @@ class _Scene(RenderPreparationMixin):
 
     @staticmethod
     def _prepare_real_rendering_mode() -> None:
-        Gpu.enable()
+        RenderSession.enable_gpu()
 
     @staticmethod
     def _prepare_stl_rendering_mode() -> None:
@@ -228,8 +388,10 @@ class _Scene(RenderPreparationMixin):
 
     @staticmethod
     def _disable_world() -> None:
-        for world in bpy.data.worlds:
-            bpy.data.worlds.remove(world)
+        # Unlink instead of removing the world, so that it can be restored without
+        # reloading the .blend file.
+        for scene in bpy.data.scenes:
+            scene.world = None
 
     @staticmethod
     def _disable_emission() -> None:
@@ -267,6 +429,7 @@ class _Particles(RenderPreparationMixin):
         steps."""
     set_of_interest: Set
     set_overlapping: Set
+    use_shared_categorical_shader: bool = True
 
     def prepare_for_render(self, rendering_mode: str) -> None:
         self.particles_all = SET_REGISTRY["AllParticles"]()    #pylint: disable=not-callable
@@ -282,7 +445,7 @@ class _Particles(RenderPreparationMixin):
         colors = get_unique_reproducible_random_colors(num_particles)
 
         for particle, color in zip(self.particles_all, colors):
-            color_hex = rgb2hex(color)    # type: ignore
+            color_hex = rgb_to_hex(color)
 
             if "category_color" in particle.features:
                 particle.features["category_color"].value = color_hex
@@ -293,9 +456,13 @@ class _Particles(RenderPreparationMixin):
         super().prepare_for_render(rendering_mode)
 
     def _prepare_categorical_rendering_mode(self) -> None:
+        if self.use_shared_categorical_shader:
+            self._assign_shared_categorical_shader()
+            return
+
         for particle in self.particles_all:
             color_hex = particle.features.query("category_color", strict=True).value
-            color = hex2color(color_hex) + (1,)
+            color = hex_to_rgb(color_hex) + (1,)
 
             emission_shader = create_emission_shader(color=color)
             assign_material(
@@ -312,6 +479,38 @@ class _Particles(RenderPreparationMixin):
                     emission_shader.name,
                 )
 
+    def get_categorical_colors(self) -> Dict[str, Tuple[float, float, float]]:
+        """Get the colors of the particles in the categorical mode by the names of
+        their Blender objects."""
+        colors = {}
+        for particle in self.particles_all:
+            color_hex = particle.features.query("category_color", strict=True).value
+            colors[particle.blender_object.name] = hex_to_rgb(color_hex)
+
+        for particle in self.particles_overlapping:
+            if particle not in self.particles_of_interest:
+                assert isinstance(particle, Particle)
+                colors[particle.blender_object.name] = (0, 0, 0)
+
+        return colors
+
+    def _assign_shared_categorical_shader(self) -> None:
+        """Assign a single emission shader to all particles, that takes its color from
+        the object color, so that only one material needs to be compiled."""
+        emission_shader = create_object_color_emission_shader()
+
+        for particle in self.particles_all:
+            color_hex = particle.features.query("category_color", strict=True).value
+            color = hex_to_rgb(color_hex) + (1,)
+
+            particle.blender_object.color = color
+            assign_material(particle.blender_object, emission_shader.name)
+
+        for particle in self.particles_overlapping:
+            if particle not in self.particles_of_interest:
+                assert isinstance(particle, Particle)
+                particle.blender_object.color = (0, 0, 0, 1)
+
     def _prepare_real_rendering_mode(self) -> None:
         for particle in self.particles_overlapping:
             if particle not in self.particles_of_interest:
@@ -326,7 +525,68 @@ class ParametricRenderingStep(RenderingStep):
 
 @attr.s(auto_attribs=True)
 class DiscreteRenderingStep(RenderingStep):
-    """Prepare and render the current scene."""
+    """Prepare and render the current scene.
+
+    After the rendering, the scene is restored to its state before the preparation of
+    the rendering mode. With `state_restoration="snapshot"`, only the properties that
+    are changed by the preparation are recorded in memory and written back. With
+    `state_restoration="reload"`, the whole scene is saved to and reloaded from a
+    .blend file.
+
+    With `output_method="array"`, the rendered pixels are read from a viewer node of
+    the compositor and the images are encoded and written in background threads (see
+    `AsyncImageWriter`), so that Blender can continue with the next render in the
+    meantime. `array_codec` ("png" or "npy") and `compression_level` control the
+    output files. Blender's dithering is not applied to them.
+
+    With `backend="rasterizer"`, the categorical, depth_map and normal_map modes are
+    rendered by rasterizing the meshes of the particles with NumPy (see `Rasterizer`)
+    instead of Blender. The pixels are sampled at their centers, i.e. there is no
+    anti-aliasing, and the images are written with the image writer.
+
+    The real mode can be rendered with a sampling budget instead of a fixed number of
+    samples (see `apply_sampling_budget`): adaptive sampling stops at `noise_threshold`
+    (with at least `min_samples`), every image is rendered for at most `time_limit`
+    seconds and `use_denoising` enables OpenImageDenoise. The `cycles_samples` feature
+    limits the samples. The rendered samples, the render time and an estimate of the
+    residual noise (see `estimate_noise`) per image are added to the measurement
+    technique features, if `do_save_features` is set.
+
+    With a `mesh_format` ("stl", "ply" or "glb"), the stl mode extracts the meshes of
+    all particles at once and writes them in the background (see `MeshExporter`),
+    instead of selecting the particles and calling Blender's STL export operator for
+    every file. The faces of the files store the instance IDs of their particles, which
+    are listed in `instance_ids.csv` in the output folder.
+
+    With `feature_format="parquet"`, the particle features are not written to a CSV
+    file per rendering step, but to a Parquet dataset, that is partitioned by run and
+    image (see `save_particle_features_to_dataset`) and is read with
+    `load_particle_features`. The dataset is stored in `feature_dataset_root`
+    (relative to the original working directory) or in the folder
+    `particle_features` of the run. Requires pyarrow.
+
+    The sets of every rendering step and their particles are recorded in the
+    append-only SQLite database `set_info/set_index.sqlite` (see `SetIndex`), which
+    parallel rendering steps and jobs can write to concurrently. With
+    `set_info_format="csv"`, they are written to `set_info/set_hashes.csv` and a text
+    file per set instead.
+
+    With `output_sink="shards"`, the output files of the rendering step (images,
+    features and states) are packed into size-bounded tar shards (see `ShardWriter`)
+    after every call and removed, instead of being kept as individual files. The
+    members of an image share a sample key and the shards are written to `shard_root`
+    (relative to the original working directory) or to the folder `shards` of the
+    run. Every process writes its own shards, which can be combined with
+    `merge_shards`.
+
+    With `do_write_manifest`, an entry for every file, that the rendering step writes,
+    is appended to the manifest of the run (`manifest.jsonl`, see `append_to_manifest`).
+    It contains the path, the size and the MD5 hash of the file, the hash of the
+    recipe, the seed, the rendering mode, the sets, the fingerprint of the state, that
+    the file was rendered from, and the durations of the feature generation, of the
+    rendering step and of its renders. Since the output folders are listed before and
+    after every rendering step and every new file is hashed, the manifest is opt-in.
+    """
     rendering_mode: str
     output_file_name_prefix: str = ""
     set_name_of_interest: str = "AllParticles"
@@ -336,9 +596,72 @@ class DiscreteRenderingStep(RenderingStep):
     do_save_features: bool = False
     do_save_state: bool = False
     image_file_extension: str = "png"
+    state_restoration: str = "snapshot"
+    # Use a single emission material, that takes the category colors from the object
+    # colors, instead of one material per particle in the categorical mode.
+    use_shared_categorical_shader: bool = True
+    output_method: str = "file"
+    array_codec: str = "png"
+    compression_level: int = 1
+    backend: str = "blender"
+    noise_threshold: Optional[float] = None
+    min_samples: int = 0
+    time_limit: Optional[float] = None
+    use_denoising: Optional[bool] = None
+    mesh_format: Optional[str] = None
+    feature_format: str = "csv"
+    feature_dataset_root: Optional[str] = None
+    set_info_format: str = "sqlite"
+    output_sink: str = "files"
+    shard_root: Optional[str] = None
+    max_shard_size_mb: float = 1024
+    do_write_manifest: bool = False
 
     def __attrs_post_init__(self) -> None:
         super().__attrs_post_init__()
+
+        if self.feature_format not in FEATURE_FORMATS:
+            raise ValueError(f"Unsupported feature format: {self.feature_format}. "
+                             f"Valid formats are: {', '.join(FEATURE_FORMATS)}.")
+
+        if self.output_sink not in OUTPUT_SINKS:
+            raise ValueError(f"Unsupported output sink: {self.output_sink}. Valid "
+                             f"output sinks are: {', '.join(OUTPUT_SINKS)}.")
+
+        if self.set_info_format not in SET_INFO_FORMATS:
+            raise ValueError(f"Unsupported set info format: {self.set_info_format}. "
+                             f"Valid formats are: {', '.join(SET_INFO_FORMATS)}.")
+
+        if self.state_restoration not in _STATE_RESTORATION_METHODS:
+            raise ValueError(
+                f"Unsupported state restoration method: {self.state_restoration}. "
+                f"Valid methods are: {', '.join(_STATE_RESTORATION_METHODS)}.")
+
+        if self.output_method not in _OUTPUT_METHODS:
+            raise ValueError(f"Unsupported output method: {self.output_method}. "
+                             f"Valid methods are: {', '.join(_OUTPUT_METHODS)}.")
+
+        if self.backend not in _BACKENDS:
+            raise ValueError(f"Unsupported backend: {self.backend}. Valid backends "
+                             f"are: {', '.join(_BACKENDS)}.")
+
+        if self.backend == "rasterizer" \
+                and self.rendering_mode.lower() not in RASTERIZABLE_RENDERING_MODES:
+            raise ValueError(
+                f"The rasterizer backend does not support the rendering mode "
+                f"{self.rendering_mode}. Supported rendering modes are: "
+                f"{', '.join(RASTERIZABLE_RENDERING_MODES)}.")
+
+        if self.mesh_format is not None and self.mesh_format not in MESH_FORMATS:
+            raise ValueError(f"Unsupported mesh format: {self.mesh_format}. Valid "
+                             f"formats are: {', '.join(MESH_FORMATS)}.")
+
+        if self._uses_sampling_budget() and self.rendering_mode.lower() != "real":
+            raise ValueError(
+                f"A sampling budget (noise_threshold, time_limit or use_denoising) is "
+                f"only supported by the real rendering mode, not by "
+                f"{self.rendering_mode}.")
+
         self.set_of_interest = SET_REGISTRY.query(self.set_name_of_interest,
                                                   strict=True)
 
@@ -354,8 +677,27 @@ class DiscreteRenderingStep(RenderingStep):
         self.save_measurement_technique_features()
 
     def save_particle_features(self) -> None:
-        csv_path = self.output_folder_path / "particle_features.csv"
         particles = SET_REGISTRY["AllParticles"]()    #pylint: disable=not-callable
+
+        if self.feature_format == "parquet":
+            run_folder, run_id, image_index = get_run_and_image(self.output_root)
+
+            dataset_root = run_folder / "particle_features"
+            if self.feature_dataset_root is not None:
+                # Relative paths are relative to the original working directory, so
+                # that all runs can share the same dataset.
+                dataset_root = get_run_context().to_absolute_path(
+                    self.feature_dataset_root)
+
+            save_particle_features_to_dataset(particles, dataset_root, run_id,
+                                              image_index)
+            return
+
+        # Imported here, since pandas is slow to import and only needed for the export
+        # of features.
+        import pandas as pd    # pylint: disable=import-outside-toplevel
+
+        csv_path = self.output_folder_path / "particle_features.csv"
         features = pd.DataFrame(data=[
             pd.Series(name=particle.md5,
                       data=[feature.value
@@ -368,27 +710,44 @@ class DiscreteRenderingStep(RenderingStep):
         features.to_csv(csv_path)
 
     def save_measurement_technique_features(self) -> None:
+        import pandas as pd    # pylint: disable=import-outside-toplevel
+
         csv_path = (self.output_folder_path / "measurement_technique_features.csv")
         measurement_technique = MEASUREMENT_TECHNIQUE_REGISTRY[0]
 
-        # Gather features, but ignore features that are no longer available (e.g. due to
-        # the Blender `world` object having been deleted).
+        # Gather features, but ignore features that are no longer available. The world
+        # is unlinked from the scene by some rendering modes (e.g. categorical). Its
+        # features are ignored then, as if it had been deleted.
         feature_names = []
         feature_values = []
 
+        is_world_disabled = bpy.data.scenes[0].world is None
+
         for feature in measurement_technique.features:
+            if is_world_disabled and feature.blender_link is not None \
+                    and feature.blender_link.startswith("bpy.data.worlds"):
+                continue
+
             try:
                 feature_values.append(feature.value)
                 feature_names.append(feature.name)
             except KeyError:
                 pass
 
+        if self.render_statistics is not None:
+            for feature_name, feature_value in \
+                    self.render_statistics.as_features().items():
+                feature_names.append(feature_name)
+                feature_values.append(feature_value)
+
         features = pd.DataFrame(data=pd.Series(
             name="Measurement Technique", data=feature_values, index=feature_names))
         features.index.name = "Features"
         features.to_csv(csv_path, header=False)
 
     def __call__(self, runtime_state: RuntimeState) -> RuntimeState:
+        start_time = time.perf_counter()
+
         # Use the fact, that there is only a single measurement technique.
         measurement_technique = MEASUREMENT_TECHNIQUE_REGISTRY[0]
 
@@ -401,19 +760,63 @@ class DiscreteRenderingStep(RenderingStep):
 
         self.output_folder_path.mkdir(parents=True, exist_ok=True)
 
+        previous_output_files = self._list_output_files() \
+            if self.do_write_manifest else {}
+
         # Save original state
-        original_state = State(runtime_state=runtime_state)
-        original_state.save_to_disk()
+        use_snapshot = self.state_restoration == "snapshot" \
+            and self._can_restore_from_snapshot()
+
+        if use_snapshot:
+            snapshot = RenderSnapshot.take()
+        else:
+            original_state = State(runtime_state=runtime_state)
+            original_state.save_to_disk()
 
         measurement_technique.prepare_for_render(self.rendering_mode)
 
         _Scene().prepare_for_render(self.rendering_mode)
-        _Particles(set_of_interest=self.set_of_interest,
-                   set_overlapping=self.set_overlapping).prepare_for_render(
-                       self.rendering_mode)
-        self.renderer = _Renderer()
+        particles = _Particles(
+            set_of_interest=self.set_of_interest,
+            set_overlapping=self.set_overlapping,
+            use_shared_categorical_shader=self.use_shared_categorical_shader)
+        particles.prepare_for_render(self.rendering_mode)
+        rasterizer = None
+        if self.backend == "rasterizer":
+            rasterizer = Rasterizer(
+                self.rendering_mode,
+                [particle.blender_object for particle in particles.particles_all],
+                colors=particles.get_categorical_colors())
+
+        mesh_exporter = None
+        if self.rendering_mode.lower() == "stl" and self.mesh_format is not None:
+            mesh_exporter = MeshExporter(
+                [particle.blender_object for particle in particles.particles_all],
+                file_format=self.mesh_format)
+            self._save_instance_ids(particles.particles_all)
+
+        self.renderer = _Renderer(output_method=self.output_method,
+                                  codec=self.array_codec,
+                                  compression_level=self.compression_level,
+                                  rasterizer=rasterizer,
+                                  mesh_exporter=mesh_exporter)
         self.renderer.prepare_for_render(self.rendering_mode)
 
+        self.render_statistics: Optional[RenderStatistics] = None
+        if self._uses_sampling_budget():
+            apply_sampling_budget(noise_threshold=self.noise_threshold,
+                                  min_samples=self.min_samples,
+                                  time_limit=self.time_limit,
+                                  use_denoising=self.use_denoising)
+
+            self.render_statistics = RenderStatistics()
+            self.renderer.render = record_render_statistics(
+                self.renderer.render, self.renderer.read_rendered_pixels,
+                self.render_statistics)
+
+        if self._uses_viewer_node():
+            _link_viewer_node()
+
         self.set_descriptor = f"{self.set_overlapping.md5}_over_{self.set_of_interest.md5}"    #pylint: disable=line-too-long
 
         self.set_info_root = self.output_root / "set_info"
@@ -428,21 +831,162 @@ class DiscreteRenderingStep(RenderingStep):
             save_state.save_to_disk()
             save_state.unregister()
 
+        render_start_time = time.perf_counter()
         self.render()
+        render_time = time.perf_counter() - render_start_time
 
         if self.do_save_features:
             self.save_features()
 
+        if self.do_write_manifest:
+            self._write_manifest(runtime_state, previous_output_files, {
+                "rendering_step": time.perf_counter() - start_time,
+                "render": render_time,
+            })
+
+        if self.output_sink == "shards":
+            self._pack_outputs_into_shards()
+
         # Restore original state.
-        original_state.load_from_disk()
-        runtime_state = original_state.runtime_state
-        original_state.delete()
+        if use_snapshot:
+            snapshot.restore()
+        else:
+            original_state.load_from_disk()
+            runtime_state = original_state.runtime_state
+            original_state.delete()
 
         return runtime_state
 
+    def _can_restore_from_snapshot(self) -> bool:
+        if not RenderSnapshot.is_sufficient(self.rendering_mode):
+            return False
+
+        # Compositor nodes, that are not in use, are replaced by the viewer node setup.
+        if self._uses_viewer_node() and (
+                self.rendering_mode.lower() in _NON_COMPOSITING_RENDERING_MODES
+                or not _is_compositor_in_use()):
+            return not RenderSnapshot.has_compositing_nodes()
+
+        return True
+
+    def _uses_sampling_budget(self) -> bool:
+        return self.noise_threshold is not None or self.time_limit is not None \
+            or self.use_denoising is not None
+
+    def _uses_viewer_node(self) -> bool:
+        return self.output_method == "array" and self.backend == "blender" \
+            and self.rendering_mode.lower() != "stl"
+
+    def _get_output_folder_paths(self) -> List[Path]:
+        """Get the folders, that the rendering step writes its outputs to."""
+        return [self.output_folder_path]
+
+    def _list_output_files(self) -> Dict[Path, Tuple[int, int]]:
+        """List the files in the output folders with their modification times and
+        sizes."""
+        output_files = {}
+        for output_folder_path in self._get_output_folder_paths():
+            if not output_folder_path.exists():
+                continue
+
+            for file_path in output_folder_path.rglob("*"):
+                if file_path.is_file():
+                    stat = file_path.stat()
+                    output_files[file_path] = (stat.st_mtime_ns, stat.st_size)
+
+        return output_files
+
+    def _write_manifest(self, runtime_state: RuntimeState,
+                        previous_output_files: Dict[Path, Tuple[int, int]],
+                        durations: Dict[str, float]) -> None:
+        # Images, that are written asynchronously, need to be complete.
+        flush_image_writer()
+
+        output_files = self._list_output_files()
+        written_file_paths = sorted(
+            file_path for file_path, file_info in output_files.items()
+            if previous_output_files.get(file_path) != file_info)
+
+        run_folder, run_id, image_index = get_run_and_image(self.output_root)
+        context = get_manifest_context()
+        sample_key = get_sample_key(run_id, image_index)
+
+        entry_template: Dict[str, Any] = {
+            "run": run_id,
+            "image": image_index,
+            "recipe_md5": context.recipe_md5,
+            "seed": runtime_state.seed,
+            "state": context.state_fingerprint,
+            "rendering_step": type(self).__name__,
+            "rendering_mode": self.rendering_mode,
+            "set_descriptor": self.set_descriptor,
+            "set_of_interest": self.set_of_interest.name,
+            "set_of_interest_md5": self.set_of_interest.md5,
+            "set_overlapping": self.set_overlapping.name,
+            "set_overlapping_md5": self.set_overlapping.md5,
+            "durations": {
+                "feature_generation": context.feature_generation_time,
+                **durations
+            },
+        }
+
+        entries = []
+        for file_path in written_file_paths:
+            entry = {
+                "file_path": file_path.absolute().relative_to(run_folder).as_posix(),
+                "size": output_files[file_path][1],
+                "md5": get_file_md5(file_path),
+                **entry_template,
+            }
+            if self.output_sink == "shards":
+                entry["shard_member"] = \
+                    f"{sample_key}.{get_member_extension(file_path, self.output_root)}"
+            entries.append(entry)
+
+        append_to_manifest(run_folder / MANIFEST_FILE_NAME, entries)
+
+    def _pack_outputs_into_shards(self) -> None:
+        # Images, that are written asynchronously, need to be complete.
+        flush_image_writer()
+
+        run_folder, run_id, image_index = get_run_and_image(self.output_root)
+
+        shard_root = run_folder / "shards"
+        if self.shard_root is not None:
+            # Relative paths are relative to the original working directory, so that
+            # all runs can share the same shard root.
+            shard_root = get_run_context().to_absolute_path(self.shard_root)
+
+        shard_writer = get_shard_writer(shard_root,
+                                        max_shard_size=int(self.max_shard_size_mb *
+                                                           2**20))
+        sample_key = get_sample_key(run_id, image_index)
+        for output_folder_path in self._get_output_folder_paths():
+            if output_folder_path.exists():
+                shard_writer.add_folder(sample_key, output_folder_path,
+                                        self.output_root)
+
+    def _save_instance_ids(self, particles: List[Particle]) -> None:
+        instance_ids_file_path = self.output_folder_path / "instance_ids.csv"
+        with open(instance_ids_file_path, "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file, lineterminator="\n")
+            writer.writerow(["instance_id", "particle_hash"])
+            writer.writerows(
+                (instance_id, particle.md5)
+                for instance_id, particle in enumerate(particles, start=1))
+
     def save_set_info(self) -> None:
-        self._save_set_hashes()
-        self._save_particle_set_associations()
+        if self.set_info_format == "sqlite":
+            _, run_id, image_index = get_run_and_image(self.output_root)
+            with SetIndex(self.set_info_root / "set_index.sqlite") as set_index:
+                set_index.add([self.set_of_interest, self.set_overlapping], run_id,
+                              image_index)
+            return
+
+        # Rendering steps, that run in parallel processes, share the set info files.
+        with file_lock(self.set_info_root / ".lock"):
+            self._save_set_hashes()
+            self._save_particle_set_associations()
 
     def _save_particle_set_associations(self) -> None:
         sets = [self.set_of_interest, self.set_overlapping]
@@ -460,23 +1004,19 @@ class DiscreteRenderingStep(RenderingStep):
     def _save_set_hashes(self) -> None:
         set_info_file_path = self.set_info_root / "set_hashes.csv"
 
+        set_info = []
         if set_info_file_path.exists():
-            set_info_old = pd.read_csv(set_info_file_path)
-        else:
-            set_info_old = pd.DataFrame()
-
-        set_hashes = pd.Series(
-            name="set_hash", data=[self.set_of_interest.md5, self.set_overlapping.md5])
-
-        set_names = pd.Series(
-            name="set_name",
-            data=[self.set_of_interest.name, self.set_overlapping.name])
-
-        set_info_new = pd.concat([set_hashes, set_names], axis=1)
+            with open(set_info_file_path, "r", encoding="utf-8", newline="") as file:
+                set_info = [tuple(row) for row in csv.reader(file)][1:]
 
-        set_info = pd.concat([set_info_old, set_info_new]).drop_duplicates()
+        for set_ in [self.set_of_interest, self.set_overlapping]:
+            if (set_.md5, set_.name) not in set_info:
+                set_info.append((set_.md5, set_.name))
 
-        set_info.to_csv(set_info_file_path, index=False)
+        with open(set_info_file_path, "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file, lineterminator="\n")
+            writer.writerow(["set_hash", "set_name"])
+            writer.writerows(set_info)
 
     @abstractmethod
     def render(self) -> None:
@@ -485,18 +1025,74 @@ class DiscreteRenderingStep(RenderingStep):
 
 @attr.s(auto_attribs=True)
 class RenderParticlesIndividually(DiscreteRenderingStep):
-    """Class to render a whole set of particles into a single image."""
+    """Class to render every particle of a set into a separate image.
+
+    With `crop_to_particle`, only the region of the image, that contains the particle,
+    is rendered and saved, i.e. the projected bounding box of the particle plus
+    `crop_margin` pixels. The offsets of the crops are written to `crops.csv` in the
+    output folder, so that full images can be rebuilt with `uncrop_image`. Particles,
+    that are not completely in front of the camera, are rendered in full.
+
+    Attributes:
+        crop_to_particle (bool): Whether to render only the region of the particles.
+            Defaults to False.
+        crop_margin (int): Margin around the projected bounding boxes of the particles
+            in pixels. Defaults to 2.
+    """
+    crop_to_particle: bool = False
+    crop_margin: int = 2
+
+    def __attrs_post_init__(self) -> None:
+        super().__attrs_post_init__()
+
+        if self.crop_to_particle and (
+                self.rendering_mode.lower() not in _CROPPABLE_RENDERING_MODES
+                or self.backend != "blender"):
+            raise ValueError(
+                f"Cropping to particles requires the blender backend and one of the "
+                f"rendering modes {', '.join(_CROPPABLE_RENDERING_MODES)}.")
 
     def render(self) -> None:
+        width, height = get_image_size()
+        crops = []
+
         for particle in self.set_of_interest():
             self.renderer.show_object(particle.blender_object)
 
             file_name = f"{self.output_file_name_prefix}{particle.md5}.{self.image_file_extension}"    #pylint: disable=line-too-long
             file_path = self.output_folder_path / file_name
+
+            if self.crop_to_particle:
+                region = get_projected_bounding_box(particle.blender_object,
+                                                    margin=self.crop_margin)
+                set_render_border(region, width, height)
+
+                if region is None:
+                    crops.append((file_name, 0, 0, width, height))
+                else:
+                    crop_height, crop_width = region.shape
+                    crops.append((file_name, region.x_min, height - region.y_max,
+                                  crop_width, crop_height))
+
             self.renderer.render(file_path)
 
             self.renderer.hide_object(particle.blender_object)
 
+        if self.crop_to_particle:
+            set_render_border(None, width, height)
+            self._save_crops(crops, width, height)
+
+    def _save_crops(self, crops: List[Tuple[str, int, int, int, int]], width: int,
+                    height: int) -> None:
+        crops_file_path = self.output_folder_path / "crops.csv"
+        with open(crops_file_path, "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file, lineterminator="\n")
+            writer.writerow([
+                "file_name", "x_offset", "y_offset", "crop_width", "crop_height",
+                "image_width", "image_height"
+            ])
+            writer.writerows(crop + (width, height) for crop in crops)
+
 
 @attr.s(auto_attribs=True)
 class RenderParticlesTogether(DiscreteRenderingStep):
@@ -512,3 +1108,306 @@ class RenderParticlesTogether(DiscreteRenderingStep):
         file_name = f"{self.output_file_name_prefix}{self.set_descriptor}.{self.image_file_extension}"    #pylint: disable=line-too-long
         file_path = self.output_folder_path / file_name
         self.renderer.render(file_path)
+
+
+@attr.s(auto_attribs=True)
+class RenderParticlesTiled(RenderParticlesTogether):
+    """Class to render a whole set of particles into a single image, that is split
+    into tiles, which are rendered in parallel by a pool of worker processes from the
+    same saved scene and stitched back together. Reduces the time to render a single
+    high-resolution image on machines with many CPU cores.
+
+    The tiles are rendered with Blender's render border and written as OpenEXR files
+    with linear values. The stitched image is saved with the color management and the
+    image settings of the scene. Compositor effects, that depend on neighboring pixels
+    (e.g. the normalization of the depth_map mode), can't be applied to tiles.
+    Denoising is applied per tile, which may cause visible seams.
+
+    Attributes:
+        num_tiles_x (int): Number of tiles in x direction. Defaults to 2.
+        num_tiles_y (int): Number of tiles in y direction. Defaults to 2.
+        num_workers (Optional[int]): Number of worker processes. `None` means one per
+            tile, but at most the number of CPUs. Defaults to None.
+    """
+    rendering_mode: str = "real"
+    num_tiles_x: int = 2
+    num_tiles_y: int = 2
+    num_workers: Optional[int] = None
+
+    def __attrs_post_init__(self) -> None:
+        super().__attrs_post_init__()
+
+        if self.num_tiles_x < 1 or self.num_tiles_y < 1:
+            raise ValueError("The number of tiles must be at least 1.")
+
+        if self.rendering_mode.lower() == "stl" or self.backend != "blender" \
+                or self.output_method != "file":
+            raise ValueError(
+                f"{type(self).__name__} requires an image rendering mode, the blender "
+                f"backend and the file output method.")
+
+    def render(self) -> None:
+        for particle in self.set_of_interest():
+            self.renderer.show_object(particle.blender_object)
+
+        for particle in self.set_overlapping():
+            self.renderer.show_object(particle.blender_object)
+
+        if _is_compositor_in_use():
+            for node in bpy.data.scenes[0].node_tree.nodes:
+                if node.type not in _TILEABLE_COMPOSITING_NODE_TYPES:
+                    raise ValueError(
+                        f"The compositor node {node.name} can't be applied to tiles.")
+
+        width, height = get_image_size()
+
+        tiles = split_into_tiles(width, height, self.num_tiles_x, self.num_tiles_y)
+        tile_pixels = render_tiles(tiles, num_workers=self.num_workers)
+        pixels = stitch_tiles(tiles, tile_pixels, width, height)
+
+        file_name = f"{self.output_file_name_prefix}{self.set_descriptor}.{self.image_file_extension}"    #pylint: disable=line-too-long
+        blender.save_pixels_as_render(pixels, self.output_folder_path / file_name)
+
+
+@attr.s(auto_attribs=True)
+class RenderPassesTogether(RenderParticlesTogether):
+    """Class to render a whole set of particles into a single image and to write
+    additional render passes (instance mask, depth and normals) of the same render, so
+    that the scene only needs to be prepared and synchronized once.
+
+    The passes are written by compositor File Output nodes as OpenEXR files with raw
+    values to subfolders of the output root, that are named like the passes. The values
+    of the instance mask are the pass indices of the particles, i.e. their position in
+    the particle registry starting at 1 (0 is the background). Requires Cycles.
+    """
+    rendering_mode: str = "real"
+    pass_names: List[str] = attr.Factory(lambda: list(_RENDER_PASSES))
+
+    def __attrs_post_init__(self) -> None:
+        super().__attrs_post_init__()
+
+        if self.backend != "blender":
+            raise ValueError(f"{type(self).__name__} requires the blender backend.")
+
+        for pass_name in self.pass_names:
+            if pass_name not in _RENDER_PASSES:
+                raise ValueError(
+                    f"Unsupported render pass: {pass_name}. Valid render passes are: "
+                    f"{', '.join(_RENDER_PASSES)}.")
+
+    def _get_output_folder_paths(self) -> List[Path]:
+        output_folder_paths = super()._get_output_folder_paths()
+        for pass_name in self.pass_names:
+            output_folder_path = self.output_root / pass_name
+            if self.subfolder is not None:
+                output_folder_path /= self.subfolder
+            output_folder_paths.append(output_folder_path)
+        return output_folder_paths
+
+    def _can_restore_from_snapshot(self) -> bool:
+        # Compositor nodes, that are not in use, are replaced by `render`.
+        return super()._can_restore_from_snapshot() and (
+            _is_compositor_in_use() or not RenderSnapshot.has_compositing_nodes())
+
+    def render(self) -> None:
+        scene = bpy.data.scenes[0]
+
+        if scene.render.engine != "CYCLES":
+            raise ValueError(
+                f"{type(self).__name__} requires the Cycles render engine, but the "
+                f"scene uses {scene.render.engine}.")
+
+        self.particles_by_pass_index = assign_particle_pass_indices()
+
+        render_layers_node = _setup_compositor()
+
+        written_file_paths = {}
+        self.pass_file_paths: Dict[str, Path] = {}
+        for pass_name in self.pass_names:
+            written_file_paths[pass_name], self.pass_file_paths[pass_name] = \
+                self._add_file_output_node(render_layers_node, pass_name)
+
+        super().render()
+
+        # File Output nodes always append the frame number to the file names.
+        for pass_name, file_path in self.pass_file_paths.items():
+            os.replace(written_file_paths[pass_name], file_path)
+
+    def _add_file_output_node(self, render_layers_node: bpy.types.Node,
+                              pass_name: str) -> Tuple[Path, Path]:
+        """Add a File Output node for a render pass.
+
+        Returns:
+            Tuple[Path, Path]: Path of the file that is written by the node and the
+                final path of the file.
+        """
+        output_name, view_layer_property_name, color_mode = _RENDER_PASSES[pass_name]
+
+        scene = bpy.data.scenes[0]
+        setattr(scene.view_layers[0], view_layer_property_name, True)
+
+        output_folder_path = self.output_root / pass_name
+        if self.subfolder is not None:
+            output_folder_path /= self.subfolder
+        output_folder_path.mkdir(parents=True, exist_ok=True)
+
+        file_output_node = scene.node_tree.nodes.new("CompositorNodeOutputFile")
+        file_output_node.base_path = str(output_folder_path.resolve())
+        file_output_node.format.file_format = "OPEN_EXR"
+        file_output_node.format.color_mode = color_mode
+        file_output_node.format.color_depth = "32"
+
+        file_name = f"{self.output_file_name_prefix}{self.set_descriptor}"
+        file_output_node.file_slots[0].path = f"{file_name}_"
+
+        scene.node_tree.links.new(render_layers_node.outputs[output_name],
+                                  file_output_node.inputs[0])
+
+        written_file_path = output_folder_path / \
+            f"{file_name}_{scene.frame_current:04d}.exr"
+        return written_file_path, output_folder_path / f"{file_name}.exr"
+
+
+@attr.s(auto_attribs=True)
+class RenderParticleMasks(RenderPassesTogether):
+    """Class to derive binary masks of the particles from a single instance mask,
+    instead of rendering each particle individually.
+
+    Writes the mask of the set of interest (`<set_descriptor>.png`), the mask of the
+    overlapping particles, that are not of interest
+    (`<set_descriptor>_overlapping.png`), and a mask for every particle of interest
+    (`<particle.md5>.png`) to the "masks" folder of the output root.
+
+    Other than the images of `RenderParticlesIndividually`, the masks only contain the
+    visible parts of the particles, i.e. particles may be occluded by others.
+    """
+    rendering_mode: str = "categorical"
+    pass_names: List[str] = attr.Factory(lambda: ["instance_mask"])
+    do_save_particle_masks: bool = True
+    do_save_overlap_mask: bool = True
+
+    def __attrs_post_init__(self) -> None:
+        super().__attrs_post_init__()
+
+        if "instance_mask" not in self.pass_names:
+            raise ValueError(
+                f"{type(self).__name__} requires the instance_mask render pass.")
+
+    def _get_output_folder_paths(self) -> List[Path]:
+        masks_folder_path = self.output_root / "masks"
+        if self.subfolder is not None:
+            masks_folder_path /= self.subfolder
+        return super()._get_output_folder_paths() + [masks_folder_path]
+
+    def render(self) -> None:
+        super().render()
+
+        instance_mask = load_instance_mask(self.pass_file_paths["instance_mask"])
+
+        pass_indices = {
+            particle.name: pass_index
+            for pass_index, particle in self.particles_by_pass_index.items()
+        }
+
+        particles_of_interest = self.set_of_interest()
+        particles_overlapping = [
+            particle for particle in self.set_overlapping()
+            if particle not in particles_of_interest
+        ]
+
+        masks_folder_path = self.output_root / "masks"
+        if self.subfolder is not None:
+            masks_folder_path /= self.subfolder
+        masks_folder_path.mkdir(parents=True, exist_ok=True)
+
+        file_name = f"{self.output_file_name_prefix}{self.set_descriptor}"
+
+        set_mask = get_mask(instance_mask,
+                            (pass_indices[particle.name]
+                             for particle in particles_of_interest))
+        save_mask(set_mask, masks_folder_path / f"{file_name}.png")
+
+        if self.do_save_overlap_mask:
+            overlap_mask = get_mask(instance_mask,
+                                    (pass_indices[particle.name]
+                                     for particle in particles_overlapping))
+            save_mask(overlap_mask, masks_folder_path / f"{file_name}_overlapping.png")
+
+        if self.do_save_particle_masks:
+            for particle in particles_of_interest:
+                particle_mask = instance_mask == pass_indices[particle.name]
+                file_path = masks_folder_path / \
+                    f"{self.output_file_name_prefix}{particle.md5}.png"
+                save_mask(particle_mask, file_path)
+
+
+def assign_particle_pass_indices() -> Dict[int, Particle]:
+    """Set the pass index of every particle to its position in the particle registry
+    (starting at 1), so that it can be identified in the object index pass.
+
+    Returns:
+        Dict[int, Particle]: Particles by their pass indices.
+    """
+    particles_by_pass_index = {}
+    for pass_index, particle in enumerate(PARTICLE_REGISTRY, start=1):
+        assert isinstance(particle, Particle)
+        particle.blender_object.pass_index = pass_index
+        particles_by_pass_index[pass_index] = particle
+    return particles_by_pass_index
+
+
+def _is_compositor_in_use() -> bool:
+    render_settings = bpy.data.scenes[0].render
+    return bpy.data.scenes[0].use_nodes and render_settings.use_compositing
+
+
+def _setup_compositor() -> bpy.types.Node:
+    """Make sure, that the compositor is used and contains a render layers node.
+    Compositor nodes, that are in use, are kept, so that they still apply to the
+    rendered image. Otherwise, they are replaced by a render layers node, that is
+    linked to a composite node.
+
+    Returns:
+        bpy.types.Node: Render layers node.
+    """
+    scene = bpy.data.scenes[0]
+
+    if _is_compositor_in_use():
+        compositing_nodes = scene.node_tree.nodes
+        for node in compositing_nodes:
+            if node.type == "R_LAYERS":
+                return node
+        return compositing_nodes.new("CompositorNodeRLayers")
+
+    scene.use_nodes = True
+    scene.render.use_compositing = True
+
+    compositing_nodes = scene.node_tree.nodes
+    for node in list(compositing_nodes):
+        compositing_nodes.remove(node)
+
+    render_layers_node = compositing_nodes.new("CompositorNodeRLayers")
+    composite_node = compositing_nodes.new("CompositorNodeComposite")
+    scene.node_tree.links.new(render_layers_node.outputs["Image"],
+                              composite_node.inputs["Image"])
+
+    return render_layers_node
+
+
+def _link_viewer_node() -> None:
+    """Link a viewer node to the output of the compositor, so that the rendered pixels
+    can be read from the "Viewer Node" image."""
+    scene = bpy.data.scenes[0]
+    render_layers_node = _setup_compositor()
+
+    compositing_nodes = scene.node_tree.nodes
+    output_socket = render_layers_node.outputs["Image"]
+    for node in compositing_nodes:
+        if node.type == "COMPOSITE" and node.inputs["Image"].is_linked:
+            output_socket = node.inputs["Image"].links[0].from_socket
+            break
+
+    viewer_node = compositing_nodes.new("CompositorNodeViewer")
+    viewer_node.use_alpha = True
+    scene.node_tree.links.new(output_socket, viewer_node.inputs["Image"])
+    compositing_nodes.active = viewer_node
@@ -0,0 +1,192 @@
+"""Module for time- or noise-budgeted sampling of Cycles and statistics of renders."""
+
+import logging
+import re
+import time
+from types import TracebackType
+from typing import Any, Callable, Dict, Optional, Type
+
+import attr
+import bpy
+import numpy as np
+
+from ....custom_types import AnyPath
+
+# Cycles reports its progress as e.g. "Sample 37/128" in the render stats.
+_SAMPLE_PATTERN = re.compile(r"Sample (\d+)/(\d+)")
+
+# Rec. 709 luma coefficients.
+_LUMA_WEIGHTS = np.array([0.2126, 0.7152, 0.0722])
+
+
+def apply_sampling_budget(noise_threshold: Optional[float] = None,
+                          min_samples: int = 0,
+                          time_limit: Optional[float] = None,
+                          use_denoising: Optional[bool] = None) -> None:
+    """Configure the sampling of Cycles. The number of samples of the scene (see the
+    `cycles_samples` feature) is the upper limit of the samples.
+
+    Args:
+        noise_threshold (Optional[float], optional): Noise level, at which adaptive
+            sampling stops to sample a pixel. `None` disables adaptive sampling.
+            Defaults to None.
+        min_samples (int, optional): Minimum number of samples of adaptive sampling
+            (0 lets Cycles choose). Defaults to 0.
+        time_limit (Optional[float], optional): Maximum time in seconds to render an
+            image (excluding the denoising). `None` means no limit. Defaults to None.
+        use_denoising (Optional[bool], optional): Whether to denoise the images with
+            OpenImageDenoise on the CPU. `None` keeps the denoising settings of the
+            scene. Defaults to None.
+    """
+    cycles = bpy.data.scenes[0].cycles
+
+    cycles.use_adaptive_sampling = noise_threshold is not None
+    if noise_threshold is not None:
+        cycles.adaptive_threshold = noise_threshold
+        cycles.adaptive_min_samples = min_samples
+
+    cycles.time_limit = time_limit if time_limit is not None else 0
+
+    if use_denoising is not None:
+        cycles.use_denoising = use_denoising
+        if use_denoising:
+            cycles.denoiser = "OPENIMAGEDENOISE"
+            cycles.denoising_input_passes = "RGB_ALBEDO_NORMAL"
+
+
+def parse_sample_count(render_stats: str) -> Optional[int]:
+    """Parse the number of rendered samples from the render stats of Cycles.
+
+    Args:
+        render_stats (str): Render stats (e.g. "Fra:1 | Mem:12.3M | Sample 37/128").
+
+    Returns:
+        Optional[int]: Number of rendered samples or `None`, if the stats don't
+            report samples.
+    """
+    match = _SAMPLE_PATTERN.search(render_stats)
+    return int(match.group(1)) if match is not None else None
+
+
+def estimate_noise(pixels: np.ndarray) -> float:
+    """Estimate the standard deviation of the noise of an image with the method of
+    Immerkær ("Fast Noise Variance Estimation", 1996), which is insensitive to edges
+    and smooth gradients. The estimate is calculated on the luma of the image.
+
+    Args:
+        pixels (np.ndarray): Array of shape (height, width) or (height, width,
+            channels) with values between 0 and 1.
+
+    Returns:
+        float: Estimated standard deviation of the noise.
+    """
+    if pixels.ndim == 3:
+        if pixels.shape[-1] >= 3:
+            pixels = pixels[..., :3] @ _LUMA_WEIGHTS
+        else:
+            pixels = pixels[..., 0]
+
+    height, width = pixels.shape
+    if height < 3 or width < 3:
+        return 0.0
+
+    pixels = pixels.astype(np.float64)
+
+    # Convolution with [[1, -2, 1], [-2, 4, -2], [1, -2, 1]], i.e. the difference of
+    # two Laplacians, which cancels the structure of the image.
+    row_filtered = pixels[:, :-2] - 2 * pixels[:, 1:-1] + pixels[:, 2:]
+    filtered = row_filtered[:-2] - 2 * row_filtered[1:-1] + row_filtered[2:]
+
+    return float(
+        np.sqrt(np.pi / 2) * np.sum(np.abs(filtered)) / (6 * (width - 2) *
+                                                         (height - 2)))
+
+
+@attr.s(auto_attribs=True)
+class RenderStatistics:
+    """Statistics of the renders of a rendering step.
+
+    Attributes:
+        num_renders (int): Number of renders.
+        samples (int): Total number of rendered samples (per pixel).
+        render_time (float): Total render time in seconds.
+        residual_noise (float): Sum of the estimated noise levels of the images.
+    """
+    num_renders: int = 0
+    samples: int = 0
+    render_time: float = 0.0
+    residual_noise: float = 0.0
+
+    def add(self, samples: int, render_time: float, residual_noise: float) -> None:
+        self.num_renders += 1
+        self.samples += samples
+        self.render_time += render_time
+        self.residual_noise += residual_noise
+
+    def as_features(self) -> Dict[str, float]:
+        """Get the statistics per render (i.e. averaged over all renders) as features.
+
+        Returns:
+            Dict[str, float]: Values by feature name.
+        """
+        num_renders = max(self.num_renders, 1)
+        return {
+            "rendered_samples": self.samples / num_renders,
+            "render_time": self.render_time / num_renders,
+            "residual_noise": self.residual_noise / num_renders,
+        }
+
+
+class _SampleCounter:
+    """Context manager to record the number of samples, that Cycles reports during a
+    render."""
+
+    def __init__(self) -> None:
+        self.samples: Optional[int] = None
+
+    def _on_render_stats(self, render_stats: str, *_: Any) -> None:
+        samples = parse_sample_count(render_stats)
+        if samples is not None:
+            self.samples = samples
+
+    def __enter__(self) -> "_SampleCounter":
+        bpy.app.handlers.render_stats.append(self._on_render_stats)
+        return self
+
+    def __exit__(self, exception_type: Optional[Type[BaseException]],
+                 exception: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        bpy.app.handlers.render_stats.remove(self._on_render_stats)
+
+
+def record_render_statistics(
+        render: Callable[[AnyPath], Any], read_pixels: Callable[[AnyPath], np.ndarray],
+        statistics: RenderStatistics) -> Callable[[AnyPath], None]:
+    """Wrap a render function, so that it records the number of samples, the render
+    time and the residual noise of every render.
+
+    Args:
+        render (Callable[[AnyPath], Any]): Function, that renders an image to a path.
+        read_pixels (Callable[[AnyPath], np.ndarray]): Function, that returns the
+            pixels of the image, that has been rendered to a path.
+        statistics (RenderStatistics): Statistics to add the renders to.
+
+    Returns:
+        Callable[[AnyPath], None]: Wrapped render function.
+    """
+
+    def render_and_record(output_path: AnyPath) -> None:
+        with _SampleCounter() as sample_counter:
+            start_time = time.perf_counter()
+            render(output_path)
+            render_time = time.perf_counter() - start_time
+
+        samples = sample_counter.samples
+        if samples is None:
+            samples = bpy.data.scenes[0].cycles.samples
+            logging.getLogger("synthPIC2").debug(
+                "Cycles did not report the rendered samples. Assuming %d.", samples)
+
+        statistics.add(samples, render_time, estimate_noise(read_pixels(output_path)))
+
+    return render_and_record
@@ -0,0 +1,147 @@
+"""Module for the SetIndex class, which records sets and their particles."""
+
+import sqlite3
+from types import TracebackType
+from typing import Dict, List, Optional, Sequence, Tuple, Type
+
+from ....custom_types import AnyPath
+from ...process_conditions.sets import Set
+
+SET_INFO_FORMATS = ("sqlite", "csv")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sets (
+    set_hash TEXT NOT NULL,
+    set_name TEXT NOT NULL,
+    PRIMARY KEY (set_hash, set_name)
+);
+CREATE TABLE IF NOT EXISTS memberships (
+    set_hash TEXT NOT NULL,
+    particle_hash TEXT NOT NULL,
+    PRIMARY KEY (set_hash, particle_hash)
+);
+CREATE TABLE IF NOT EXISTS image_sets (
+    run TEXT NOT NULL,
+    image INTEGER NOT NULL,
+    set_hash TEXT NOT NULL,
+    set_name TEXT NOT NULL,
+    PRIMARY KEY (run, image, set_hash, set_name)
+);
+"""
+
+
+class SetIndex:
+    """Append-only index of the sets, that were rendered, and the particles, that they
+    contain, stored in an SQLite database.
+
+    Rows are only ever inserted (and duplicates ignored), so the cost of recording the
+    sets of a rendering step doesn't grow with the size of the index. The database is
+    opened in WAL mode and every write is a single transaction, so that parallel jobs,
+    which share an output root, can record their sets concurrently. Like all SQLite
+    databases in WAL mode, the index must not be stored on a network file system.
+
+    Example:
+        >>> with SetIndex("set_info/set_index.sqlite") as set_index:
+        ...     set_index.add([set_of_interest], run_id="run0", image_index=0)
+        ...     set_index.get_memberships(run_id="run0", image_index=0)
+
+    Args:
+        file_path (AnyPath): Path of the database file. It is created, if it does not
+            exist.
+        timeout (float, optional): Time in seconds to wait for concurrent writers.
+            Defaults to 60.
+    """
+
+    def __init__(self, file_path: AnyPath, timeout: float = 60) -> None:
+        # Transactions are controlled explicitly.
+        self._connection = sqlite3.connect(str(file_path),
+                                           timeout=timeout,
+                                           isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(_SCHEMA)
+
+    def __enter__(self) -> "SetIndex":
+        return self
+
+    def __exit__(self, exception_type: Optional[Type[BaseException]],
+                 exception: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def add(self, sets: Sequence[Set], run_id: str, image_index: int) -> None:
+        """Record sets, their particles and that they were rendered in an image.
+
+        Args:
+            sets (Sequence[Set]): Sets to record.
+            run_id (str): ID of the run.
+            image_index (int): Index of the image in the run.
+        """
+        set_records = [(set_.md5, set_.name, set_) for set_ in sets]
+
+        connection = self._connection
+        # Take the write lock right away, so that concurrent writers wait instead of
+        # failing to upgrade their read locks.
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for set_hash, set_name, set_ in set_records:
+                connection.execute("INSERT OR IGNORE INTO sets VALUES (?, ?)",
+                                   (set_hash, set_name))
+                connection.execute(
+                    "INSERT OR IGNORE INTO image_sets VALUES (?, ?, ?, ?)",
+                    (run_id, image_index, set_hash, set_name))
+
+                # The hash of a set is determined by its particles, so their
+                # memberships only need to be recorded once.
+                is_recorded = connection.execute(
+                    "SELECT EXISTS (SELECT 1 FROM memberships WHERE set_hash = ?)",
+                    (set_hash,)).fetchone()[0]
+                if not is_recorded:
+                    connection.executemany(
+                        "INSERT OR IGNORE INTO memberships VALUES (?, ?)",
+                        [(set_hash, getattr(particle, "md5"))
+                         for particle in set_()])
+
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def get_set_hashes(self) -> List[Tuple[str, str]]:
+        """Get the hashes and names of all recorded sets.
+
+        Returns:
+            List[Tuple[str, str]]: Hashes and names of the sets.
+        """
+        return self._connection.execute(
+            "SELECT set_hash, set_name FROM sets ORDER BY set_name, set_hash"
+        ).fetchall()
+
+    def get_memberships(self, run_id: str, image_index: int) -> Dict[str, List[str]]:
+        """Get the particles of the sets, that were rendered in an image.
+
+        Args:
+            run_id (str): ID of the run.
+            image_index (int): Index of the image in the run.
+
+        Returns:
+            Dict[str, List[str]]: Hashes of the particles by set name.
+        """
+        rows = self._connection.execute(
+            """
+            SELECT image_sets.set_name, memberships.particle_hash
+            FROM image_sets
+            LEFT JOIN memberships ON memberships.set_hash = image_sets.set_hash
+            WHERE image_sets.run = ? AND image_sets.image = ?
+            ORDER BY image_sets.set_name, memberships.particle_hash
+            """, (run_id, image_index)).fetchall()
+
+        memberships: Dict[str, List[str]] = {}
+        for set_name, particle_hash in rows:
+            particle_hashes = memberships.setdefault(set_name, [])
+            if particle_hash is not None:
+                particle_hashes.append(particle_hash)
+
+        return memberships
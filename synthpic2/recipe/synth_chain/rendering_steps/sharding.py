@@ -0,0 +1,397 @@
+"""Module to pack rendering outputs into size-bounded tar shards (WebDataset-style)
+and to merge the shards of runs.
+
+Every output file of an image is stored as member `<sample key>.<extension>` of a
+shard, where the sample key identifies the image and the extension is the path of the
+file relative to the output root (with "." instead of "/"), e.g.
+`run0/image3.real.particle_features.csv`. Every shard `<name>.tar` has a sidecar index
+`<name>.index.csv`, which lists the sample key, the name, the offset of the data and
+the size of every member, so that members can be read without scanning the shard.
+
+Usage (merge the shards of runs into run-level shards):
+    python -m synthpic2.recipe.synth_chain.rendering_steps.sharding \
+        output/<config>/<timestamp>/*/shards --output-root shards
+"""
+
+import argparse
+import csv
+import io
+import logging
+import os
+from pathlib import Path
+from pathlib import PurePosixPath
+import socket
+import tarfile
+import time
+from typing import BinaryIO, Dict, List, Optional, Sequence, Tuple
+import uuid
+
+import attr
+
+from ....custom_types import AnyPath
+
+OUTPUT_SINKS = ("files", "shards")
+
+SHARD_SUFFIX = ".tar"
+SHARD_INDEX_SUFFIX = ".index.csv"
+_PARTIAL_SUFFIX = ".partial"
+
+_MEGABYTE = 2**20
+
+
+def get_sample_key(run_id: str, image_index: int) -> str:
+    """Get the sample key of an image. Dots are replaced, since WebDataset splits the
+    member names at the first dot of the file name. The run ID "." (i.e. a run, that
+    was not started by Hydra) is omitted.
+
+    Args:
+        run_id (str): ID of the run.
+        image_index (int): Index of the image in the run.
+
+    Returns:
+        str: Sample key.
+    """
+    sample_key = PurePosixPath(run_id) / f"image{image_index}"
+    return sample_key.as_posix().replace(".", "_")
+
+
+def get_member_extension(file_path: AnyPath, relative_to: AnyPath) -> str:
+    """Get the extension of the member of a file, i.e. its path relative to a folder
+    with "." instead of "/".
+
+    Args:
+        file_path (AnyPath): Path of the file.
+        relative_to (AnyPath): Folder, that the extension is relative to.
+
+    Returns:
+        str: Extension of the member.
+    """
+    return ".".join(Path(file_path).relative_to(relative_to).parts)
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class ShardMember:
+    """Entry of a shard index.
+
+    Attributes:
+        sample_key (str): Key of the sample, that the member belongs to.
+        name (str): Name of the member in the shard.
+        offset (int): Offset of the data of the member in the shard in bytes.
+        size (int): Size of the data in bytes.
+    """
+    sample_key: str
+    name: str
+    offset: int
+    size: int
+
+
+class ShardWriter:
+    """Class to write files into tar shards, that don't exceed a maximum size (unless
+    a single file is larger).
+
+    The names of the shards contain the host name, the process ID and a random token,
+    so that parallel processes and jobs can write to the same shard root. Shards are
+    written to `<name>.tar.partial` and only renamed to `<name>.tar` (after their index
+    has been written), when they are complete.
+
+    Args:
+        shard_root (AnyPath): Folder of the shards. It is created, if necessary.
+        max_shard_size (int, optional): Maximum size of a shard in bytes. Defaults to 1
+            GiB.
+        name_prefix (str, optional): Prefix of the shard names. Defaults to "shard".
+    """
+
+    def __init__(self,
+                 shard_root: AnyPath,
+                 max_shard_size: int = 1024 * _MEGABYTE,
+                 name_prefix: str = "shard") -> None:
+        self.shard_root = Path(shard_root)
+        self.shard_root.mkdir(parents=True, exist_ok=True)
+        self.max_shard_size = max_shard_size
+        self.shard_paths: List[Path] = []
+
+        self._name_prefix = f"{name_prefix}-{socket.gethostname()}-{os.getpid()}-" \
+            f"{uuid.uuid4().hex[:8]}"
+        self._tar_file: Optional[tarfile.TarFile] = None
+        self._members: List[ShardMember] = []
+
+    def add(self, sample_key: str, extension: str, data: bytes) -> None:
+        """Add a member `<sample_key>.<extension>` to the current shard. A new shard is
+        started, if the member would exceed the maximum size of the current one.
+
+        Args:
+            sample_key (str): Key of the sample.
+            extension (str): Extension of the member.
+            data (bytes): Data of the member.
+        """
+        tar_info = tarfile.TarInfo(f"{sample_key}.{extension}")
+        tar_info.size = len(data)
+        tar_info.mtime = int(time.time())
+
+        if self._tar_file is not None and self._members:
+            header_size = len(
+                tar_info.tobuf(self._tar_file.format, self._tar_file.encoding,
+                               self._tar_file.errors))
+            if self._tar_file.offset + header_size + _get_padded_size(len(data)) \
+                    > self.max_shard_size:
+                self._close_shard()
+
+        if self._tar_file is None:
+            self._open_shard()
+        tar_file = self._tar_file
+        assert tar_file is not None
+
+        header_offset = tar_file.offset
+        header_size = len(
+            tar_info.tobuf(tar_file.format, tar_file.encoding, tar_file.errors))
+        tar_file.addfile(tar_info, io.BytesIO(data))
+
+        self._members.append(
+            ShardMember(sample_key=sample_key,
+                        name=tar_info.name,
+                        offset=header_offset + header_size,
+                        size=len(data)))
+
+    def add_folder(self,
+                   sample_key: str,
+                   folder_path: AnyPath,
+                   relative_to: AnyPath,
+                   remove_files: bool = True) -> None:
+        """Add all files of a folder (recursively) to the current sample. The
+        extensions of the members are the paths of the files relative to `relative_to`.
+
+        Args:
+            sample_key (str): Key of the sample.
+            folder_path (AnyPath): Folder with the files.
+            relative_to (AnyPath): Folder, that the extensions are relative to.
+            remove_files (bool, optional): Whether to remove the files (and the then
+                empty folders) after they have been added. Defaults to True.
+        """
+        folder_path = Path(folder_path)
+        file_paths = sorted(path for path in folder_path.rglob("*") if path.is_file())
+
+        for file_path in file_paths:
+            self.add(sample_key, get_member_extension(file_path, relative_to),
+                     file_path.read_bytes())
+
+            if remove_files:
+                file_path.unlink()
+
+        if remove_files:
+            for path in sorted(folder_path.rglob("*"), reverse=True) + [folder_path]:
+                if path.is_dir() and not any(path.iterdir()):
+                    path.rmdir()
+
+    def close(self) -> None:
+        """Complete the current shard, if there is one."""
+        if self._tar_file is not None:
+            self._close_shard()
+
+    def _open_shard(self) -> None:
+        shard_path = self.shard_root / \
+            f"{self._name_prefix}-{len(self.shard_paths):06d}{SHARD_SUFFIX}"
+        self.shard_paths.append(shard_path)
+        self._tar_file = tarfile.open(f"{shard_path}{_PARTIAL_SUFFIX}", mode="w")
+        self._members = []
+
+    def _close_shard(self) -> None:
+        assert self._tar_file is not None
+        self._tar_file.close()
+        self._tar_file = None
+
+        shard_path = self.shard_paths[-1]
+        write_shard_index(shard_path, self._members)
+        os.replace(f"{shard_path}{_PARTIAL_SUFFIX}", shard_path)
+
+        logging.getLogger("synthPIC2").debug("Wrote shard %s with %d members.",
+                                             shard_path, len(self._members))
+
+
+def _get_padded_size(size: int) -> int:
+    return -(-size // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+
+
+def get_shard_index_path(shard_path: AnyPath) -> Path:
+    return Path(f"{shard_path}"[:-len(SHARD_SUFFIX)] + SHARD_INDEX_SUFFIX)
+
+
+def write_shard_index(shard_path: AnyPath, members: Sequence[ShardMember]) -> None:
+    index_path = get_shard_index_path(shard_path)
+    temporary_index_path = Path(f"{index_path}{_PARTIAL_SUFFIX}")
+
+    with open(temporary_index_path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file, lineterminator="\n")
+        writer.writerow(["sample_key", "name", "offset", "size"])
+        writer.writerows((member.sample_key, member.name, member.offset, member.size)
+                         for member in members)
+
+    os.replace(temporary_index_path, index_path)
+
+
+def read_shard_index(shard_path: AnyPath) -> List[ShardMember]:
+    """Read the index of a shard.
+
+    Args:
+        shard_path (AnyPath): Path of the shard.
+
+    Returns:
+        List[ShardMember]: Members of the shard in the order of the shard.
+    """
+    with open(get_shard_index_path(shard_path), "r", encoding="utf-8",
+              newline="") as file:
+        return [
+            ShardMember(sample_key=row["sample_key"],
+                        name=row["name"],
+                        offset=int(row["offset"]),
+                        size=int(row["size"])) for row in csv.DictReader(file)
+        ]
+
+
+def read_member(shard_file: BinaryIO, member: ShardMember) -> bytes:
+    """Read the data of a member from an open shard.
+
+    Args:
+        shard_file (BinaryIO): Shard, that was opened in binary mode.
+        member (ShardMember): Member of the shard.
+
+    Returns:
+        bytes: Data of the member.
+    """
+    shard_file.seek(member.offset)
+    return shard_file.read(member.size)
+
+
+def find_shards(shard_root: AnyPath) -> List[Path]:
+    """Find the complete shards in a folder.
+
+    Args:
+        shard_root (AnyPath): Folder of the shards.
+
+    Returns:
+        List[Path]: Paths of the shards, sorted by name.
+    """
+    return sorted(path for path in Path(shard_root).glob(f"*{SHARD_SUFFIX}")
+                  if get_shard_index_path(path).exists())
+
+
+def merge_shards(shard_roots: Sequence[AnyPath],
+                 output_root: AnyPath,
+                 max_shard_size: int = 1024 * _MEGABYTE,
+                 name_prefix: str = "shard",
+                 remove_inputs: bool = False) -> List[Path]:
+    """Merge the shards of several folders (e.g. of the runs of a sweep) into new
+    shards, in which the members of every sample are contiguous and the samples are
+    sorted by their key. Members, that are contained in several shards, are taken
+    from the last one (in the order of the shard roots and the names of the shards).
+
+    Args:
+        shard_roots (Sequence[AnyPath]): Folders of the shards to merge.
+        output_root (AnyPath): Folder of the merged shards.
+        max_shard_size (int, optional): Maximum size of a merged shard in bytes.
+            Defaults to 1 GiB.
+        name_prefix (str, optional): Prefix of the names of the merged shards.
+            Defaults to "shard".
+        remove_inputs (bool, optional): Whether to remove the merged shards and their
+            indices. Defaults to False.
+
+    Returns:
+        List[Path]: Paths of the merged shards.
+    """
+    shard_paths = [
+        shard_path for shard_root in shard_roots
+        for shard_path in find_shards(shard_root)
+    ]
+
+    samples: Dict[str, Dict[str, Tuple[Path, ShardMember]]] = {}
+    for shard_path in shard_paths:
+        for member in read_shard_index(shard_path):
+            samples.setdefault(member.sample_key, {})[member.name] = (shard_path,
+                                                                      member)
+
+    writer = ShardWriter(output_root,
+                         max_shard_size=max_shard_size,
+                         name_prefix=name_prefix)
+    shard_files: Dict[Path, BinaryIO] = {}
+    try:
+        for sample_key in sorted(samples):
+            for shard_path, member in samples[sample_key].values():
+                if shard_path not in shard_files:
+                    shard_files[shard_path] = open(shard_path, "rb")
+
+                extension = member.name[len(sample_key) + 1:]
+                writer.add(sample_key, extension,
+                           read_member(shard_files[shard_path], member))
+        writer.close()
+    finally:
+        for shard_file in shard_files.values():
+            shard_file.close()
+
+    if remove_inputs:
+        for shard_path in shard_paths:
+            get_shard_index_path(shard_path).unlink()
+            shard_path.unlink()
+
+    logging.getLogger("synthPIC2").info(
+        "Merged %d samples of %d shards into %d shards.", len(samples),
+        len(shard_paths), len(writer.shard_paths))
+
+    return writer.shard_paths
+
+
+_SHARD_WRITER: Optional[ShardWriter] = None
+
+
+def get_shard_writer(shard_root: AnyPath, max_shard_size: int) -> ShardWriter:
+    """Get the shard writer, that is shared by all rendering steps of a process. It is
+    created on first use and replaced, if the shard root or the maximum size change."""
+    global _SHARD_WRITER
+    if _SHARD_WRITER is not None and (_SHARD_WRITER.shard_root != Path(shard_root) or
+                                      _SHARD_WRITER.max_shard_size != max_shard_size):
+        close_shard_writer()
+
+    if _SHARD_WRITER is None:
+        _SHARD_WRITER = ShardWriter(shard_root, max_shard_size=max_shard_size)
+    return _SHARD_WRITER
+
+
+def close_shard_writer() -> None:
+    """Complete the current shard and close the shared shard writer, if it was used."""
+    global _SHARD_WRITER
+    if _SHARD_WRITER is not None:
+        _SHARD_WRITER.close()
+        _SHARD_WRITER = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Merge the shards of runs into run-level shards.")
+    parser.add_argument("shard_roots",
+                        nargs="+",
+                        type=Path,
+                        help="Folders of the shards to merge.")
+    parser.add_argument("--output-root",
+                        type=Path,
+                        required=True,
+                        help="Folder of the merged shards.")
+    parser.add_argument("--max-shard-size-mb",
+                        type=float,
+                        default=1024,
+                        help="Maximum size of a merged shard in MiB.")
+    parser.add_argument("--name-prefix",
+                        default="shard",
+                        help="Prefix of the names of the merged shards.")
+    parser.add_argument("--remove-inputs",
+                        action="store_true",
+                        help="Remove the shards, that were merged.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    merge_shards(args.shard_roots,
+                 args.output_root,
+                 max_shard_size=int(args.max_shard_size_mb * _MEGABYTE),
+                 name_prefix=args.name_prefix,
+                 remove_inputs=args.remove_inputs)
+
+
+if __name__ == "__main__":
+    main()
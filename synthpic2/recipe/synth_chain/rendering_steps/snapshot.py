@@ -0,0 +1,250 @@
+"""Module for the RenderSnapshot class."""
+
+from typing import Any, Dict, List, Sequence, Set, Tuple
+
+import bpy
+
+# Properties that are changed by the preparation of the rendering modes, grouped by the
+# path of their owner relative to the scene. The order matters: e.g. the file format
+# restricts the valid color modes and the display device restricts the valid view
+# transforms.
+_SCENE_PROPERTIES: Dict[str, Tuple[str, ...]] = {
+    "": ("use_nodes", "world"),
+    "render": (
+        "engine",
+        "use_compositing",
+        "use_high_quality_normals",
+        "dither_intensity",
+        "filepath",
+        "use_border",
+        "use_crop_to_border",
+        "border_min_x",
+        "border_max_x",
+        "border_min_y",
+        "border_max_y",
+    ),
+    "render.image_settings": ("file_format", "color_mode", "color_depth",
+                              "compression"),
+    "display_settings": ("display_device",),
+    "view_settings": ("view_transform", "look", "exposure", "gamma"),
+    "sequencer_colorspace_settings": ("name",),
+    "eevee": ("taa_render_samples",),
+    "cycles": (
+        "device",
+        "samples",
+        "use_adaptive_sampling",
+        "adaptive_threshold",
+        "adaptive_min_samples",
+        "time_limit",
+        "denoiser",
+        "denoising_input_passes",
+        "use_denoising",
+    ),
+    "display.shading": (
+        "color_type",
+        "single_color",
+        "show_specular_highlight",
+        "show_object_outline",
+        "object_outline_color",
+        "show_backface_culling",
+        "show_xray",
+        "xray_alpha",
+        "show_shadows",
+        "show_cavity",
+        "use_dof",
+    ),
+}
+
+_VIEW_LAYER_PROPERTIES = ("use_pass_normal", "use_pass_z", "use_pass_object_index")
+
+_OBJECT_PROPERTIES = ("hide_render", "visible_camera", "pass_index", "color")
+
+# Rendering modes that rebuild the compositor node tree.
+_COMPOSITING_RENDERING_MODES = ("normal_map", "depth_map")
+
+
+def _resolve(owner: Any, path: str) -> Any:
+    for attribute_name in filter(None, path.split(".")):
+        owner = getattr(owner, attribute_name)
+    return owner
+
+
+def _record_properties(owner: Any, property_names: Sequence[str]) -> Dict[str, Any]:
+    properties = {}
+    for property_name in property_names:
+        value = getattr(owner, property_name)
+        # Copy arrays (e.g. colors), since Blender returns views on its data.
+        if hasattr(value, "__len__") and not isinstance(value, (str, bpy.types.ID)):
+            value = tuple(value)
+        properties[property_name] = value
+    return properties
+
+
+def _restore_properties(owner: Any, properties: Dict[str, Any]) -> None:
+    for property_name, value in properties.items():
+        if getattr(owner, property_name) != value:
+            setattr(owner, property_name, value)
+
+
+class RenderSnapshot:
+    """In-memory snapshot of everything that the preparation of a rendering mode
+    changes in the Blender scene: render, color management and shading settings,
+    render passes, compositor nodes, the world, depth of field of cameras, visibility,
+    pass indices, colors and selection of objects (which includes lights), material
+    assignments, emission strengths and newly created materials.
+
+    Restoring a snapshot is much cheaper than saving and reopening the whole .blend
+    file, since only the recorded properties are written back.
+
+    Example:
+        >>> snapshot = RenderSnapshot.take()
+        >>> ...    # Prepare and render.
+        >>> snapshot.restore()
+    """
+
+    def __init__(self) -> None:
+        scene = bpy.data.scenes[0]
+
+        self._scene_properties = {
+            path: _record_properties(_resolve(scene, path), property_names)
+            for path, property_names in _SCENE_PROPERTIES.items()
+        }
+        self._view_layer_properties = {
+            view_layer.name: _record_properties(view_layer, _VIEW_LAYER_PROPERTIES)
+            for view_layer in scene.view_layers
+        }
+        self._compositing_node_names: Set[str] = set()
+        if scene.node_tree is not None:
+            self._compositing_node_names = {node.name for node in scene.node_tree.nodes}
+
+        self._camera_dof = {
+            camera.name: camera.dof.use_dof for camera in bpy.data.cameras
+        }
+
+        self._object_properties = {
+            object_.name: _record_properties(object_, _OBJECT_PROPERTIES)
+            for object_ in bpy.data.objects
+        }
+        self._object_selection = {
+            object_.name: object_.select_get() for object_ in bpy.data.objects
+        }
+        self._object_materials = {
+            object_.name: self._record_materials(object_)
+            for object_ in bpy.data.objects
+            if object_.data is not None and hasattr(object_.data, "materials")
+        }
+
+        self._material_names = {material.name for material in bpy.data.materials}
+        self._emission_strengths = self._record_emission_strengths()
+
+    @classmethod
+    def take(cls) -> "RenderSnapshot":
+        return cls()
+
+    @staticmethod
+    def is_sufficient(rendering_mode: str) -> bool:
+        """Check, whether a snapshot can restore the changes of a rendering mode.
+
+        Compositor nodes, that already exist before the preparation, are deleted by
+        some rendering modes and can't be recreated from a snapshot. In this case, the
+        .blend file needs to be reloaded.
+
+        Args:
+            rendering_mode (str): Rendering mode that is going to be prepared.
+
+        Returns:
+            bool: True, if a snapshot suffices.
+        """
+        if rendering_mode.lower() not in _COMPOSITING_RENDERING_MODES:
+            return True
+
+        return not RenderSnapshot.has_compositing_nodes()
+
+    @staticmethod
+    def has_compositing_nodes() -> bool:
+        node_tree = bpy.data.scenes[0].node_tree
+        return node_tree is not None and len(node_tree.nodes) > 0
+
+    def restore(self) -> None:
+        """Restore the recorded state of the scene."""
+        scene = bpy.data.scenes[0]
+
+        if scene.node_tree is not None:
+            compositing_nodes = scene.node_tree.nodes
+            for node in list(compositing_nodes):
+                if node.name not in self._compositing_node_names:
+                    compositing_nodes.remove(node)
+
+        for path, properties in self._scene_properties.items():
+            _restore_properties(_resolve(scene, path), properties)
+
+        for view_layer_name, properties in self._view_layer_properties.items():
+            _restore_properties(scene.view_layers[view_layer_name], properties)
+
+        for camera_name, use_dof in self._camera_dof.items():
+            bpy.data.cameras[camera_name].dof.use_dof = use_dof
+
+        for object_name, materials in self._object_materials.items():
+            self._restore_materials(bpy.data.objects[object_name], materials)
+
+        for object_name, properties in self._object_properties.items():
+            _restore_properties(bpy.data.objects[object_name], properties)
+
+        for object_name, is_selected in self._object_selection.items():
+            object_ = bpy.data.objects[object_name]
+            # Only objects in the view layer can be selected.
+            if object_.select_get() != is_selected:
+                object_.select_set(is_selected)
+
+        for material, node_name, input_name, value in self._emission_strengths:
+            material.node_tree.nodes[node_name].inputs[input_name].default_value = value
+
+        # Remove materials that were created during the rendering (e.g. emission
+        # shaders).
+        for material in list(bpy.data.materials):
+            if material.name not in self._material_names:
+                bpy.data.materials.remove(material)
+
+    @staticmethod
+    def _record_materials(object_: bpy.types.Object) -> List[Tuple[str, Any]]:
+        return [(material_slot.link, material_slot.material)
+                for material_slot in object_.material_slots]
+
+    @staticmethod
+    def _restore_materials(object_: bpy.types.Object,
+                           materials: List[Tuple[str, Any]]) -> None:
+        current_materials = RenderSnapshot._record_materials(object_)
+        if current_materials == materials:
+            return
+
+        object_materials = object_.data.materials
+        object_materials.clear()
+        for link, material in materials:
+            object_materials.append(material if link == "DATA" else None)
+
+        for material_slot, (link, material) in zip(object_.material_slots, materials):
+            if link == "OBJECT":
+                material_slot.link = "OBJECT"
+                material_slot.material = material
+
+    @staticmethod
+    def _record_emission_strengths() -> List[Tuple[Any, str, str, float]]:
+        """Record the emission strengths of all materials as tuples of material, node
+        name, input name and value."""
+        emission_strengths = []
+        for material in bpy.data.materials:
+            if material.node_tree is None:
+                continue
+
+            for node in material.node_tree.nodes:
+                if "Emission Strength" in node.inputs:
+                    emission_strengths.append(
+                        (material, node.name, "Emission Strength",
+                         node.inputs["Emission Strength"].default_value))
+
+                if node.type == "EMISSION":
+                    emission_strengths.append(
+                        (material, node.name, "Strength",
+                         node.inputs["Strength"].default_value))
+
+        return emission_strengths
@@ -0,0 +1,265 @@
+"""Module to render an image in tiles by a pool of worker processes and to render
+regions of interest of an image."""
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+from pathlib import Path
+import shutil
+from typing import List, Optional, Sequence, Tuple
+
+import attr
+import bpy
+from bpy_extras.object_utils import world_to_camera_view    # type: ignore
+from mathutils import Vector    # type: ignore
+import numpy as np
+
+from ....blender import RenderSession
+from ....blender.utilities import read_image_pixels
+from ....custom_types import AnyPath
+from ..state_storage import get_state_storage
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class Tile:
+    """Rectangular region of an image in pixels. Like Blender's render border, `y` is
+    measured from the bottom of the image. The maximums are exclusive."""
+    x_min: int
+    x_max: int
+    y_min: int
+    y_max: int
+
+    @property
+    def name(self) -> str:
+        return f"tile_{self.x_min}_{self.y_min}"
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return (self.y_max - self.y_min, self.x_max - self.x_min)
+
+
+def get_image_size() -> Tuple[int, int]:
+    """Get the size of the rendered images of the scene in pixels.
+
+    Returns:
+        Tuple[int, int]: Width and height.
+    """
+    render_settings = bpy.data.scenes[0].render
+    scale = render_settings.resolution_percentage / 100
+    return (int(render_settings.resolution_x * scale),
+            int(render_settings.resolution_y * scale))
+
+
+def split_into_tiles(width: int, height: int, num_tiles_x: int,
+                     num_tiles_y: int) -> List[Tile]:
+    """Split an image into a grid of tiles of (almost) equal size.
+
+    Args:
+        width (int): Width of the image in pixels.
+        height (int): Height of the image in pixels.
+        num_tiles_x (int): Number of tiles in x direction.
+        num_tiles_y (int): Number of tiles in y direction.
+
+    Returns:
+        List[Tile]: Tiles, that cover the image without overlap.
+    """
+    x_bounds = np.linspace(0, width, min(num_tiles_x, width) + 1).astype(int)
+    y_bounds = np.linspace(0, height, min(num_tiles_y, height) + 1).astype(int)
+
+    return [
+        Tile(int(x_min), int(x_max), int(y_min), int(y_max))
+        for y_min, y_max in zip(y_bounds[:-1], y_bounds[1:])
+        for x_min, x_max in zip(x_bounds[:-1], x_bounds[1:])
+    ]
+
+
+def stitch_tiles(tiles: Sequence[Tile], tile_pixels: Sequence[np.ndarray], width: int,
+                 height: int) -> np.ndarray:
+    """Stitch rendered tiles into a single image.
+
+    Args:
+        tiles (Sequence[Tile]): Tiles of the image.
+        tile_pixels (Sequence[np.ndarray]): Pixels of the tiles with shape (tile
+            height, tile width, channels) (rows from top to bottom).
+        width (int): Width of the image in pixels.
+        height (int): Height of the image in pixels.
+
+    Raises:
+        ValueError: Raised, if the size of a tile does not match its region.
+
+    Returns:
+        np.ndarray: Array of shape (height, width, channels) (rows from top to bottom).
+    """
+    num_channels = tile_pixels[0].shape[-1]
+    pixels = np.zeros((height, width, num_channels), dtype=tile_pixels[0].dtype)
+
+    for tile, tile_pixels_ in zip(tiles, tile_pixels):
+        if tile_pixels_.shape[:2] != tile.shape:
+            raise ValueError(f"The rendered {tile.name} has the shape "
+                             f"{tile_pixels_.shape[:2]} instead of {tile.shape}.")
+
+        pixels[height - tile.y_max:height - tile.y_min,
+               tile.x_min:tile.x_max] = tile_pixels_
+
+    return pixels
+
+
+def get_projected_bounding_box(object_: bpy.types.Object,
+                               margin: int = 0) -> Optional[Tile]:
+    """Get the region of the image, that contains an object, by projecting the
+    corners of its world-space bounding box with the camera of the scene.
+
+    Args:
+        object_ (bpy.types.Object): Object to get the region of.
+        margin (int, optional): Margin around the projected bounding box in pixels
+            (e.g. for the pixel filter of Cycles). Defaults to 0.
+
+    Returns:
+        Optional[Tile]: Region of the object, clipped to the image. `None`, if the
+            object is not in front of the camera or not in the image.
+    """
+    scene = bpy.data.scenes[0]
+    camera = scene.camera
+    width, height = get_image_size()
+
+    corners = np.array([
+        world_to_camera_view(scene, camera,
+                             object_.matrix_world @ Vector(corner))
+        for corner in object_.bound_box
+    ])
+
+    # Corners behind the camera can't be projected reliably.
+    if np.any(corners[:, 2] <= camera.data.clip_start):
+        return None
+
+    x_min = max(int(np.floor(corners[:, 0].min() * width)) - margin, 0)
+    x_max = min(int(np.ceil(corners[:, 0].max() * width)) + margin, width)
+    y_min = max(int(np.floor(corners[:, 1].min() * height)) - margin, 0)
+    y_max = min(int(np.ceil(corners[:, 1].max() * height)) + margin, height)
+
+    if x_min >= x_max or y_min >= y_max:
+        return None
+
+    return Tile(x_min, x_max, y_min, y_max)
+
+
+def set_render_border(tile: Optional[Tile], width: int, height: int) -> None:
+    """Restrict the rendering to a region of the image and crop the image to it.
+
+    Args:
+        tile (Optional[Tile]): Region to render. `None` renders the whole image.
+        width (int): Width of the image in pixels.
+        height (int): Height of the image in pixels.
+    """
+    render_settings = bpy.data.scenes[0].render
+
+    if tile is None:
+        render_settings.use_border = False
+        render_settings.use_crop_to_border = False
+        return
+
+    # Blender truncates the border to whole pixels, so the border is placed slightly
+    # inside the pixel boundaries.
+    render_settings.use_border = True
+    render_settings.use_crop_to_border = True
+    render_settings.border_min_x = (tile.x_min + 0.25) / width
+    render_settings.border_max_x = min((tile.x_max + 0.25) / width, 1)
+    render_settings.border_min_y = (tile.y_min + 0.25) / height
+    render_settings.border_max_y = min((tile.y_max + 0.25) / height, 1)
+
+
+def uncrop_image(pixels: np.ndarray, x_offset: int, y_offset: int, width: int,
+                 height: int) -> np.ndarray:
+    """Place a cropped image (e.g. of `RenderParticlesIndividually` with
+    `crop_to_particle`) in an empty image of the full size.
+
+    Args:
+        pixels (np.ndarray): Pixels of the cropped image with shape (crop height, crop
+            width) or (crop height, crop width, channels) (rows from top to bottom).
+        x_offset (int): Offset of the crop from the left of the image in pixels.
+        y_offset (int): Offset of the crop from the top of the image in pixels.
+        width (int): Width of the image in pixels.
+        height (int): Height of the image in pixels.
+
+    Returns:
+        np.ndarray: Array of shape (height, width) or (height, width, channels), which
+            is zero outside of the crop.
+    """
+    full_pixels = np.zeros((height, width) + pixels.shape[2:], dtype=pixels.dtype)
+    full_pixels[y_offset:y_offset + pixels.shape[0],
+                x_offset:x_offset + pixels.shape[1]] = pixels
+    return full_pixels
+
+
+def render_tiles(tiles: Sequence[Tile],
+                 num_workers: Optional[int] = None) -> List[np.ndarray]:
+    """Render tiles of the current scene in parallel by worker processes.
+
+    The scene is saved to a temporary .blend file, which is opened by every worker.
+    Every worker renders its tile with a render border, cropped to the border, and
+    writes the linear values (i.e. without view transform) to an OpenEXR file.
+
+    Args:
+        tiles (Sequence[Tile]): Tiles to render.
+        num_workers (Optional[int], optional): Number of worker processes. `None` means
+            one per tile, but at most the number of CPUs. Defaults to None.
+
+    Returns:
+        List[np.ndarray]: Linear RGBA pixels of the tiles (rows from top to bottom).
+    """
+    cpu_count = os.cpu_count() or 1
+    if num_workers is None:
+        num_workers = min(len(tiles), cpu_count)
+    num_threads = max(cpu_count // num_workers, 1)
+
+    width, height = get_image_size()
+
+    temporary_root = get_state_storage().make_temporary_root()
+    try:
+        blend_file_path = temporary_root / "tiled_scene.blend"
+        bpy.ops.wm.save_as_mainfile(filepath=str(blend_file_path), copy=True)
+
+        tile_file_paths = [temporary_root / f"{tile.name}.exr" for tile in tiles]
+
+        # Spawn fresh processes, since Blender can't be forked safely.
+        with ProcessPoolExecutor(
+                max_workers=num_workers,
+                mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = [
+                executor.submit(_render_tile, str(blend_file_path), tile, width, height,
+                                str(tile_file_path), num_threads)
+                for tile, tile_file_path in zip(tiles, tile_file_paths)
+            ]
+            for future in futures:
+                future.result()
+
+        return [read_image_pixels(file_path) for file_path in tile_file_paths]
+    finally:
+        shutil.rmtree(temporary_root, ignore_errors=True)
+
+
+def _render_tile(blend_file_path: str, tile: Tile, width: int, height: int,
+                 output_path: AnyPath, num_threads: int) -> None:
+    """Render a single tile in a worker process."""
+    bpy.ops.wm.open_mainfile(filepath=blend_file_path)
+
+    scene = bpy.data.scenes[0]
+    render_settings = scene.render
+
+    set_render_border(tile, width, height)
+
+    render_settings.threads_mode = "FIXED"
+    render_settings.threads = num_threads
+
+    image_settings = render_settings.image_settings
+    image_settings.file_format = "OPEN_EXR"
+    image_settings.color_mode = "RGBA"
+    image_settings.color_depth = "32"
+    render_settings.filepath = str(Path(output_path).with_suffix(""))
+    render_settings.use_file_extension = True
+
+    if scene.render.engine == "CYCLES" and scene.cycles.device == "GPU":
+        RenderSession.enable_gpu()
+
+    RenderSession.start_display()
+    bpy.ops.render.render(write_still=True)
@@ -1,19 +1,17 @@
 """Module for the State class."""
 
 from pathlib import Path
-import tempfile
-from typing import Optional
+from typing import List, Optional
 import uuid
 
 import attr
-import bpy
 from omegaconf import MISSING
-import yaml
 
 from ...custom_types import AnyPath
 from ..registries import Registry
 from ..registries import SelfRegisteringAttrsMixin
 from ..registries import STATE_REGISTRY
+from .state_storage import get_state_storage
 
 
 @attr.s(auto_attribs=True)
@@ -26,7 +24,12 @@ class RuntimeState:
 
 @attr.s(auto_attribs=True)
 class State(SelfRegisteringAttrsMixin):
-    """Class to handle blender states."""
+    """Class to handle blender states.
+
+    The files are written by the current state storage (see `set_state_storage`).
+    States without a `file_root` are stored in a temporary folder of the state
+    storage.
+    """
     runtime_state: RuntimeState
     name: Optional[str] = None
     file_root: Optional[AnyPath] = None
@@ -41,8 +44,9 @@ class State(SelfRegisteringAttrsMixin):
 
         super().__attrs_post_init__()
 
+        self._is_temporary = self.file_root is None
         if self.file_root is None:
-            self.file_root = tempfile.mkdtemp()
+            self.file_root = get_state_storage().make_temporary_root()
 
         self.file_root = Path(self.file_root)
         self.file_root.mkdir(exist_ok=True, parents=True)
@@ -53,25 +57,36 @@ class State(SelfRegisteringAttrsMixin):
         self._runtime_state_file_path = (self.file_root /
                                          self._runtime_state_file_name).absolute()
 
-    def save_to_disk(self) -> None:
-        with open(self._runtime_state_file_path, "w", encoding="utf-8") as yaml_file:
-            yaml.dump(self.runtime_state, yaml_file)
-        bpy.ops.wm.save_as_mainfile(filepath=str(self._blend_file_path))
+    @property
+    def is_temporary(self) -> bool:
+        """Whether the state is stored in a temporary folder of the state storage."""
+        return self._is_temporary
 
-        # Remove backup file that is automatically created by Blender, when a file is
-        # overwritten.
-        backup_file_path = Path(f"{self._blend_file_path}1")
-        backup_file_path.unlink(missing_ok=True)
+    @property
+    def file_paths(self) -> List[Path]:
+        """Paths of the .blend file and the YAML file of the runtime state."""
+        return [self._blend_file_path, self._runtime_state_file_path]
+
+    def save_to_disk(self) -> None:
+        get_state_storage().save(self._blend_file_path, self._runtime_state_file_path,
+                                 self.runtime_state)
 
     def load_from_disk(self) -> None:
-        with open(self._runtime_state_file_path, "r", encoding="utf-8") as yaml_file:
-            self.runtime_state = yaml.load(yaml_file, Loader=yaml.Loader)
-        bpy.ops.wm.open_mainfile(filepath=str(self._blend_file_path))
+        self.runtime_state = get_state_storage().load(self._blend_file_path,
+                                                      self._runtime_state_file_path)
 
     def delete(self) -> None:
         self._blend_file_path.unlink(missing_ok=True)
         self._runtime_state_file_path.unlink(missing_ok=True)
 
+        # Don't leave empty temporary folders behind (e.g. in `/dev/shm`).
+        if self._is_temporary:
+            assert isinstance(self.file_root, Path)
+            try:
+                self.file_root.rmdir()
+            except OSError:
+                pass
+
         self.unregister()
 
     def unregister(self) -> None:
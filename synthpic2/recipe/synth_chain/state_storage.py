@@ -0,0 +1,194 @@
+"""Module for the storage backends of states."""
+
+import logging
+import os
+from pathlib import Path
+import tempfile
+import time
+from typing import Any, ClassVar, Dict, Optional, Type, TYPE_CHECKING
+
+import attr
+import bpy
+import yaml
+
+from ...custom_types import AnyPath
+
+if TYPE_CHECKING:
+    from .state import RuntimeState
+
+_SHARED_MEMORY_ROOT = "/dev/shm"
+
+
+@attr.s(auto_attribs=True)
+class StateStorageStats:
+    """Number of saved and loaded states and the time spent for it."""
+    num_saves: int = 0
+    num_loads: int = 0
+    save_time: float = 0.0
+    load_time: float = 0.0
+
+
+@attr.s(auto_attribs=True)
+class StateStorage:
+    """Class to control where and how states are written to disk.
+
+    Temporary states (i.e. states without an explicit `file_root`) are stored in
+    temporary folders below `root`.
+
+    Attributes:
+        root (Optional[AnyPath]): Folder, in which temporary folders are created.
+            `None` means the default temporary folder of the system. Defaults to None.
+        compress (bool): Whether to compress .blend files. Compression makes files
+            smaller but saving and loading slower. Defaults to False.
+    """
+    name: ClassVar[str] = "tempdir"
+
+    root: Optional[AnyPath] = None
+    compress: bool = False
+
+    def __attrs_post_init__(self) -> None:
+        self.root = self._get_root()
+        self.stats = StateStorageStats()
+
+    def _get_root(self) -> Optional[Path]:
+        if self.root is None:
+            return None
+        return Path(self.root)
+
+    def make_temporary_root(self) -> Path:
+        """Create a new temporary folder for a state.
+
+        Returns:
+            Path: Path of the temporary folder.
+        """
+        if self.root is not None:
+            Path(self.root).mkdir(parents=True, exist_ok=True)
+        return Path(tempfile.mkdtemp(dir=self.root))
+
+    def save(self, blend_file_path: Path, runtime_state_file_path: Path,
+             runtime_state: "RuntimeState") -> None:
+        """Save the current Blender scene and a runtime state.
+
+        Args:
+            blend_file_path (Path): Path of the .blend file.
+            runtime_state_file_path (Path): Path of the YAML file of the runtime
+                state.
+            runtime_state (RuntimeState): Runtime state to save.
+        """
+        start_time = time.perf_counter()
+
+        with open(runtime_state_file_path, "w", encoding="utf-8") as yaml_file:
+            yaml.dump(runtime_state, yaml_file)
+
+        self._save_blend_file(blend_file_path)
+
+        elapsed_time = time.perf_counter() - start_time
+        self.stats.num_saves += 1
+        self.stats.save_time += elapsed_time
+
+        logging.getLogger("synthPIC2").debug("State storage '%s': saved %s in %.3f s.",
+                                             self.name, blend_file_path.name,
+                                             elapsed_time)
+
+    def load(self, blend_file_path: Path,
+             runtime_state_file_path: Path) -> "RuntimeState":
+        """Load a Blender scene and a runtime state.
+
+        Args:
+            blend_file_path (Path): Path of the .blend file.
+            runtime_state_file_path (Path): Path of the YAML file of the runtime
+                state.
+
+        Returns:
+            RuntimeState: Loaded runtime state.
+        """
+        start_time = time.perf_counter()
+
+        with open(runtime_state_file_path, "r", encoding="utf-8") as yaml_file:
+            runtime_state = yaml.load(yaml_file, Loader=yaml.Loader)
+        bpy.ops.wm.open_mainfile(filepath=str(blend_file_path))
+
+        elapsed_time = time.perf_counter() - start_time
+        self.stats.num_loads += 1
+        self.stats.load_time += elapsed_time
+
+        logging.getLogger("synthPIC2").debug("State storage '%s': loaded %s in %.3f s.",
+                                             self.name, blend_file_path.name,
+                                             elapsed_time)
+
+        return runtime_state
+
+    def log_stats(self) -> None:
+        logging.getLogger("synthPIC2").info(
+            "State storage '%s': saved %d states in %.2f s, loaded %d states in %.2f "
+            "s.", self.name, self.stats.num_saves, self.stats.save_time,
+            self.stats.num_loads, self.stats.load_time)
+
+    def _save_blend_file(self, blend_file_path: Path) -> None:
+        bpy.ops.wm.save_as_mainfile(filepath=str(blend_file_path),
+                                    compress=self.compress)
+
+        # Remove backup file that is automatically created by Blender, when a file is
+        # overwritten.
+        backup_file_path = Path(f"{blend_file_path}1")
+        backup_file_path.unlink(missing_ok=True)
+
+
+@attr.s(auto_attribs=True)
+class SharedMemoryStateStorage(StateStorage):
+    """State storage, that stores temporary states in RAM (i.e. in `/dev/shm`, unless
+    `root` is specified). Falls back to the default temporary folder of the system, if
+    `/dev/shm` is not available."""
+    name: ClassVar[str] = "shm"
+
+    def _get_root(self) -> Optional[Path]:
+        if self.root is not None:
+            return Path(self.root)
+
+        if os.path.isdir(_SHARED_MEMORY_ROOT) and os.access(_SHARED_MEMORY_ROOT,
+                                                             os.W_OK):
+            return Path(_SHARED_MEMORY_ROOT)
+
+        logging.getLogger("synthPIC2").warning(
+            "%s is not available. Falling back to the default temporary folder.",
+            _SHARED_MEMORY_ROOT)
+        return None
+
+
+STATE_STORAGE_BACKENDS: Dict[str, Type[StateStorage]] = {
+    backend.name: backend for backend in (StateStorage, SharedMemoryStateStorage)
+}
+
+
+def create_state_storage(backend_name: str, **kwargs: Any) -> StateStorage:
+    """Create a state storage by the name of its backend.
+
+    Args:
+        backend_name (str): Name of the backend (e.g. "tempdir" or "shm").
+        **kwargs: Attributes of the state storage.
+
+    Raises:
+        ValueError: Raised, if there is no backend with the given name.
+
+    Returns:
+        StateStorage: New state storage.
+    """
+    if backend_name not in STATE_STORAGE_BACKENDS:
+        raise ValueError(f"Unsupported state storage backend: {backend_name}. Valid "
+                         f"backends are: {', '.join(STATE_STORAGE_BACKENDS)}.")
+    return STATE_STORAGE_BACKENDS[backend_name](**kwargs)
+
+
+_STATE_STORAGE = StateStorage()
+
+
+def get_state_storage() -> StateStorage:
+    """Get the state storage, that is used by all states."""
+    return _STATE_STORAGE
+
+
+def set_state_storage(state_storage: StateStorage) -> None:
+    """Set the state storage, that is used by all states."""
+    global _STATE_STORAGE
+    _STATE_STORAGE = state_storage
+
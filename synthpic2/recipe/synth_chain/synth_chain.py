@@ -1,16 +1,39 @@
 """Module for the SynthChain class."""
 
 import logging
-from typing import List
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
 
 import attr
+from omegaconf import DictConfig
 from omegaconf import MISSING
 from tqdm import tqdm
 from wurlitzer import pipes
 from wurlitzer import STDOUT
 
+from ...utilities import get_object_md5
+from ...utilities import get_run_context
 from ...utilities import seed_everything
 from ..synth_chain.state import RuntimeState
+from .checkpoint import Checkpoint
+from .checkpoint import StepFingerprints
+from .feature_generation_cache import FeatureGenerationCache
+from .manifest import get_manifest_context
+from .manifest import get_recipe_md5
+from .manifest import ManifestContext
+from .manifest import set_manifest_context
+from .parallel_rendering import execute_rendering_steps_in_parallel
+from .rendering_steps.image_writer import close_image_writer
+from .rendering_steps.image_writer import flush_image_writer
+from .rendering_steps.sharding import close_shard_writer
+from .state_storage import create_state_storage
+from .state_storage import set_state_storage
+from .tracing import StepTracer
+
+_TQDM_BAR_FORMAT = "{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, " \
+    "{rate_inv_fmt}]"
+_TQDM_UNIT = "step"
 
 
 @attr.s(auto_attribs=True)
@@ -20,32 +43,338 @@ class SynthChain:
     #   preferably using Hydra.
     _target_: str = "synthpic2.recipe.SynthChain"
     blender_log_file_name: str = "blender.log"
+    trace_file_name: Optional[str] = "trace.json"
+    checkpoint_root: Optional[str] = None
+    cache_root: Optional[str] = None
+    cache_max_size_gb: Optional[float] = None
+    cache_max_age_days: Optional[float] = None
+    # Results of steps of these types (and of the last feature generation step) are
+    # stored in the cache.
+    cached_step_types: List[str] = attr.Factory(
+        lambda: ["RelaxCollisions", "AgglomerateParticles"])
+    # Backend for the storage of states (e.g. "tempdir" or "shm" for a RAM-backed
+    # storage).
+    state_storage: str = "tempdir"
+    state_storage_root: Optional[str] = None
+    compress_states: bool = False
+    # With `num_render_workers > 0` and multiple images, the feature generation and the
+    # rendering of different images run in separate pools of processes, which are
+    # connected by a render queue (see `RenderQueue`). At most `max_queued_states`
+    # states wait in the spool folder (a temporary folder of the state storage, if
+    # `spool_root` is not given).
+    num_feature_generation_workers: int = 1
+    num_render_workers: int = 0
+    max_queued_states: int = 2
+    spool_root: Optional[str] = None
+    # With `num_rendering_step_workers > 1`, the rendering steps of an image run in
+    # parallel processes, which all start from the state after the feature generation.
+    num_rendering_step_workers: int = 1
     feature_generation_steps: List = MISSING
     rendering_steps: List = MISSING
 
-    def execute(self, initial_runtime_state: RuntimeState) -> None:
+    def execute(self,
+                initial_runtime_state: RuntimeState,
+                step_fingerprints: Optional[StepFingerprints] = None,
+                recipe_config: Optional[DictConfig] = None) -> None:
+        """Execute the feature generation steps and the rendering steps.
+
+        Args:
+            initial_runtime_state (RuntimeState): Initial runtime state.
+            step_fingerprints (Optional[StepFingerprints], optional): Fingerprints of
+                the steps. Checkpoints and the feature generation cache are only used,
+                if these and `checkpoint_root` or `cache_root` are provided. Defaults to
+                None.
+            recipe_config (Optional[DictConfig], optional): Parsed config of the
+                recipe. Required to execute the rendering steps in parallel processes.
+                Defaults to None.
+        """
+        self._start(step_fingerprints, recipe_config)
+        # The trace is also written, if a step fails.
+        try:
+            runtime_state = self._execute_feature_generation(initial_runtime_state)
+            self._execute_rendering(runtime_state)
+        finally:
+            self._finish(self.trace_file_name)
+
+    def execute_feature_generation(
+            self,
+            initial_runtime_state: RuntimeState,
+            step_fingerprints: Optional[StepFingerprints] = None) -> RuntimeState:
+        """Execute only the feature generation steps (e.g. to pass the result to a
+        render queue).
+
+        Args:
+            initial_runtime_state (RuntimeState): Initial runtime state.
+            step_fingerprints (Optional[StepFingerprints], optional): See `execute`.
+                Defaults to None.
+
+        Returns:
+            RuntimeState: Runtime state after the feature generation.
+        """
+        self._start(step_fingerprints, None)
+        try:
+            return self._execute_feature_generation(initial_runtime_state)
+        finally:
+            self._finish(self._get_stage_trace_file_name("feature_generation"))
+
+    def execute_rendering(self,
+                          runtime_state: RuntimeState,
+                          step_fingerprints: Optional[StepFingerprints] = None,
+                          recipe_config: Optional[DictConfig] = None) -> None:
+        """Execute only the rendering steps on the current scene (e.g. after restoring
+        the result of the feature generation from a render queue).
+
+        Args:
+            runtime_state (RuntimeState): Runtime state after the feature generation.
+            step_fingerprints (Optional[StepFingerprints], optional): See `execute`.
+                Defaults to None.
+            recipe_config (Optional[DictConfig], optional): See `execute`. Defaults to
+                None.
+        """
+        self._start(step_fingerprints, recipe_config)
+        try:
+            self._execute_rendering(runtime_state)
+        finally:
+            self._finish(self._get_stage_trace_file_name("rendering"))
+
+    def _start(self, step_fingerprints: Optional[StepFingerprints],
+               recipe_config: Optional[DictConfig]) -> None:
+        self._logger = logging.getLogger("synthPIC2")
+        self._recipe_config = recipe_config
+        self._tracer = StepTracer()
+
+        self._state_storage = create_state_storage(
+            self.state_storage,
+            root=self.state_storage_root,
+            compress=self.compress_states)
+        set_state_storage(self._state_storage)
+
+        self._step_fingerprints = step_fingerprints
+        self._use_checkpoints = self.checkpoint_root is not None \
+            and step_fingerprints is not None
+
+        self._cache = self._get_feature_generation_cache()
+
+    def _execute_feature_generation(
+            self, initial_runtime_state: RuntimeState) -> RuntimeState:
         seed_everything(initial_runtime_state.seed)
         runtime_state = initial_runtime_state
 
-        logger = logging.getLogger("synthPIC2")
+        logger = self._logger
+        cache = self._cache
+        step_fingerprints = self._step_fingerprints
+
+        num_finished_feature_generation_steps = 0
+        if self._use_checkpoints:
+            num_finished_feature_generation_steps, resumed_runtime_state = \
+                self._resume_from_checkpoint()
+
+            if resumed_runtime_state is not None:
+                runtime_state = resumed_runtime_state
+                logger.info("Resuming after %d finished feature generation steps.",
+                            num_finished_feature_generation_steps)
 
-        tqdm_bar_format = "{l_bar}{bar}| {n_fmt}/{total_fmt}" \
-            " [{elapsed}<{remaining}, {rate_inv_fmt}]"
-        tqdm_unit = "step"
+        if cache is not None and num_finished_feature_generation_steps == 0:
+            assert step_fingerprints is not None
+            num_finished_feature_generation_steps, cached_runtime_state = \
+                cache.lookup(step_fingerprints.feature_generation)
+
+            if cached_runtime_state is not None:
+                runtime_state = cached_runtime_state
 
         logger.info("Feature generation...")
-        for feature_generation_step in tqdm(self.feature_generation_steps,
-                                            bar_format=tqdm_bar_format,
-                                            unit=tqdm_unit):
+        for index, feature_generation_step in enumerate(
+                tqdm(self.feature_generation_steps,
+                     bar_format=_TQDM_BAR_FORMAT,
+                     unit=_TQDM_UNIT)):
+
+            if index < num_finished_feature_generation_steps:
+                continue
 
             with open(self.blender_log_file_name, "a", encoding="utf-8") as log_file:
                 with pipes(stdout=log_file, stderr=STDOUT):    #type: ignore
-                    runtime_state = feature_generation_step(runtime_state)
+                    with self._tracer.trace(feature_generation_step,
+                                            "feature_generation", index):
+                        runtime_state = feature_generation_step(runtime_state)
+
+                    if self._use_checkpoints:
+                        self._save_checkpoint(index, runtime_state)
+
+                    if cache is not None and self._is_cached_step(index):
+                        assert step_fingerprints is not None
+                        cache.store(step_fingerprints.feature_generation[index],
+                                    runtime_state)
+
+        return runtime_state
+
+    def _execute_rendering(self, runtime_state: RuntimeState) -> None:
+        set_manifest_context(self._get_manifest_context())
+
+        if self.num_rendering_step_workers > 1:
+            if self._recipe_config is not None:
+                self._execute_rendering_in_parallel(runtime_state)
+                return
+
+            self._logger.warning("The rendering steps are executed sequentially, "
+                                 "since the recipe config is not available.")
+
+        self._logger.info("Rendering...")
+        for index, rendering_step in enumerate(
+                tqdm(self.rendering_steps, bar_format=_TQDM_BAR_FORMAT,
+                     unit=_TQDM_UNIT)):
+
+            if self._use_checkpoints and self._is_rendering_step_finished(index):
+                self._logger.info("Skipping finished rendering step %d.", index)
+                continue
 
-        logger.info("Rendering...")
-        for rendering_step in tqdm(self.rendering_steps,
-                                   bar_format=tqdm_bar_format,
-                                   unit=tqdm_unit):
             with open(self.blender_log_file_name, "a", encoding="utf-8") as log_file:
                 with pipes(stdout=log_file, stderr=STDOUT):    #type: ignore
-                    runtime_state = rendering_step(runtime_state)
+                    with self._tracer.trace(rendering_step, "rendering", index):
+                        runtime_state = rendering_step(runtime_state)
+
+            if self._use_checkpoints:
+                # Images, that are written asynchronously, and shards need to be
+                # complete, before the step is marked as finished.
+                flush_image_writer()
+                close_shard_writer()
+                self._mark_rendering_step_as_finished(index)
+
+        close_image_writer()
+        close_shard_writer()
+
+    def _execute_rendering_in_parallel(self, runtime_state: RuntimeState) -> None:
+        step_indices = []
+        for index in range(len(self.rendering_steps)):
+            if self._use_checkpoints and self._is_rendering_step_finished(index):
+                self._logger.info("Skipping finished rendering step %d.", index)
+                continue
+            step_indices.append(index)
+
+        if not step_indices:
+            return
+
+        assert self._recipe_config is not None
+        records = execute_rendering_steps_in_parallel(
+            self._recipe_config,
+            runtime_state,
+            step_indices,
+            self.num_rendering_step_workers,
+            self.blender_log_file_name,
+            on_step_finished=self._mark_rendering_step_as_finished
+            if self._use_checkpoints else None,
+            manifest_context=get_manifest_context(),
+            trace_origin=self._tracer.origin)
+        self._tracer.records.extend(records)
+
+    def _finish(self, trace_file_name: Optional[str]) -> None:
+        logger = self._logger
+
+        if trace_file_name is not None:
+            self._tracer.write_chrome_trace(trace_file_name)
+            logger.info("Wrote step trace to %s.", trace_file_name)
+
+        self._tracer.log_to_wandb()
+
+        if self._cache is not None:
+            logger.info("Feature generation cache statistics: %s", self._cache.stats)
+
+        self._state_storage.log_stats()
+
+    def _get_manifest_context(self) -> ManifestContext:
+        recipe_md5 = None
+        if self._recipe_config is not None:
+            recipe_md5 = get_recipe_md5(self._recipe_config)
+
+        state_fingerprint = None
+        if self._step_fingerprints is not None \
+                and self._step_fingerprints.feature_generation:
+            state_fingerprint = self._step_fingerprints.feature_generation[-1]
+
+        feature_generation_wall_times = [
+            record.wall_time
+            for record in self._tracer.records
+            if record.category == "feature_generation"
+        ]
+        feature_generation_time = sum(feature_generation_wall_times) \
+            if feature_generation_wall_times else None
+
+        return ManifestContext(recipe_md5=recipe_md5,
+                               state_fingerprint=state_fingerprint,
+                               feature_generation_time=feature_generation_time)
+
+    def _get_stage_trace_file_name(self, stage: str) -> Optional[str]:
+        if self.trace_file_name is None:
+            return None
+        trace_file_path = Path(self.trace_file_name)
+        return str(trace_file_path.with_name(
+            f"{trace_file_path.stem}_{stage}{trace_file_path.suffix}"))
+
+    def _get_feature_generation_cache(self) -> Optional[FeatureGenerationCache]:
+        if self.cache_root is None or self._step_fingerprints is None:
+            return None
+
+        # Relative paths are relative to the original working directory, so that all
+        # jobs of a sweep share the same cache.
+        return FeatureGenerationCache(
+            root=get_run_context().to_absolute_path(self.cache_root),
+            max_size_gb=self.cache_max_size_gb,
+            max_age_days=self.cache_max_age_days)
+
+    def _is_cached_step(self, index: int) -> bool:
+        if index == len(self.feature_generation_steps) - 1:
+            return True
+
+        step_type_name = type(self.feature_generation_steps[index]).__name__
+        return step_type_name in self.cached_step_types
+
+    @property
+    def _checkpoint_root_path(self) -> Path:
+        assert self.checkpoint_root is not None
+        # Relative paths are relative to the original working directory, so that
+        # subsequent runs can find the checkpoints of previous runs.
+        checkpoint_root_path = get_run_context().to_absolute_path(self.checkpoint_root)
+        checkpoint_root_path.mkdir(parents=True, exist_ok=True)
+        return checkpoint_root_path
+
+    def _get_feature_generation_checkpoint(self, index: int) -> Checkpoint:
+        assert self._step_fingerprints is not None
+        return Checkpoint(name=self._step_fingerprints.feature_generation[index],
+                          file_root=self._checkpoint_root_path)
+
+    def _resume_from_checkpoint(self) -> Tuple[int, Optional[RuntimeState]]:
+        """Restore the checkpoint of the last finished feature generation step, if
+        there is one.
+
+        Returns:
+            Tuple[int, Optional[RuntimeState]]: Number of finished feature generation
+                steps and the restored runtime state (`None`, if there is no
+                checkpoint).
+        """
+        for index in reversed(range(len(self.feature_generation_steps))):
+            checkpoint = self._get_feature_generation_checkpoint(index)
+            if checkpoint.exists():
+                return index + 1, checkpoint.load()
+
+        return 0, None
+
+    def _save_checkpoint(self, index: int, runtime_state: RuntimeState) -> None:
+        self._get_feature_generation_checkpoint(index).save(runtime_state)
+
+        # Only the latest checkpoint is needed to resume.
+        if index > 0:
+            self._get_feature_generation_checkpoint(index - 1).delete()
+
+    def _get_rendering_marker_path(self, index: int) -> Path:
+        assert self._step_fingerprints is not None
+        # Outputs of rendering steps are only reused, if they are written to the same
+        # output folder.
+        marker_name = get_object_md5(
+            [self._step_fingerprints.rendering[index],
+             os.getcwd()])
+        return self._checkpoint_root_path / f"{marker_name}.done"
+
+    def _is_rendering_step_finished(self, index: int) -> bool:
+        return self._get_rendering_marker_path(index).exists()
+
+    def _mark_rendering_step_as_finished(self, index: int) -> None:
+        self._get_rendering_marker_path(index).touch()
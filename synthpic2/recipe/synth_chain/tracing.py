@@ -0,0 +1,174 @@
+"""Module for tracing the execution of synth chain steps."""
+
+from contextlib import contextmanager
+import json
+import logging
+import os
+import resource
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+import attr
+import bpy
+
+from ...custom_types import AnyPath
+from ..blueprints import Particle
+from .step import SynthChainStep
+
+
+@attr.s(auto_attribs=True)
+class StepRecord:
+    """Resource usage of a single synth chain step.
+
+    Attributes:
+        name (str): Name of the step, including its position in the synth chain.
+        category (str): Either "feature_generation" or "rendering".
+        start (float): Start time in seconds, relative to the creation of the tracer.
+        wall_time (float): Wall time of the step in seconds.
+        cpu_time (float): CPU time of the step in seconds (all threads of the process).
+        peak_rss (int): Peak resident set size of the process in bytes, after the step.
+        num_objects (int): Number of Blender objects after the step.
+        num_meshes (int): Number of Blender meshes after the step.
+        num_materials (int): Number of Blender materials after the step.
+        num_particles (Optional[int]): Number of particles in the set that is affected
+            by the step. `None`, if the step does not operate on a set.
+        process_id (int): ID of the process, that executed the step.
+    """
+    name: str
+    category: str
+    start: float
+    wall_time: float
+    cpu_time: float
+    peak_rss: int
+    num_objects: int
+    num_meshes: int
+    num_materials: int
+    num_particles: Optional[int] = None
+    process_id: int = attr.Factory(os.getpid)
+
+
+class StepTracer:
+    """Class to record the resource usage of synth chain steps.
+
+    Args:
+        origin (Optional[float], optional): Time (see `time.perf_counter`), that the
+            start times of the records are relative to. Tracers of worker processes
+            use the origin of the main process, so that their records share its
+            timeline. Defaults to the creation of the tracer.
+    """
+
+    def __init__(self, origin: Optional[float] = None) -> None:
+        self.records: List[StepRecord] = []
+        self.origin = time.perf_counter() if origin is None else origin
+
+    @contextmanager
+    def trace(self, step: SynthChainStep, category: str, index: int) -> Iterator[None]:
+        """Context manager to trace the execution of a step. Steps, that fail, are
+        recorded as well, so that the trace shows, where the time was spent.
+
+        Args:
+            step (SynthChainStep): Step that is being executed.
+            category (str): Category of the step (e.g. "feature_generation").
+            index (int): Position of the step in its list of steps.
+        """
+        start_wall_time = time.perf_counter()
+        start_cpu_time = time.process_time()
+
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - start_wall_time
+            cpu_time = time.process_time() - start_cpu_time
+
+            record = StepRecord(name=f"{index}: {type(step).__name__}",
+                                category=category,
+                                start=start_wall_time - self.origin,
+                                wall_time=wall_time,
+                                cpu_time=cpu_time,
+                                peak_rss=_get_peak_rss(),
+                                num_objects=len(bpy.data.objects),
+                                num_meshes=len(bpy.data.meshes),
+                                num_materials=len(bpy.data.materials),
+                                num_particles=_count_affected_particles(step))
+            self.records.append(record)
+
+            logger = logging.getLogger("synthPIC2")
+            logger.debug("%s step %s took %.3f s (CPU: %.3f s).", category, record.name,
+                         wall_time, cpu_time)
+
+    def write_chrome_trace(self, file_path: AnyPath) -> None:
+        """Write the records as Chrome trace (can be opened with `chrome://tracing` or
+        https://ui.perfetto.dev).
+
+        Args:
+            file_path (AnyPath): Path of the trace file.
+        """
+        trace_events: List[Dict[str, Any]] = []
+
+        for record in self.records:
+            args = attr.asdict(record)
+            for key in ["name", "category", "start", "wall_time", "process_id"]:
+                args.pop(key)
+
+            trace_events.append({
+                "name": record.name,
+                "cat": record.category,
+                "ph": "X",
+                "ts": record.start * 1e6,
+                "dur": record.wall_time * 1e6,
+                "pid": record.process_id,
+                "tid": 0,
+                "args": args,
+            })
+
+            # Counter events, so that the viewer can plot memory and object counts.
+            trace_events.append({
+                "name": "resources",
+                "ph": "C",
+                "ts": (record.start + record.wall_time) * 1e6,
+                "pid": record.process_id,
+                "args": {
+                    "peak_rss_mb": record.peak_rss / 2**20,
+                    "num_objects": record.num_objects,
+                },
+            })
+
+        with open(file_path, "w", encoding="utf-8") as trace_file:
+            json.dump({
+                "traceEvents": trace_events,
+                "displayTimeUnit": "ms"
+            },
+                      trace_file,
+                      indent=1)
+
+    def log_to_wandb(self) -> None:
+        """Log the records to the active wandb run, if there is one."""
+        # wandb is only imported, if a run has been started (see `execute_recipe`).
+        wandb = sys.modules.get("wandb")
+        if wandb is None or wandb.run is None:
+            return
+
+        columns = [field.name for field in attr.fields(StepRecord)]
+        data = [list(attr.astuple(record)) for record in self.records]
+        table = wandb.Table(columns=columns, data=data)
+        wandb.log({"step_trace": table})
+
+        for record in self.records:
+            key_base = f"step_trace/{record.category}/{record.name}"
+            wandb.run.summary[f"{key_base}/wall_time"] = record.wall_time
+            wandb.run.summary[f"{key_base}/cpu_time"] = record.cpu_time
+
+
+def _get_peak_rss() -> int:
+    # `ru_maxrss` is given in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _count_affected_particles(step: SynthChainStep) -> Optional[int]:
+    # Feature generation steps use `affected_set`, rendering steps `set_of_interest`.
+    for attribute_name in ["affected_set", "set_of_interest"]:
+        set_ = getattr(step, attribute_name, None)
+        if set_ is not None:
+            return sum(isinstance(item, Particle) for item in set_())
+    return None
@@ -1,13 +1,20 @@
 """Module for synthpic2 utilities."""
 
+from contextlib import contextmanager
+from copy import deepcopy
+import fcntl
 import hashlib
 import json
+import os
 import pathlib
 import random
-from hydra.core import hydra_config
-from typing import Any, List, Tuple
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, Union
 
+import attr
 import numpy as np
+from omegaconf import DictConfig
+from omegaconf import OmegaConf
+from omegaconf import open_dict
 
 
 def seed_everything(seed: int = 42) -> None:
@@ -44,10 +51,170 @@ def get_unique_reproducible_random_colors(num_colors: int,
     return [(row[0], row[1], row[2], row[3]) for row in colors.T]
 
 
+def rgb_to_hex(color: Sequence[float]) -> str:
+    """Convert an RGB(A) color with values between 0 and 1 to a hex string (e.g.
+    "#ff0000"). The alpha channel is ignored.
+
+    Equivalent to `matplotlib.colors.rgb2hex`, but without the import time of
+    matplotlib.
+
+    Args:
+        color (Sequence[float]): RGB or RGBA color.
+
+    Returns:
+        str: Hex string of the color.
+    """
+    return "#" + "".join(format(round(value * 255), "02x") for value in color[:3])
+
+
+def hex_to_rgb(color_hex: str) -> Tuple[float, float, float]:
+    """Convert a hex string (e.g. "#ff0000") to an RGB color with values between 0 and
+    1.
+
+    Equivalent to `matplotlib.colors.hex2color`, but without the import time of
+    matplotlib.
+
+    Args:
+        color_hex (str): Hex string of the color.
+
+    Returns:
+        Tuple[float, float, float]: RGB color.
+    """
+    return (int(color_hex[1:3], 16) / 255, int(color_hex[3:5], 16) / 255,
+            int(color_hex[5:7], 16) / 255)
+
+
 def get_hydra_output_root() -> pathlib.Path:
     """Get the output root path from Hydra.
 
     Returns:
         pathlib.Path: Output root path.
     """
+    from hydra.core import hydra_config    # pylint: disable=import-outside-toplevel
+
     return pathlib.Path(hydra_config.HydraConfig.get().run.dir)
+
+
+@contextmanager
+def working_directory(path: pathlib.Path) -> Iterator[None]:
+    """Temporarily change the working directory. The directory is created, if it does
+    not exist.
+
+    Args:
+        path (pathlib.Path): New working directory.
+    """
+    original_working_directory = os.getcwd()
+    path.mkdir(parents=True, exist_ok=True)
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(original_working_directory)
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class RunContext:
+    """Where a run was started and where it writes its outputs to. Hydra changes the
+    working directory to the run folder, but its config is not available in worker
+    processes, so the context is created once by the main process and passed to the
+    workers explicitly.
+
+    Attributes:
+        original_working_directory (str): Absolute working directory, that the run was
+            started from. Relative paths of a recipe (e.g. `synth_chain.cache_root`)
+            are relative to it.
+        run_id (str): ID of the run (the run folder relative to the original working
+            directory).
+    """
+    original_working_directory: str
+    run_id: str
+
+    def to_absolute_path(self, path: Union[str, "os.PathLike[str]"]) -> pathlib.Path:
+        """Make a path absolute, by resolving it relative to the original working
+        directory. Absolute paths are returned unchanged.
+
+        Args:
+            path (Union[str, os.PathLike[str]]): Path.
+
+        Returns:
+            pathlib.Path: Absolute path.
+        """
+        return pathlib.Path(self.original_working_directory) / path
+
+
+_RUN_CONTEXT: Optional[RunContext] = None
+
+
+def create_run_context() -> RunContext:
+    """Create the context of a run from Hydra. The current working directory is the
+    run folder.
+
+    Returns:
+        RunContext: Context of the run.
+    """
+    from hydra import utils as hydra_utils    # pylint: disable=import-outside-toplevel
+
+    run_folder = pathlib.Path.cwd()
+    try:
+        original_working_directory = pathlib.Path(hydra_utils.get_original_cwd())
+    except ValueError:
+        # If we are not running in Hydra (e.g. during tests), the working directory is
+        # not changed.
+        original_working_directory = run_folder
+
+    run_id = pathlib.Path(os.path.relpath(run_folder, original_working_directory))
+    return RunContext(original_working_directory=str(original_working_directory),
+                      run_id=run_id.as_posix())
+
+
+def get_run_context() -> RunContext:
+    """Get the context of the current run. If it has not been set (e.g. when a recipe
+    is executed directly from a script or notebook), it is created from the current
+    working directory.
+
+    Returns:
+        RunContext: Context of the run.
+    """
+    global _RUN_CONTEXT
+    if _RUN_CONTEXT is None:
+        _RUN_CONTEXT = create_run_context()
+    return _RUN_CONTEXT
+
+
+def set_run_context(run_context: Optional[RunContext]) -> None:
+    global _RUN_CONTEXT
+    _RUN_CONTEXT = run_context
+
+
+@contextmanager
+def file_lock(path: pathlib.Path) -> Iterator[None]:
+    """Hold an exclusive lock on a file, so that processes, which write to the same
+    files, don't race. The lock file is created, if it does not exist.
+
+    Args:
+        path (pathlib.Path): Path of the lock file.
+    """
+    with open(path, "a", encoding="utf-8") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def resolve_recipe_config(recipe_config: DictConfig) -> DictConfig:
+    """Copy a recipe config and resolve its interpolations, so that it can be
+    instantiated by worker processes, which don't run in Hydra. The `hydra` node is
+    removed, since only Hydra can resolve its interpolations.
+
+    Args:
+        recipe_config (DictConfig): Parsed recipe config.
+
+    Returns:
+        DictConfig: Resolved copy of the recipe config.
+    """
+    recipe_config = deepcopy(recipe_config)
+    with open_dict(recipe_config):
+        recipe_config.pop("hydra", None)
+    OmegaConf.resolve(recipe_config)
+    return recipe_config
@@ -0,0 +1,35 @@
+"""Tests for the RenderSession class."""
+
+import unittest
+from unittest import mock
+import warnings
+
+import bpy
+
+from synthpic2.blender import Gpu
+from synthpic2.blender import RenderSession
+
+
+class TestRenderSession(unittest.TestCase):
+    """Tests of the RenderSession class."""
+
+    # pylint: disable=protected-access
+
+    def tearDown(self) -> None:
+        RenderSession._is_gpu_available = None
+
+    def test_devices_are_probed_once(self) -> None:
+        bpy.ops.wm.read_factory_settings()
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            with mock.patch.object(Gpu, "_make_available",
+                                   wraps=Gpu._make_available) as make_available:
+                RenderSession.enable_gpu()
+                RenderSession.enable_gpu()
+
+                if not RenderSession._is_gpu_available:
+                    self.assertEqual(make_available.call_count, 1)
+                    self.assertEqual(bpy.context.scene.cycles.device, "CPU")
+                else:
+                    self.assertEqual(bpy.context.scene.cycles.device, "GPU")
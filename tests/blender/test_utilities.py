@@ -10,6 +10,7 @@ from synthpic2 import blender
 from synthpic2.blender.utilities import convert_blender_object_to_trimesh
 from synthpic2.blender.utilities import create_collection
 from synthpic2.blender.utilities import create_emission_shader
+from synthpic2.blender.utilities import create_object_color_emission_shader
 from synthpic2.blender.utilities import duplicate_and_link_object
 from synthpic2.blender.utilities import get_collection
 from synthpic2.blender.utilities import get_material
@@ -112,6 +113,14 @@ class BlenderUtilitiesTest(unittest.TestCase):
         bpy.ops.wm.read_factory_settings()
         create_emission_shader()
 
+    def test_create_object_color_emission_shader(self) -> None:
+        bpy.ops.wm.read_factory_settings()
+        material = create_object_color_emission_shader()
+
+        self.assertIs(create_object_color_emission_shader(), material)
+        node_types = {node.type for node in material.node_tree.nodes}
+        self.assertEqual(node_types, {"OUTPUT_MATERIAL", "OBJECT_INFO", "EMISSION"})
+
     def test_create_collection(self) -> None:
         bpy.ops.wm.read_factory_settings()
 
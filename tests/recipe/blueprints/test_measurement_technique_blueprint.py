@@ -116,6 +116,34 @@ class TestMeasurementTechniqueBlueprint(unittest.TestCase):
             }})
         ])
 
+    def test_invoke_existing_measurement_technique(self) -> None:
+        """Test that invoking a measurement technique blueprint, whose measurement
+        technique already exists, keeps the existing measurement technique."""
+
+        mt_blueprint = MeasurementTechniqueBlueprint(
+            name="TestBlueprint",
+            measurement_technique_prototype_name="secondary_electron_microscope",
+            measurement_volume_material_prototype_name="vacuum")
+        mt_blueprint.invoke()
+
+        measurement_technique = MEASUREMENT_TECHNIQUE_REGISTRY["TestBlueprint"]
+        num_objects = len(bpy.data.objects)
+
+        MEASUREMENT_TECHNIQUE_BLUEPRINT_REGISTRY.clear()
+        new_mt_blueprint = MeasurementTechniqueBlueprint(
+            name="TestBlueprint",
+            measurement_technique_prototype_name="secondary_electron_microscope",
+            measurement_volume_material_prototype_name="vacuum")
+        new_mt_blueprint.measurement_technique_prototype.initialize = mock.Mock()
+
+        new_mt_blueprint.invoke()
+
+        new_mt_blueprint.measurement_technique_prototype.initialize.assert_not_called()
+        self.assertEqual(len(MEASUREMENT_TECHNIQUE_REGISTRY), 1)
+        self.assertIs(MEASUREMENT_TECHNIQUE_REGISTRY[0], measurement_technique)
+        self.assertIs(measurement_technique.blueprint, new_mt_blueprint)
+        self.assertEqual(len(bpy.data.objects), num_objects)
+
     def test_wrong_prototype_names(self) -> None:
         """
         Test invocation of the ParticleBlueprint class with non-existent prototype names.
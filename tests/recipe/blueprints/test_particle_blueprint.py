@@ -6,6 +6,7 @@ import bpy
 
 from synthpic2 import PrototypeLibrary
 from synthpic2.recipe.blueprints import ParticleBlueprint
+from synthpic2.recipe.blueprints import remove_all_particles
 from synthpic2.recipe.registries import clear_all_registries
 from synthpic2.recipe.registries import PARTICLE_BLUEPRINT_REGISTRY
 from synthpic2.recipe.registries import PARTICLE_REGISTRY
@@ -40,6 +41,27 @@ class TestParticleBlueprint(unittest.TestCase):
                                                number=1)
         particle_blueprint.invoke()
 
+    def test_remove_all_particles(self) -> None:
+        """Test that all particles and their data blocks are removed, but prototypes
+        are kept."""
+
+        bpy.data.objects["Cube"].name = "MeasurementVolume"
+
+        particle_blueprint = ParticleBlueprint(name="TestBlueprint",
+                                               geometry_prototype_name="sphere",
+                                               material_prototype_name="plain",
+                                               number=3)
+        particle_blueprint.invoke()
+        self.assertEqual(len(PARTICLE_REGISTRY), 3)
+
+        remove_all_particles()
+
+        self.assertEqual(len(PARTICLE_REGISTRY), 0)
+        self.assertEqual(len(bpy.data.collections["Particles"].objects), 0)
+        self.assertIn("MeasurementVolume", bpy.data.objects)
+        self.assertIsNotNone(particle_blueprint.geometry_prototype.blender_object)
+        self.assertIsNotNone(particle_blueprint.material_prototype.blender_object)
+
     def test_wrong_prototype_names(self) -> None:
         """Test invocation of the ParticleBlueprint class with non-existent prototype
         names."""
@@ -4,6 +4,7 @@ import unittest
 
 import bpy
 
+from synthpic2.blender.utilities import delete
 from synthpic2.blender.utilities import get_object
 from synthpic2.recipe.prototypes.feature import Feature
 
@@ -132,3 +133,42 @@ class TestFeature(unittest.TestCase):
         feature.value = set_point
         obj_ = get_object(new_object_name)
         self.assertEqual(tuple(obj_.scale), set_point)
+
+    def test_blender_feature_after_renaming(self) -> None:
+        feature = Feature(name="feature", blender_link="bpy.data.objects['Cube'].scale")
+        _ = feature.value
+
+        get_object("Cube").name = "OldCube"
+        new_cube = bpy.data.objects.new("Cube", None)
+        new_cube.scale = (1, 2, 3)
+
+        self.assertEqual(feature.value, (1, 2, 3))
+
+    def test_blender_feature_after_deletion(self) -> None:
+        feature = Feature(name="feature", blender_link="bpy.data.objects['Cube'].scale")
+        _ = feature.value
+
+        delete(get_object("Cube"))
+        new_cube = bpy.data.objects.new("Cube", None)
+        new_cube.scale = (1, 2, 3)
+
+        self.assertEqual(feature.value, (1, 2, 3))
+
+    def test_blender_feature_after_removal_with_bpy(self) -> None:
+        feature = Feature(name="feature", blender_link="bpy.data.objects['Cube'].scale")
+        _ = feature.value
+
+        bpy.data.objects.remove(get_object("Cube"))
+        new_cube = bpy.data.objects.new("Cube", None)
+        new_cube.scale = (1, 2, 3)
+
+        self.assertEqual(feature.value, (1, 2, 3))
+
+    def test_blender_feature_after_reload(self) -> None:
+        feature = Feature(name="feature",
+                          blender_link="bpy.data.lights['Light'].energy")
+        feature.value = 10000
+
+        bpy.ops.wm.read_factory_settings()
+
+        self.assertEqual(feature.value, 1000)
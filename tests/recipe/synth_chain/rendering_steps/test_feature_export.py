@@ -0,0 +1,89 @@
+"""Tests for the export of particle features to a Parquet dataset."""
+
+from pathlib import Path
+import tempfile
+from types import SimpleNamespace
+import unittest
+
+from synthpic2.recipe.synth_chain.rendering_steps.feature_export import \
+    collect_particle_features
+from synthpic2.recipe.synth_chain.rendering_steps.feature_export import \
+    get_run_and_image
+from synthpic2.recipe.synth_chain.rendering_steps.feature_export import \
+    load_particle_features
+from synthpic2.recipe.synth_chain.rendering_steps.feature_export import \
+    save_particle_features_to_dataset
+from synthpic2.utilities import RunContext
+from synthpic2.utilities import set_run_context
+
+
+def _get_particle(md5: str, **feature_values: object) -> SimpleNamespace:
+    features = [
+        SimpleNamespace(name=name, value=value)
+        for name, value in feature_values.items()
+    ]
+    return SimpleNamespace(md5=md5, features=features)
+
+
+class TestFeatureExport(unittest.TestCase):
+    """Tests of the columnar export of particle features."""
+
+    def setUp(self) -> None:
+        self.particles = [
+            _get_particle("a", location=(0.0, 1.0, 2.0), blueprint_name="Bead"),
+            _get_particle("b", location=(1.0, 1.0, 1.0), radius=0.5),
+        ]
+
+    def test_collect_particle_features(self) -> None:
+        columns = collect_particle_features(self.particles)    # type: ignore
+
+        self.assertEqual(columns["particle_hash"], ["a", "b"])
+        self.assertEqual(columns["location"], [[0.0, 1.0, 2.0], [1.0, 1.0, 1.0]])
+        self.assertEqual(columns["blueprint_name"], ["Bead", None])
+        self.assertEqual(columns["radius"], [None, 0.5])
+
+    def test_get_run_and_image(self) -> None:
+        # Without a context (e.g. outside of Hydra), the run is the current working
+        # directory.
+        set_run_context(None)
+        try:
+            _, run_id, _ = get_run_and_image(Path("/output/run3"))
+            self.assertEqual(run_id, ".")
+        finally:
+            set_run_context(None)
+
+        set_run_context(RunContext(original_working_directory="/",
+                                   run_id="output/run3"))
+        try:
+            run_folder, run_id, image_index = get_run_and_image(
+                Path("/output/run3/image12"))
+            self.assertEqual((run_folder, run_id, image_index),
+                             (Path("/output/run3"), "output/run3", 12))
+
+            run_folder, _, image_index = get_run_and_image(Path("/output/run3"))
+            self.assertEqual((run_folder, image_index), (Path("/output/run3"), 0))
+        finally:
+            set_run_context(None)
+
+    def test_dataset(self) -> None:
+        with tempfile.TemporaryDirectory() as dataset_root:
+            for image_index in range(2):
+                save_particle_features_to_dataset(
+                    self.particles,    # type: ignore
+                    Path(dataset_root),
+                    "2023-01-01/run0",
+                    image_index)
+
+            # Subsequent rendering steps of an image reuse the rows of the first one.
+            save_particle_features_to_dataset(
+                [_get_particle("c", radius=1.0)],    # type: ignore
+                Path(dataset_root),
+                "2023-01-01/run0",
+                1)
+
+            features = load_particle_features(Path(dataset_root))
+
+        self.assertEqual(len(features), 4)
+        self.assertEqual(set(features["run"]), {"2023-01-01/run0"})
+        self.assertEqual(sorted(features["image"]), [0, 0, 1, 1])
+        self.assertNotIn("c", set(features["particle_hash"]))
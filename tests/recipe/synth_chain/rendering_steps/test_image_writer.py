@@ -0,0 +1,79 @@
+"""Tests for the asynchronous writing of rendered images."""
+
+from pathlib import Path
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from synthpic2.recipe.synth_chain.rendering_steps.image_writer import AsyncImageWriter
+from synthpic2.recipe.synth_chain.rendering_steps.image_writer import \
+    convert_to_display_values
+
+
+class TestImageWriter(unittest.TestCase):
+    """Tests of the AsyncImageWriter class."""
+
+    def test_convert_to_display_values(self) -> None:
+        pixels = np.array([[[0.0, 0.5, 1.0, 1.0], [2.0, -1.0, 0.18, 0.5]]],
+                          dtype=np.float32)
+
+        raw = convert_to_display_values(pixels, "Raw", "RGB", "8")
+        np.testing.assert_array_equal(raw, [[[0, 128, 255], [255, 0, 46]]])
+
+        standard = convert_to_display_values(pixels, "Standard", "RGBA", "16")
+        self.assertEqual(standard.dtype, np.uint16)
+        self.assertEqual(standard.shape, (1, 2, 4))
+        self.assertEqual(standard[0, 1, 3], 32768)
+
+        bw = convert_to_display_values(pixels, "Raw", "BW", "8")
+        self.assertEqual(bw.shape, (1, 2, 1))
+
+        with self.assertRaises(ValueError):
+            convert_to_display_values(pixels, "Filmic")
+
+    def test_submit(self) -> None:
+        rng = np.random.default_rng(0)
+        pixels = rng.random((5, 7, 4), dtype=np.float32)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            writer = AsyncImageWriter(num_threads=2, max_queue_depth=2)
+
+            file_paths = {}
+            for color_mode, color_depth in [("BW", "8"), ("BW", "16"), ("RGB", "8"),
+                                            ("RGBA", "8")]:
+                file_paths[color_mode, color_depth] = writer.submit(
+                    pixels,
+                    Path(temp_dir) / f"{color_mode}_{color_depth}.jpg",
+                    color_mode=color_mode,
+                    color_depth=color_depth,
+                    compression_level=1)
+            # Pillow can only write 16 bit images in black and white.
+            with self.assertRaises(ValueError):
+                writer.submit(pixels,
+                              Path(temp_dir) / "RGB_16.png",
+                              color_mode="RGB",
+                              color_depth="16")
+            npy_file_path = writer.submit(pixels,
+                                          Path(temp_dir) / "image",
+                                          codec="npy")
+            writer.close()
+
+            self.assertEqual(writer.stats.num_images, 5)
+            self.assertLessEqual(writer.stats.max_queue_depth, 2)
+
+            for (color_mode, color_depth), file_path in file_paths.items():
+                self.assertEqual(file_path.suffix, ".png")
+                expected_image = convert_to_display_values(pixels,
+                                                           color_mode=color_mode,
+                                                           color_depth=color_depth)
+                image = np.asarray(Image.open(file_path))
+                np.testing.assert_array_equal(image.reshape(expected_image.shape),
+                                              expected_image)
+
+            np.testing.assert_array_equal(np.load(npy_file_path),
+                                          convert_to_display_values(pixels))
+
+            with self.assertRaises(ValueError):
+                writer.submit(pixels, Path(temp_dir) / "image", codec="tif")
@@ -0,0 +1,32 @@
+"""Tests for the derivation of masks from instance masks."""
+
+from pathlib import Path
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from synthpic2.recipe.synth_chain.rendering_steps.masks import get_mask
+from synthpic2.recipe.synth_chain.rendering_steps.masks import save_mask
+
+
+class TestMasks(unittest.TestCase):
+    """Tests of the mask functions."""
+
+    def test_get_and_save_mask(self) -> None:
+        instance_mask = np.array([[0, 1, 1], [2, 3, 0]])
+
+        mask = get_mask(instance_mask, [1, 3])
+        np.testing.assert_array_equal(mask, [[False, True, True], [False, False, True]])
+
+        empty_mask = get_mask(instance_mask, [])
+        self.assertFalse(empty_mask.any())
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = Path(temp_dir) / "mask.png"
+            save_mask(mask, file_path)
+
+            saved_mask = np.asarray(Image.open(file_path))
+
+        np.testing.assert_array_equal(saved_mask, mask.astype(np.uint8) * 255)
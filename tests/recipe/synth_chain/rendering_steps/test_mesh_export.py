@@ -0,0 +1,81 @@
+"""Tests for the bulk export of meshes."""
+
+import json
+import struct
+import unittest
+
+import numpy as np
+
+from synthpic2.recipe.synth_chain.rendering_steps.mesh_export import \
+    combine_meshes
+from synthpic2.recipe.synth_chain.rendering_steps.mesh_export import encode_glb
+from synthpic2.recipe.synth_chain.rendering_steps.mesh_export import encode_ply
+from synthpic2.recipe.synth_chain.rendering_steps.mesh_export import encode_stl
+
+
+class TestMeshExport(unittest.TestCase):
+    """Tests of the combination and the encoding of meshes."""
+
+    def setUp(self) -> None:
+        triangle = (np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0]], dtype=np.float32),
+                    np.array([[0, 1, 2]]))
+        quad = (np.array([[0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1]],
+                         dtype=np.float32), np.array([[0, 1, 2], [0, 2, 3]]))
+
+        self.vertices, self.faces, self.instance_ids = combine_meshes(
+            [triangle, quad], [1, 2])
+
+    def test_combine_meshes(self) -> None:
+        self.assertEqual(self.vertices.shape, (7, 3))
+        np.testing.assert_array_equal(self.faces, [[0, 1, 2], [3, 4, 5], [3, 5, 6]])
+        np.testing.assert_array_equal(self.instance_ids, [1, 2, 2])
+
+        vertices, faces, instance_ids = combine_meshes([], [])
+        self.assertEqual((len(vertices), len(faces), len(instance_ids)), (0, 0, 0))
+
+    def test_encode_stl(self) -> None:
+        data = encode_stl(self.vertices, self.faces, self.instance_ids)
+
+        self.assertEqual(len(data), 84 + 3 * 50)
+        self.assertEqual(struct.unpack_from("<I", data, 80)[0], 3)
+
+        records = np.frombuffer(data[84:],
+                                dtype=np.dtype([("normal", "<f4", 3),
+                                                ("vertices", "<f4", (3, 3)),
+                                                ("attribute", "<u2")]))
+        np.testing.assert_allclose(records["normal"], [[0, 0, 1]] * 3)
+        np.testing.assert_array_equal(records["vertices"], self.vertices[self.faces])
+        np.testing.assert_array_equal(records["attribute"], self.instance_ids)
+
+        with self.assertRaises(ValueError):
+            encode_stl(self.vertices, self.faces, self.instance_ids * 100000)
+
+    def test_encode_ply(self) -> None:
+        data = encode_ply(self.vertices, self.faces, self.instance_ids)
+
+        header, body = data.split(b"end_header\n")
+        self.assertIn(b"element vertex 7", header)
+        self.assertIn(b"element face 3", header)
+        self.assertIn(b"property int instance_id", header)
+        self.assertEqual(len(body), 7 * 12 + 3 * 17)
+
+    def test_encode_glb(self) -> None:
+        data = encode_glb(self.vertices, self.faces, self.instance_ids)
+
+        magic, version, length = struct.unpack_from("<III", data)
+        self.assertEqual((magic, version, length), (0x46546C67, 2, len(data)))
+
+        json_length, _ = struct.unpack_from("<II", data, 12)
+        gltf = json.loads(data[20:20 + json_length])
+        primitive = gltf["meshes"][0]["primitives"][0]
+        self.assertEqual(gltf["accessors"][primitive["indices"]]["count"], 9)
+        self.assertEqual(
+            gltf["accessors"][primitive["attributes"]["POSITION"]]["max"], [1, 1, 0])
+        self.assertIn("_INSTANCE_ID", primitive["attributes"])
+
+        binary_length, _ = struct.unpack_from("<II", data, 20 + json_length)
+        self.assertEqual(binary_length, gltf["buffers"][0]["byteLength"])
+        self.assertEqual(len(data) % 4, 0)
+
+        empty_data = encode_glb(np.empty((0, 3)), np.empty((0, 3), dtype=np.int64))
+        self.assertEqual(struct.unpack_from("<III", empty_data)[2], len(empty_data))
@@ -0,0 +1,132 @@
+"""Tests for the rasterization of categorical images, depth maps and normal maps."""
+
+import unittest
+
+import bpy
+import numpy as np
+
+from synthpic2.blender.utilities import render_to_array
+from synthpic2.recipe.synth_chain.rendering_steps.rasterization import \
+    extract_triangles
+from synthpic2.recipe.synth_chain.rendering_steps.rasterization import \
+    get_camera_matrices
+from synthpic2.recipe.synth_chain.rendering_steps.rasterization import rasterize
+from synthpic2.recipe.synth_chain.rendering_steps.rasterization import \
+    shade_categorical
+from synthpic2.recipe.synth_chain.rendering_steps.rasterization import \
+    shade_depth_map
+
+
+def _get_quad(x_min: float, x_max: float, y_min: float, y_max: float,
+              z: float) -> np.ndarray:
+    corners = np.array([[x_min, y_min, z], [x_max, y_min, z], [x_max, y_max, z],
+                        [x_min, y_max, z]])
+    return corners[[[0, 1, 2], [0, 2, 3]]]
+
+
+class TestRasterize(unittest.TestCase):
+    """Tests of the rasterize function."""
+
+    def test_orthographic_occlusion(self) -> None:
+        # Orthographic projection of x and y between -1 and 1.
+        projection_matrix = np.eye(4)
+        projection_matrix[2, 2:] = (-0.1, -1)
+
+        positions = np.concatenate(
+            [_get_quad(-0.5, 0.5, -0.5, 0.5, -5),
+             _get_quad(0, 1, 0, 1, -3)])
+        fragments = rasterize(positions, np.eye(4), projection_matrix, 40, 20)
+
+        self.assertEqual(np.sum(fragments.foreground), 350)
+        np.testing.assert_allclose(fragments.depth[5:10, 20:40], 3)
+        np.testing.assert_allclose(fragments.depth[10:15, 10:20], 5)
+
+        colors = np.array([[1, 0, 0], [1, 0, 0], [0, 1, 0], [0, 1, 0]])
+        image = shade_categorical(fragments, colors)
+        self.assertEqual(np.sum(image[..., 0]), 150)
+        self.assertEqual(np.sum(image[..., 1]), 200)
+
+        depth_map = shade_depth_map(fragments)
+        self.assertEqual(depth_map[0, 0, 0], 1)
+        self.assertAlmostEqual(depth_map[5, 20, 0], 0)
+        self.assertAlmostEqual(depth_map[14, 10, 0], 1)
+
+        empty_fragments = rasterize(np.empty((0, 3, 3)), np.eye(4), projection_matrix,
+                                    40, 20)
+        self.assertFalse(empty_fragments.foreground.any())
+
+
+class TestCyclesAgreement(unittest.TestCase):
+    """Tests, that the rasterizer agrees with the render passes of Cycles."""
+
+    def setUp(self) -> None:
+        bpy.ops.wm.read_factory_settings()
+
+        scene = bpy.data.scenes[0]
+        scene.render.engine = "CYCLES"
+        scene.render.resolution_x = 96
+        scene.render.resolution_y = 64
+        scene.render.resolution_percentage = 100
+        scene.cycles.device = "CPU"
+        scene.cycles.samples = 1
+        # Sample close to the pixel centers.
+        scene.cycles.filter_width = 0.01
+        scene.view_settings.view_transform = "Raw"
+
+        bpy.ops.mesh.primitive_uv_sphere_add(radius=0.8, location=(1.2, 0.5, 1.2))
+        bpy.ops.object.shade_smooth()
+
+        self.objects = [bpy.data.objects["Cube"], bpy.data.objects["Sphere"]]
+        for pass_index, object_ in enumerate(self.objects, start=1):
+            object_.pass_index = pass_index
+
+        view_layer = scene.view_layers[0]
+        view_layer.use_pass_z = True
+        view_layer.use_pass_normal = True
+        view_layer.use_pass_object_index = True
+
+        scene.use_nodes = True
+        scene.render.use_compositing = True
+        compositing_nodes = scene.node_tree.nodes
+        self.render_layers_node = compositing_nodes["Render Layers"]
+        self.viewer_node = compositing_nodes.new("CompositorNodeViewer")
+        compositing_nodes.active = self.viewer_node
+
+    def _render_pass(self, output_name: str) -> np.ndarray:
+        bpy.data.scenes[0].node_tree.links.new(
+            self.render_layers_node.outputs[output_name],
+            self.viewer_node.inputs["Image"])
+        return render_to_array()
+
+    def test_agreement(self) -> None:
+        view_matrix, projection_matrix, width, height = get_camera_matrices(
+            bpy.data.scenes[0])
+
+        triangles = [extract_triangles(object_) for object_ in self.objects]
+        positions = np.concatenate([positions for positions, _ in triangles])
+        normals = np.concatenate([normals for _, normals in triangles])
+        pass_indices = np.repeat([1, 2], [len(positions) for positions, _ in triangles])
+
+        fragments = rasterize(positions, view_matrix, projection_matrix, width, height)
+        self.assertEqual(fragments.triangle_indices.shape, (height, width))
+
+        instance_mask = np.where(fragments.foreground,
+                                 pass_indices[fragments.triangle_indices], 0)
+        cycles_instance_mask = np.rint(self._render_pass("IndexOB")[..., 0])
+
+        agreement = instance_mask == cycles_instance_mask
+        self.assertGreater(np.mean(agreement), 0.99)
+        self.assertTrue(np.all(np.isin([1, 2], instance_mask)))
+
+        agreeing_foreground = agreement & fragments.foreground
+
+        cycles_depth = self._render_pass("Depth")[..., 0]
+        depth_errors = np.abs(fragments.depth - cycles_depth)
+        self.assertLess(np.median(depth_errors[agreeing_foreground]), 1e-3)
+
+        cycles_normals = self._render_pass("Normal")[..., :3]
+        interpolated_normals = fragments.interpolate(normals)
+        interpolated_normals /= np.maximum(
+            np.linalg.norm(interpolated_normals, axis=-1, keepdims=True), 1e-12)
+        normal_errors = np.linalg.norm(interpolated_normals - cycles_normals, axis=-1)
+        self.assertLess(np.median(normal_errors[agreeing_foreground]), 1e-2)
@@ -0,0 +1,41 @@
+"""Tests for the rendering steps."""
+
+import unittest
+
+import bpy
+
+from synthpic2.recipe.synth_chain.rendering_steps.rendering import \
+    _setup_compositor
+
+
+class TestSetupCompositor(unittest.TestCase):
+    """Tests of the compositor setup of `RenderPassesTogether`."""
+
+    def test_unused_compositor_is_replaced(self) -> None:
+        bpy.ops.wm.read_factory_settings()
+
+        scene = bpy.data.scenes[0]
+        scene.use_nodes = True
+        scene.node_tree.nodes.new("CompositorNodeBlur")
+        scene.use_nodes = False
+
+        render_layers_node = _setup_compositor()
+
+        self.assertTrue(scene.use_nodes)
+        self.assertTrue(scene.render.use_compositing)
+        self.assertEqual(render_layers_node.type, "R_LAYERS")
+        self.assertEqual(sorted(node.type for node in scene.node_tree.nodes),
+                         ["COMPOSITE", "R_LAYERS"])
+
+    def test_used_compositor_is_kept(self) -> None:
+        bpy.ops.wm.read_factory_settings()
+
+        scene = bpy.data.scenes[0]
+        scene.use_nodes = True
+        scene.render.use_compositing = True
+        blur_node = scene.node_tree.nodes.new("CompositorNodeBlur")
+
+        render_layers_node = _setup_compositor()
+
+        self.assertIn(blur_node, list(scene.node_tree.nodes))
+        self.assertEqual(render_layers_node.type, "R_LAYERS")
@@ -0,0 +1,42 @@
+"""Tests for the sampling budget and the statistics of renders."""
+
+import unittest
+
+import numpy as np
+
+from synthpic2.recipe.synth_chain.rendering_steps.sampling import estimate_noise
+from synthpic2.recipe.synth_chain.rendering_steps.sampling import \
+    parse_sample_count
+from synthpic2.recipe.synth_chain.rendering_steps.sampling import \
+    RenderStatistics
+
+
+class TestSampling(unittest.TestCase):
+    """Tests of the sampling utilities."""
+
+    def test_estimate_noise(self) -> None:
+        gradient = np.tile(np.linspace(0, 1, 200), (150, 1))
+        self.assertAlmostEqual(estimate_noise(gradient), 0)
+
+        rng = np.random.default_rng(0)
+        noisy_gradient = gradient + rng.normal(0, 0.05, gradient.shape)
+        self.assertAlmostEqual(estimate_noise(noisy_gradient), 0.05, delta=0.005)
+
+        # RGBA images are converted to luma.
+        rgba_image = np.stack([noisy_gradient] * 3 + [np.ones_like(gradient)], axis=-1)
+        self.assertAlmostEqual(estimate_noise(rgba_image),
+                               estimate_noise(noisy_gradient))
+
+    def test_parse_sample_count(self) -> None:
+        self.assertEqual(parse_sample_count("Fra:1 | Mem:12.3M | Sample 37/128"), 37)
+        self.assertIsNone(parse_sample_count("Fra:1 | Mem:12.3M | Denoising"))
+
+    def test_render_statistics(self) -> None:
+        statistics = RenderStatistics()
+        statistics.add(samples=10, render_time=2.0, residual_noise=0.1)
+        statistics.add(samples=20, render_time=4.0, residual_noise=0.3)
+
+        features = statistics.as_features()
+        self.assertEqual(features["rendered_samples"], 15)
+        self.assertAlmostEqual(features["render_time"], 3)
+        self.assertAlmostEqual(features["residual_noise"], 0.2)
@@ -0,0 +1,91 @@
+"""Tests for the SQLite index of sets and their particles."""
+
+from pathlib import Path
+import tempfile
+from types import SimpleNamespace
+import unittest
+
+from synthpic2.recipe.synth_chain.rendering_steps.set_index import SetIndex
+
+
+class _Set:
+    """Minimal stand-in for a set, which returns its particles, when called."""
+
+    def __init__(self, name: str, md5: str, particle_hashes: list) -> None:
+        self.name = name
+        self.md5 = md5
+        self.particles = [SimpleNamespace(md5=md5) for md5 in particle_hashes]
+
+    def __call__(self) -> list:
+        return self.particles
+
+
+class TestSetIndex(unittest.TestCase):
+    """Tests of the SetIndex."""
+
+    def setUp(self) -> None:
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.temporary_directory.name) / "set_index.sqlite"
+
+        self.all_particles = _Set("AllParticles", "all", ["a", "b", "c"])
+        self.empty = _Set("Empty", "empty", [])
+        self.pink_particles = _Set("PinkParticles", "pink", ["b"])
+
+    def tearDown(self) -> None:
+        self.temporary_directory.cleanup()
+
+    def test_get_memberships(self) -> None:
+        with SetIndex(self.file_path) as set_index:
+            set_index.add([self.all_particles, self.empty], "run0", 0)
+            set_index.add([self.pink_particles, self.empty], "run0", 1)
+
+            self.assertEqual(set_index.get_memberships("run0", 0), {
+                "AllParticles": ["a", "b", "c"],
+                "Empty": []
+            })
+            self.assertEqual(set_index.get_memberships("run0", 1), {
+                "Empty": [],
+                "PinkParticles": ["b"]
+            })
+            self.assertEqual(set_index.get_memberships("run1", 0), {})
+
+    def test_sets_with_the_same_particles(self) -> None:
+        # Sets with different names, that select the same particles, have the same
+        # hash.
+        no_pink_particles = _Set("NoPinkParticles", "all", ["a", "b", "c"])
+
+        with SetIndex(self.file_path) as set_index:
+            set_index.add([self.all_particles], "run0", 0)
+            set_index.add([no_pink_particles], "run0", 1)
+
+            self.assertEqual(set_index.get_memberships("run0", 0),
+                             {"AllParticles": ["a", "b", "c"]})
+            self.assertEqual(set_index.get_memberships("run0", 1),
+                             {"NoPinkParticles": ["a", "b", "c"]})
+
+    def test_add_is_idempotent(self) -> None:
+        with SetIndex(self.file_path) as set_index:
+            set_index.add([self.all_particles, self.empty], "run0", 0)
+
+        # Reopen the index, like a later rendering step would.
+        with SetIndex(self.file_path) as set_index:
+            set_index.add([self.all_particles, self.empty], "run0", 0)
+
+            self.assertEqual(set_index.get_set_hashes(), [("all", "AllParticles"),
+                                                          ("empty", "Empty")])
+            self.assertEqual(set_index.get_memberships("run0", 0)["AllParticles"],
+                             ["a", "b", "c"])
+
+    def test_add_is_atomic(self) -> None:
+        broken_set = _Set("Broken", "broken", [])
+        broken_set.particles = None    # type: ignore
+
+        with SetIndex(self.file_path) as set_index:
+            with self.assertRaises(TypeError):
+                set_index.add([self.all_particles, broken_set], "run0", 0)
+
+            self.assertEqual(set_index.get_set_hashes(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
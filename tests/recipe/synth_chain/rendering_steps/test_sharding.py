@@ -0,0 +1,106 @@
+"""Tests for the tar shards of rendering outputs."""
+
+from pathlib import Path
+import tarfile
+import tempfile
+import unittest
+
+from synthpic2.recipe.synth_chain.rendering_steps.sharding import find_shards
+from synthpic2.recipe.synth_chain.rendering_steps.sharding import get_sample_key
+from synthpic2.recipe.synth_chain.rendering_steps.sharding import merge_shards
+from synthpic2.recipe.synth_chain.rendering_steps.sharding import read_member
+from synthpic2.recipe.synth_chain.rendering_steps.sharding import \
+    read_shard_index
+from synthpic2.recipe.synth_chain.rendering_steps.sharding import ShardWriter
+
+
+class TestSharding(unittest.TestCase):
+    """Tests of the ShardWriter and the merging of shards."""
+
+    def setUp(self) -> None:
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.temporary_directory.name)
+
+    def tearDown(self) -> None:
+        self.temporary_directory.cleanup()
+
+    def _read_shards(self, shard_root: Path) -> dict:
+        members = {}
+        for shard_path in find_shards(shard_root):
+            with tarfile.open(shard_path) as tar_file:
+                for tar_info in tar_file.getmembers():
+                    extracted_file = tar_file.extractfile(tar_info)
+                    assert extracted_file is not None
+                    members[tar_info.name] = extracted_file.read()
+        return members
+
+    def test_get_sample_key(self) -> None:
+        self.assertEqual(get_sample_key("output/beads/2022-01-01_12.00/run0", 3),
+                         "output/beads/2022-01-01_12_00/run0/image3")
+        self.assertEqual(get_sample_key(".", 3), "image3")
+
+    def test_shards_are_size_bounded(self) -> None:
+        writer = ShardWriter(self.root / "shards", max_shard_size=8 * 1024)
+        for index in range(4):
+            writer.add(f"run0/image{index}", "real.png", bytes([index]) * 3000)
+
+        # Shards are only visible, when they are complete.
+        self.assertEqual(find_shards(self.root / "shards"), writer.shard_paths[:1])
+        writer.close()
+
+        shard_paths = find_shards(self.root / "shards")
+        self.assertEqual(len(shard_paths), 2)
+        self.assertEqual(shard_paths, sorted(writer.shard_paths))
+
+        for shard_path in shard_paths:
+            with open(shard_path, "rb") as shard_file:
+                for member in read_shard_index(shard_path):
+                    index = int(member.sample_key[-1])
+                    self.assertEqual(read_member(shard_file, member),
+                                     bytes([index]) * 3000)
+
+        self.assertEqual(len(self._read_shards(self.root / "shards")), 4)
+
+    def test_add_folder(self) -> None:
+        output_root = self.root / "image0"
+        for relative_path in ["real/a.png", "real/sub/particle_features.csv"]:
+            file_path = output_root / relative_path
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            file_path.write_text(relative_path)
+
+        writer = ShardWriter(self.root / "shards")
+        writer.add_folder("run0/image0", output_root / "real", output_root)
+        writer.close()
+
+        self.assertEqual(
+            self._read_shards(self.root / "shards"), {
+                "run0/image0.real.a.png": b"real/a.png",
+                "run0/image0.real.sub.particle_features.csv":
+                    b"real/sub/particle_features.csv",
+            })
+        self.assertFalse((output_root / "real").exists())
+
+    def test_merge_shards(self) -> None:
+        # Parallel processes write the outputs of the same image to separate shards.
+        for shard_root, mode in [("job0", "real"), ("job1", "categorical")]:
+            writer = ShardWriter(self.root / shard_root)
+            writer.add("run0/image1", f"{mode}.png", mode.encode())
+            writer.add("run0/image0", f"{mode}.png", mode.encode())
+            writer.close()
+
+        merged_shard_paths = merge_shards([self.root / "job0", self.root / "job1"],
+                                          self.root / "merged",
+                                          remove_inputs=True)
+
+        self.assertEqual(len(merged_shard_paths), 1)
+        with tarfile.open(merged_shard_paths[0]) as tar_file:
+            self.assertEqual(tar_file.getnames(), [
+                "run0/image0.real.png", "run0/image0.categorical.png",
+                "run0/image1.real.png", "run0/image1.categorical.png"
+            ])
+        self.assertEqual(find_shards(self.root / "job0"), [])
+        self.assertEqual(list((self.root / "job1").iterdir()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
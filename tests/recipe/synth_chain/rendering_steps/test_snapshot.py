@@ -0,0 +1,65 @@
+"""Tests for the RenderSnapshot class."""
+
+import unittest
+
+import bpy
+
+from synthpic2.blender.utilities import assign_material
+from synthpic2.blender.utilities import create_emission_shader
+from synthpic2.recipe.synth_chain.rendering_steps.rendering import _Scene
+from synthpic2.recipe.synth_chain.rendering_steps.snapshot import RenderSnapshot
+
+
+class TestRenderSnapshot(unittest.TestCase):
+    """Tests of the RenderSnapshot class."""
+
+    # pylint: disable=protected-access
+
+    def test_restore_categorical_preparation(self) -> None:
+        bpy.ops.wm.read_factory_settings()
+
+        scene = bpy.data.scenes[0]
+        cube = bpy.data.objects["Cube"]
+        original_material = cube.data.materials[0]
+        original_world = scene.world
+        original_engine = scene.render.engine
+        original_view_transform = scene.view_settings.view_transform
+
+        snapshot = RenderSnapshot.take()
+
+        _Scene().prepare_for_render("categorical")
+        assign_material(cube, create_emission_shader(color=(1, 0, 0, 1)).name)
+        cube.visible_camera = False
+
+        self.assertIsNone(scene.world)
+        self.assertTrue(bpy.data.objects["Light"].hide_render)
+
+        snapshot.restore()
+
+        self.assertEqual(scene.world, original_world)
+        self.assertEqual(scene.render.engine, original_engine)
+        self.assertEqual(scene.view_settings.view_transform, original_view_transform)
+        self.assertFalse(bpy.data.objects["Light"].hide_render)
+        self.assertTrue(cube.visible_camera)
+        self.assertEqual(list(cube.data.materials), [original_material])
+        self.assertFalse(
+            any(material.name.startswith("Emission") for material in bpy.data.materials))
+
+    def test_restore_compositing_nodes(self) -> None:
+        bpy.ops.wm.read_factory_settings()
+
+        scene = bpy.data.scenes[0]
+        self.assertTrue(RenderSnapshot.is_sufficient("depth_map"))
+
+        snapshot = RenderSnapshot.take()
+        _Scene().prepare_for_render("depth_map")
+        snapshot.restore()
+
+        self.assertFalse(scene.use_nodes)
+        self.assertFalse(scene.view_layers[0].use_pass_z)
+        self.assertEqual(len(scene.node_tree.nodes), 0)
+
+        # Existing compositor nodes would be deleted by the preparation.
+        scene.node_tree.nodes.new("CompositorNodeComposite")
+        self.assertFalse(RenderSnapshot.is_sufficient("depth_map"))
+        self.assertTrue(RenderSnapshot.is_sufficient("categorical"))
@@ -0,0 +1,93 @@
+"""Tests for the tiled rendering."""
+
+import unittest
+
+import bpy
+import numpy as np
+
+from synthpic2.recipe.synth_chain.rendering_steps.rasterization import \
+    extract_triangles
+from synthpic2.recipe.synth_chain.rendering_steps.rasterization import \
+    get_camera_matrices
+from synthpic2.recipe.synth_chain.rendering_steps.rasterization import rasterize
+from synthpic2.recipe.synth_chain.rendering_steps.tiling import \
+    get_projected_bounding_box
+from synthpic2.recipe.synth_chain.rendering_steps.tiling import split_into_tiles
+from synthpic2.recipe.synth_chain.rendering_steps.tiling import stitch_tiles
+from synthpic2.recipe.synth_chain.rendering_steps.tiling import uncrop_image
+
+
+class TestTiling(unittest.TestCase):
+    """Tests of the splitting and stitching of tiles."""
+
+    def test_split_and_stitch(self) -> None:
+        width, height = 11, 7
+        tiles = split_into_tiles(width, height, num_tiles_x=3, num_tiles_y=2)
+        self.assertEqual(len(tiles), 6)
+        self.assertEqual(sum(np.prod(tile.shape) for tile in tiles), width * height)
+
+        image = np.arange(width * height * 2).reshape(height, width, 2)
+
+        # Crop the tiles like Blender's render border, with y measured from the bottom.
+        tile_pixels = [
+            image[height - tile.y_max:height - tile.y_min, tile.x_min:tile.x_max]
+            for tile in tiles
+        ]
+        np.testing.assert_array_equal(stitch_tiles(tiles, tile_pixels, width, height),
+                                      image)
+
+        with self.assertRaises(ValueError):
+            stitch_tiles(tiles, [image[:1, :1]] * len(tiles), width, height)
+
+        self.assertEqual(len(split_into_tiles(2, 2, num_tiles_x=4, num_tiles_y=1)), 2)
+
+    def test_uncrop_image(self) -> None:
+        crop = np.ones((2, 3))
+        image = uncrop_image(crop, x_offset=4, y_offset=1, width=8, height=5)
+
+        self.assertEqual(image.shape, (5, 8))
+        self.assertEqual(image.sum(), 6)
+        np.testing.assert_array_equal(image[1:3, 4:7], crop)
+
+
+class TestProjectedBoundingBox(unittest.TestCase):
+    """Tests of the regions of objects in the image."""
+
+    def setUp(self) -> None:
+        bpy.ops.wm.read_factory_settings()
+
+        render_settings = bpy.data.scenes[0].render
+        render_settings.resolution_x = 96
+        render_settings.resolution_y = 64
+        render_settings.resolution_percentage = 100
+
+    def test_region_contains_object(self) -> None:
+        cube = bpy.data.objects["Cube"]
+        cube.scale = (0.3, 0.3, 0.3)
+        cube.location = (1, -0.5, 0.5)
+        bpy.context.view_layer.update()
+
+        region = get_projected_bounding_box(cube, margin=1)
+        assert region is not None
+        self.assertLess(np.prod(region.shape), 96 * 64 / 4)
+
+        view_matrix, projection_matrix, width, height = get_camera_matrices(
+            bpy.data.scenes[0])
+        positions, _ = extract_triangles(cube)
+        foreground = rasterize(positions, view_matrix, projection_matrix, width,
+                               height).foreground
+
+        rows, columns = np.nonzero(foreground)
+        self.assertGreater(len(rows), 0)
+        self.assertGreaterEqual(columns.min(), region.x_min)
+        self.assertLess(columns.max(), region.x_max)
+        self.assertGreaterEqual(height - 1 - rows.max(), region.y_min)
+        self.assertLess(height - 1 - rows.min(), region.y_max)
+
+    def test_object_behind_camera(self) -> None:
+        camera = bpy.data.objects["Camera"]
+        cube = bpy.data.objects["Cube"]
+        cube.location = camera.location * 2
+        bpy.context.view_layer.update()
+
+        self.assertIsNone(get_projected_bounding_box(cube))
@@ -0,0 +1,154 @@
+"""Tests for checkpoints of synth chains."""
+
+import tempfile
+import unittest
+
+import bpy
+import numpy as np
+from omegaconf import DictConfig
+from omegaconf import OmegaConf
+
+from synthpic2.recipe.registries import STATE_REGISTRY
+from synthpic2.recipe.synth_chain.checkpoint import Checkpoint
+from synthpic2.recipe.synth_chain.checkpoint import StepFingerprints
+from synthpic2.recipe.synth_chain.state import RuntimeState
+from synthpic2.recipe.synth_chain.state import State
+
+
+def _get_recipe_config(seed: int = 42,
+                       num_frames: int = 100,
+                       samples: int = 16,
+                       defocus: float = 0.2) -> DictConfig:
+    return OmegaConf.create({
+        "initial_runtime_state": {
+            "seed": seed
+        },
+        "blueprints": {
+            "particles": {
+                "Bead": {
+                    "number": 10
+                }
+            }
+        },
+        "process_conditions": {
+            "feature_variabilities": {
+                "Defocus": {
+                    "feature_name": "defocus",
+                    "variability": {
+                        "_target_": "Constant",
+                        "value": defocus
+                    }
+                }
+            }
+        },
+        "synth_chain": {
+            "feature_generation_steps": [
+                {
+                    "_target_": "InvokeBlueprints",
+                    "affected_set_name": "AllParticleBlueprints"
+                },
+                {
+                    "_target_": "RelaxCollisions",
+                    "num_frames": num_frames
+                },
+                {
+                    "_target_": "TriggerFeatureUpdate",
+                    "feature_variability_name": "Defocus",
+                    "affected_set_name": "AllMeasurementTechniques"
+                },
+            ],
+            "rendering_steps": [{
+                "_target_": "RenderParticlesTogether",
+                "samples": samples
+            }]
+        }
+    })
+
+
+class TestStepFingerprints(unittest.TestCase):
+    """Tests of the StepFingerprints class."""
+
+    def test_fingerprints_are_chained(self) -> None:
+        fingerprints = StepFingerprints.from_recipe_config(_get_recipe_config())
+
+        self.assertEqual(len(fingerprints.feature_generation), 3)
+        self.assertEqual(len(fingerprints.rendering), 1)
+        self.assertEqual(fingerprints,
+                         StepFingerprints.from_recipe_config(_get_recipe_config()))
+
+        changed_step = StepFingerprints.from_recipe_config(
+            _get_recipe_config(num_frames=250))
+        self.assertEqual(changed_step.feature_generation[0],
+                         fingerprints.feature_generation[0])
+        self.assertNotEqual(changed_step.feature_generation[1],
+                            fingerprints.feature_generation[1])
+        self.assertNotEqual(changed_step.rendering[0], fingerprints.rendering[0])
+
+        changed_rendering = StepFingerprints.from_recipe_config(
+            _get_recipe_config(samples=32))
+        self.assertEqual(changed_rendering.feature_generation,
+                         fingerprints.feature_generation)
+        self.assertNotEqual(changed_rendering.rendering[0], fingerprints.rendering[0])
+
+        changed_variability = StepFingerprints.from_recipe_config(
+            _get_recipe_config(defocus=0.5))
+        self.assertEqual(changed_variability.feature_generation[:2],
+                         fingerprints.feature_generation[:2])
+        self.assertNotEqual(changed_variability.feature_generation[2],
+                            fingerprints.feature_generation[2])
+
+        changed_seed = StepFingerprints.from_recipe_config(_get_recipe_config(seed=0))
+        self.assertNotEqual(changed_seed.feature_generation[0],
+                            fingerprints.feature_generation[0])
+
+
+class TestCheckpoint(unittest.TestCase):
+    """Tests of the Checkpoint class."""
+
+    def test_save_load_delete(self) -> None:
+        bpy.ops.wm.read_factory_settings()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            checkpoint = Checkpoint(name="test_checkpoint", file_root=temp_dir)
+            self.assertFalse(checkpoint.exists())
+
+            runtime_state = RuntimeState(time=1, seed=123)
+            np.random.seed(0)
+            checkpoint.save(runtime_state)
+            self.assertTrue(checkpoint.exists())
+
+            expected_random_numbers = np.random.rand(3)
+
+            bpy.ops.wm.read_factory_settings(use_empty=True)
+            loaded_runtime_state = checkpoint.load()
+
+            self.assertEqual(loaded_runtime_state, runtime_state)
+            self.assertIn("Cube", bpy.data.objects)
+            np.testing.assert_array_equal(np.random.rand(3), expected_random_numbers)
+
+            checkpoint.delete()
+            self.assertFalse(checkpoint.exists())
+
+    def test_temporary_states(self) -> None:
+        bpy.ops.wm.read_factory_settings()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temporary_state = State(runtime_state=RuntimeState(seed=7))
+            temporary_state.save_to_disk()
+
+            checkpoint = Checkpoint(name="test_checkpoint", file_root=temp_dir)
+            checkpoint.save(RuntimeState(seed=123))
+
+            # Temporary states only exist as long as the process, that created them.
+            temporary_state.delete()
+
+            checkpoint.load()
+            restored_state = STATE_REGISTRY[temporary_state.name]
+            try:
+                self.assertNotEqual(restored_state.file_root,
+                                    temporary_state.file_root)
+                restored_state.load_from_disk()
+                self.assertEqual(restored_state.runtime_state, RuntimeState(seed=7))
+            finally:
+                restored_state.delete()
+                checkpoint.delete()
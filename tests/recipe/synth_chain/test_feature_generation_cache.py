@@ -0,0 +1,106 @@
+"""Tests for the FeatureGenerationCache class."""
+
+import os
+import tempfile
+import time
+import unittest
+
+import bpy
+
+from synthpic2.recipe.synth_chain.feature_generation_cache import \
+    FeatureGenerationCache
+from synthpic2.recipe.synth_chain.state import RuntimeState
+
+
+class TestFeatureGenerationCache(unittest.TestCase):
+    """Tests of the FeatureGenerationCache class."""
+
+    def test_store_and_lookup(self) -> None:
+        bpy.ops.wm.read_factory_settings()
+        runtime_state = RuntimeState(time=0, seed=42)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = FeatureGenerationCache(root=temp_dir)
+            keys = ["aa01", "bb02", "cc03"]
+
+            num_cached_steps, cached_runtime_state = cache.lookup(keys)
+            self.assertEqual(num_cached_steps, 0)
+            self.assertIsNone(cached_runtime_state)
+
+            cache.store(keys[1], runtime_state)
+            self.assertTrue(cache.contains(keys[1]))
+            self.assertFalse(cache.contains(keys[2]))
+
+            bpy.ops.wm.read_factory_settings(use_empty=True)
+            num_cached_steps, cached_runtime_state = cache.lookup(keys)
+
+            self.assertEqual(num_cached_steps, 2)
+            self.assertEqual(cached_runtime_state, runtime_state)
+            self.assertIn("Cube", bpy.data.objects)
+
+            self.assertEqual(cache.stats, {
+                "hits": 1,
+                "misses": 1,
+                "stores": 1,
+                "evictions": 0
+            })
+
+    def test_eviction(self) -> None:
+        bpy.ops.wm.read_factory_settings()
+        runtime_state = RuntimeState(time=0, seed=42)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = FeatureGenerationCache(root=temp_dir, max_age_days=1)
+
+            cache.store("aa01", runtime_state)
+
+            # Pretend that the entry has last been used two days ago.
+            two_days_ago = time.time() - 2 * 24 * 60 * 60
+            os.utime(cache._get_entry_path("aa01"),    # pylint: disable=protected-access
+                     (two_days_ago, two_days_ago))
+
+            cache.store("bb02", runtime_state)
+
+            self.assertFalse(cache.contains("aa01"))
+            self.assertTrue(cache.contains("bb02"))
+
+            # A tiny maximum size leads to the eviction of all entries.
+            cache.max_size_gb = 1e-12
+            cache.evict()
+            self.assertFalse(cache.contains("bb02"))
+            self.assertEqual(cache.stats["evictions"], 2)
+
+    def test_eviction_with_state_files(self) -> None:
+        bpy.ops.wm.read_factory_settings()
+        runtime_state = RuntimeState(time=0, seed=42)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = FeatureGenerationCache(root=temp_dir)
+            keys = ["aa01", "bb02"]
+            for key in keys:
+                cache.store(key, runtime_state)
+
+            entry_paths = [
+                cache._get_entry_path(key)    # pylint: disable=protected-access
+                for key in keys
+            ]
+            size_without_states = sum(file_path.stat().st_size
+                                      for entry_path in entry_paths
+                                      for file_path in entry_path.iterdir()
+                                      if file_path.is_file())
+
+            # Saved states are stored in a subfolder of the entry.
+            state_file_path = entry_paths[0] / "checkpoint_states" / "state.blend"
+            state_file_path.parent.mkdir(exist_ok=True)
+            state_file_path.write_bytes(bytes(2**20))
+
+            # Pretend that the first entry has been used least recently.
+            one_hour_ago = time.time() - 60 * 60
+            os.utime(entry_paths[0], (one_hour_ago, one_hour_ago))
+
+            # Both entries would fit, if the state files were not counted.
+            cache.max_size_gb = (size_without_states + 2**19) / 1024**3
+            cache.evict()
+
+            self.assertFalse(cache.contains("aa01"))
+            self.assertTrue(cache.contains("bb02"))
@@ -0,0 +1,94 @@
+"""Tests for the run manifest."""
+
+import hashlib
+from pathlib import Path
+import tempfile
+import unittest
+
+from omegaconf import OmegaConf
+
+from synthpic2.recipe.synth_chain.manifest import append_to_manifest
+from synthpic2.recipe.synth_chain.manifest import concatenate_manifests
+from synthpic2.recipe.synth_chain.manifest import find_manifests
+from synthpic2.recipe.synth_chain.manifest import get_file_md5
+from synthpic2.recipe.synth_chain.manifest import get_recipe_md5
+from synthpic2.recipe.synth_chain.manifest import MANIFEST_FILE_NAME
+from synthpic2.recipe.synth_chain.manifest import read_manifest
+
+
+class TestManifest(unittest.TestCase):
+    """Tests of the writing and the concatenation of manifests."""
+
+    def setUp(self) -> None:
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.temporary_directory.name)
+
+    def tearDown(self) -> None:
+        self.temporary_directory.cleanup()
+
+    def test_append_to_manifest(self) -> None:
+        manifest_path = self.root / MANIFEST_FILE_NAME
+        append_to_manifest(manifest_path, [{"file_path": "real/a.png"}])
+        append_to_manifest(manifest_path, [])
+        append_to_manifest(manifest_path, [{"file_path": "real/b.png"}])
+
+        # The line of a killed job may be incomplete.
+        with open(manifest_path, "a", encoding="utf-8") as file:
+            file.write('{"file_path": "re')
+
+        self.assertEqual(list(read_manifest(manifest_path)),
+                         [{"file_path": "real/a.png"}, {"file_path": "real/b.png"}])
+
+    def test_concatenate_manifests(self) -> None:
+        for run in ["run1", "run0"]:
+            (self.root / "sweep" / run).mkdir(parents=True)
+            append_to_manifest(self.root / "sweep" / run / MANIFEST_FILE_NAME,
+                               [{"run": run}])
+
+        manifest_paths = find_manifests([self.root / "sweep"])
+        self.assertEqual([path.parent.name for path in manifest_paths],
+                         ["run0", "run1"])
+
+        num_entries = concatenate_manifests(manifest_paths,
+                                            self.root / "sweep_manifest.jsonl")
+
+        self.assertEqual(num_entries, 2)
+        self.assertEqual(list(read_manifest(self.root / "sweep_manifest.jsonl")),
+                         [{"run": "run0"}, {"run": "run1"}])
+
+    def test_get_file_md5(self) -> None:
+        file_path = self.root / "image.png"
+        data = bytes(range(256)) * 10000
+        file_path.write_bytes(data)
+
+        self.assertEqual(get_file_md5(file_path), hashlib.md5(data).hexdigest())
+
+    def test_get_recipe_md5(self) -> None:
+        recipe_config = OmegaConf.create({
+            "hydra": {
+                "run": {
+                    "dir": "${hydra.job.name}"
+                }
+            },
+            "initial_runtime_state": {
+                "seed": 42
+            },
+            "num_images": "${initial_runtime_state.seed}",
+        })
+        other_recipe_config = OmegaConf.create({
+            "initial_runtime_state": {
+                "seed": 42
+            },
+            "num_images": 42,
+        })
+
+        self.assertEqual(get_recipe_md5(recipe_config),
+                         get_recipe_md5(other_recipe_config))
+
+        other_recipe_config.initial_runtime_state.seed = 43
+        self.assertNotEqual(get_recipe_md5(recipe_config),
+                            get_recipe_md5(other_recipe_config))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+"""Tests for the render queue between feature generation and rendering."""
+
+import multiprocessing
+import tempfile
+import unittest
+
+from synthpic2.recipe.synth_chain.render_queue import RenderQueue
+from synthpic2.recipe.synth_chain.render_queue import StageStats
+
+
+class TestRenderQueue(unittest.TestCase):
+    """Tests of the RenderQueue class."""
+
+    def test_close_and_collect_stats(self) -> None:
+        with tempfile.TemporaryDirectory() as spool_root:
+            render_queue = RenderQueue(spool_root, 2, multiprocessing.get_context())
+
+            render_queue.close(2)
+            for _ in range(2):
+                job, wait_time = render_queue.get()
+                self.assertIsNone(job)
+                self.assertGreaterEqual(wait_time, 0)
+
+            render_queue.report_stats("rendering", StageStats(1, 2, 3.0, 1.0))
+            render_queue.report_stats("rendering", StageStats(1, 1, 1.0, 3.0))
+            render_queue.report_stats("feature_generation", StageStats(1, 3, 2.0, 0.0))
+
+            stats_by_stage = render_queue.collect_stats()
+
+        self.assertEqual(stats_by_stage["rendering"], StageStats(2, 3, 4.0, 4.0))
+        self.assertAlmostEqual(stats_by_stage["rendering"].utilization, 0.5)
+        self.assertAlmostEqual(stats_by_stage["feature_generation"].utilization, 1.0)
+        self.assertEqual(StageStats().utilization, 0.0)
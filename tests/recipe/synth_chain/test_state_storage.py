@@ -0,0 +1,47 @@
+"""Tests for the state storage backends."""
+
+from pathlib import Path
+import tempfile
+import unittest
+
+import bpy
+
+from synthpic2.recipe.synth_chain.state import RuntimeState
+from synthpic2.recipe.synth_chain.state import State
+from synthpic2.recipe.synth_chain.state_storage import create_state_storage
+from synthpic2.recipe.synth_chain.state_storage import SharedMemoryStateStorage
+from synthpic2.recipe.synth_chain.state_storage import set_state_storage
+from synthpic2.recipe.synth_chain.state_storage import StateStorage
+
+
+class TestStateStorage(unittest.TestCase):
+    """Tests of the StateStorage classes."""
+
+    def tearDown(self) -> None:
+        set_state_storage(StateStorage())
+
+    def test_create_state_storage(self) -> None:
+        self.assertIsInstance(create_state_storage("shm"), SharedMemoryStateStorage)
+
+        with self.assertRaises(ValueError):
+            create_state_storage("unknown")
+
+    def test_temporary_state_in_storage_root(self) -> None:
+        bpy.ops.wm.read_factory_settings()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            state_storage = SharedMemoryStateStorage(root=temp_dir)
+            set_state_storage(state_storage)
+
+            state = State(runtime_state=RuntimeState(seed=42))
+            assert isinstance(state.file_root, Path)
+            self.assertEqual(state.file_root.parent, Path(temp_dir))
+
+            state.save_to_disk()
+            state.load_from_disk()
+            self.assertEqual(state.runtime_state, RuntimeState(seed=42))
+
+            state.delete()
+            self.assertFalse(state.file_root.exists())
+            self.assertEqual(state_storage.stats.num_saves, 1)
+            self.assertEqual(state_storage.stats.num_loads, 1)
@@ -0,0 +1,101 @@
+"""Tests for the StepTracer class."""
+
+import json
+from pathlib import Path
+import tempfile
+import time
+import unittest
+
+import attr
+import bpy
+
+from synthpic2.recipe.synth_chain.state import RuntimeState
+from synthpic2.recipe.synth_chain.step import SynthChainStep
+from synthpic2.recipe.synth_chain.synth_chain import SynthChain
+from synthpic2.recipe.synth_chain.tracing import StepTracer
+from synthpic2.utilities import working_directory
+
+
+@attr.s(auto_attribs=True)
+class _SleepStep(SynthChainStep):
+    duration: float = 0.01
+
+    def __call__(self, runtime_state: RuntimeState) -> RuntimeState:
+        time.sleep(self.duration)
+        return runtime_state
+
+
+@attr.s(auto_attribs=True)
+class _FailingStep(SynthChainStep):
+
+    def __call__(self, runtime_state: RuntimeState) -> RuntimeState:
+        raise RuntimeError("Step failed.")
+
+
+class TestStepTracer(unittest.TestCase):
+    """Tests of the StepTracer class."""
+
+    def test_trace_and_write(self) -> None:
+        bpy.ops.wm.read_factory_settings(use_empty=True)
+
+        tracer = StepTracer()
+        runtime_state = RuntimeState(seed=42)
+
+        for index, step in enumerate([_SleepStep(), _SleepStep(duration=0.02)]):
+            with tracer.trace(step, "feature_generation", index):
+                step(runtime_state)
+
+        self.assertEqual(len(tracer.records), 2)
+
+        record = tracer.records[1]
+        self.assertEqual(record.name, "1: _SleepStep")
+        self.assertGreaterEqual(record.wall_time, 0.02)
+        self.assertGreater(record.peak_rss, 0)
+        self.assertEqual(record.num_objects, 0)
+        self.assertIsNone(record.num_particles)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            trace_file_path = Path(temp_dir) / "trace.json"
+            tracer.write_chrome_trace(trace_file_path)
+
+            with open(trace_file_path, "r", encoding="utf-8") as trace_file:
+                trace = json.load(trace_file)
+
+        complete_events = [
+            event for event in trace["traceEvents"] if event["ph"] == "X"
+        ]
+        self.assertEqual([event["name"] for event in complete_events],
+                         ["0: _SleepStep", "1: _SleepStep"])
+        self.assertIn("cpu_time", complete_events[0]["args"])
+
+    def test_trace_failing_step(self) -> None:
+        bpy.ops.wm.read_factory_settings(use_empty=True)
+
+        tracer = StepTracer()
+        step = _FailingStep()
+
+        with self.assertRaises(RuntimeError):
+            with tracer.trace(step, "rendering", 0):
+                step(RuntimeState(seed=42))
+
+        self.assertEqual([record.name for record in tracer.records],
+                         ["0: _FailingStep"])
+
+    def test_synth_chain_with_failing_step(self) -> None:
+        bpy.ops.wm.read_factory_settings(use_empty=True)
+
+        synth_chain = SynthChain(
+            feature_generation_steps=[_SleepStep(), _FailingStep()], rendering_steps=[])
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with working_directory(Path(temp_dir)):
+                with self.assertRaises(RuntimeError):
+                    synth_chain.execute(RuntimeState(seed=42))
+
+            with open(Path(temp_dir) / "trace.json", "r",
+                      encoding="utf-8") as trace_file:
+                trace = json.load(trace_file)
+
+        self.assertEqual(
+            [event["name"] for event in trace["traceEvents"] if event["ph"] == "X"],
+            ["0: _SleepStep", "1: _FailingStep"])
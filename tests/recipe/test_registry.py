@@ -4,6 +4,11 @@ from dataclasses import dataclass
 import unittest
 
 from synthpic2.errors import ConventionError
+from synthpic2.recipe.registries import clear_all_registries
+from synthpic2.recipe.registries import PARTICLE_REGISTRY
+from synthpic2.recipe.registries import restore_all_registries
+from synthpic2.recipe.registries import SET_REGISTRY
+from synthpic2.recipe.registries import snapshot_all_registries
 from synthpic2.recipe.registries.registry import Registry
 
 
@@ -118,3 +123,33 @@ class TestRegistry(unittest.TestCase):
         # Removal of non-existent items should not result in an exception.
         registry.delete_item("test_item3")
         registry.delete_item(3)
+
+
+class TestRegistrySnapshots(unittest.TestCase):
+    """Tests of taking and restoring snapshots of all registries."""
+
+    def setUp(self) -> None:
+        clear_all_registries()
+
+    def tearDown(self) -> None:
+        clear_all_registries()
+
+    def test_restore_snapshot(self) -> None:
+        kept_item = _ItemClass1(name="kept_item")
+        SET_REGISTRY.register(kept_item)
+
+        snapshot = snapshot_all_registries()
+
+        PARTICLE_REGISTRY.register(_ItemClass1(name="temporary_particle"))
+        SET_REGISTRY.register(_ItemClass1(name="temporary_set"))
+
+        restore_all_registries(snapshot)
+
+        self.assertEqual(len(PARTICLE_REGISTRY), 0)
+        self.assertEqual(list(SET_REGISTRY), [kept_item])
+
+        # Restoring must not alter the snapshot itself, so that it can be reused.
+        SET_REGISTRY.register(_ItemClass1(name="temporary_set"))
+        restore_all_registries(snapshot)
+
+        self.assertEqual(list(SET_REGISTRY), [kept_item])
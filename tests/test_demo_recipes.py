@@ -1,18 +1,37 @@
 """Test the setup of the project."""
 
+import json
 import os
 import pathlib
-from typing import List, Optional
+import shutil
+from typing import Callable, List, Optional
 import unittest
 
 from hydra import compose
 from hydra import initialize
+from hydra.utils import instantiate
+from omegaconf import DictConfig
 
 from synthpic2 import execute_recipe
+from synthpic2.engine import clean_up_previous_run
+from synthpic2.engine import setup_run
+from synthpic2.recipe.synth_chain.rendering_steps.set_index import SetIndex
+from synthpic2.recipe.utilities import parse_recipe
+from synthpic2.utilities import set_run_context
 
 PROJECT_ROOT = pathlib.Path(__file__).parent.resolve()
 
 
+def _execute_recipe_directly(recipe: DictConfig) -> None:
+    """Execute a recipe like a script or notebook would, i.e. without
+    `execute_recipe`, which sets the run context."""
+    set_run_context(None)
+    clean_up_previous_run()
+    setup_run()
+    parse_recipe(recipe)
+    instantiate(recipe).execute(recipe)
+
+
 class DemoRecipeTest(unittest.TestCase):
     """Execute all demo recipes."""
     recipe_root = "../recipes"
@@ -24,6 +43,56 @@ class DemoRecipeTest(unittest.TestCase):
     def test_beads(self) -> None:
         self._test_recipe("beads")
 
+    def test_beads_parallel_rendering(self) -> None:
+        trace_file_path = self.output_root / "beads_parallel_rendering" / "trace.json"
+        trace_file_path.unlink(missing_ok=True)
+
+        self._test_recipe("beads",
+                          overrides=["synth_chain.num_rendering_step_workers=2"],
+                          output_folder_name="beads_parallel_rendering")
+
+        # The rendering steps are traced by the workers.
+        with open(trace_file_path, "r", encoding="utf-8") as trace_file:
+            trace = json.load(trace_file)
+
+        rendering_events = [
+            event for event in trace["traceEvents"]
+            if event["ph"] == "X" and event["cat"] == "rendering"
+        ]
+        self.assertTrue(rendering_events)
+        self.assertNotIn(os.getpid(), {event["pid"] for event in rendering_events})
+
+    def test_beads_render_queue(self) -> None:
+        # The workers don't run in Hydra, but still resolve relative paths relative to
+        # the original working directory.
+        cache_root = self.output_root / "beads_render_queue" / "cache"
+        shutil.rmtree(cache_root, ignore_errors=True)
+
+        self._test_recipe("beads",
+                          overrides=[
+                              "num_images=2", "synth_chain.num_render_workers=1",
+                              "synth_chain.cache_root=cache"
+                          ],
+                          output_folder_name="beads_render_queue")
+
+        self.assertTrue(any(cache_root.iterdir()))
+        for image_index in range(2):
+            self.assertFalse(
+                (cache_root.parent / f"image{image_index}" / "cache").exists())
+
+    def test_beads_without_run_context(self) -> None:
+        output_folder = self.output_root / "beads_without_run_context"
+        shutil.rmtree(output_folder / "set_info", ignore_errors=True)
+
+        self._test_recipe("beads",
+                          output_folder_name="beads_without_run_context",
+                          execute=_execute_recipe_directly)
+
+        # Without a run context, the run is the current working directory.
+        with SetIndex(output_folder / "set_info" / "set_index.sqlite") as set_index:
+            memberships = set_index.get_memberships(run_id=".", image_index=0)
+        self.assertIn("AllParticles", memberships)
+
     def test_chocBeans_glassTable(self) -> None:    #pylint: disable=invalid-name
         self._test_recipe(
             "chocBeans_glassTable",
@@ -44,20 +113,22 @@ class DemoRecipeTest(unittest.TestCase):
 
     def _test_recipe(self,
                      recipe_name: str,
-                     overrides: Optional[List[str]] = None) -> None:
+                     overrides: Optional[List[str]] = None,
+                     output_folder_name: Optional[str] = None,
+                     execute: Callable[[DictConfig], None] = execute_recipe) -> None:
         """Execute a recipe to test it."""
 
         if overrides is None:
             overrides = []
 
         current_working_directory = pathlib.Path.cwd()
-        output_folder = self.output_root / recipe_name
+        output_folder = self.output_root / (output_folder_name or recipe_name)
         output_folder.mkdir(exist_ok=True, parents=True)
         os.chdir(output_folder)
 
         try:
             with initialize(config_path=self.recipe_root):
                 recipe = compose(config_name=recipe_name, overrides=overrides)
-                execute_recipe(recipe)
+                execute(recipe)
         finally:
             os.chdir(current_working_directory)
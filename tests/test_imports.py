@@ -0,0 +1,35 @@
+"""Test that slow to import dependencies are only imported when needed."""
+
+import json
+import pathlib
+import subprocess
+import sys
+import unittest
+
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent.resolve()
+
+
+class LazyImportTests(unittest.TestCase):
+    """Tests of the lazy imports of synthpic2."""
+
+    def test_import_does_not_load_lazy_modules(self) -> None:
+        script = ("import json, sys\n"
+                  "import synthpic2\n"
+                  "print(json.dumps([name for name in "
+                  "['wandb', 'matplotlib', 'pandas', 'trimesh'] "
+                  "if name in sys.modules]))")
+        result = subprocess.run([sys.executable, "-c", script],
+                                cwd=PROJECT_ROOT,
+                                capture_output=True,
+                                text=True,
+                                check=True)
+
+        imported_lazy_modules = json.loads(result.stdout.strip().splitlines()[-1])
+        self.assertEqual(imported_lazy_modules, [])
+
+    def test_lazy_step_is_available(self) -> None:
+        # pylint: disable=import-outside-toplevel
+        from synthpic2.recipe.synth_chain.feature_generation_steps import \
+            AgglomerateParticles
+
+        self.assertEqual(AgglomerateParticles.__name__, "AgglomerateParticles")